@@ -23,7 +23,8 @@ async def chat_agent(
     LangChain message structure.
     """
     try:
-        df = state_store.load_dataframe(session_id=request.session_id)
+        # Only the first rows are shown to the model; don't read the whole dataset.
+        df = await state_store.aload_dataframe(session_id=request.session_id, limit=5)
         if df is None:
             raise HTTPException(status_code=404, detail=f"No data found for session_id: {request.session_id}. Please upload a file first.")
 
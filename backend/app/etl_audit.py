@@ -1,7 +1,14 @@
 import json
 import os
+import sys
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+# 'resource' solo existe en sistemas Unix.
+try:
+    import resource
+except ImportError:
+    resource = None
 
 # --- Constantes ---
 LOG_DIRECTORY = "data/logs"
@@ -9,6 +16,17 @@ LOG_FILE_PATH = os.path.join(LOG_DIRECTORY, "etl_log.json")
 
 # --- Lógica del Logger de Auditoría ETL ---
 
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Devuelve el pico de memoria residente (RSS) del proceso actual en bytes,
+    o None si la plataforma no lo expone.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo reporta en KiB; macOS, en bytes.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
 def log_etl_event(message: str, level: str = 'info', extra_data: Dict[str, Any] = None) -> None:
     """
     Registra un evento del pipeline ETL en un archivo de log estructurado.
@@ -7,24 +7,29 @@ Cada módulo se especializa en un tipo de fuente de datos (e.g., CSV, SQL, API).
 Las funciones aquí expuestas están diseñadas para ser llamadas por el servicio de orquestación ETL.
 """
 
-from .csv_loader import load_csv
-from .excel_loader import load_excel
-from .json_loader import load_json
+from .csv_loader import load_csv, iter_csv_chunks
+from .excel_loader import load_excel, iter_excel_sheets
+from .json_loader import load_json, iter_json_chunks
 from .parquet_loader import load_parquet
 from .api_ingestor import ingest_from_api
 from .sql_ingestor import ingest_from_sql
-from .tsv_loader import load_tsv
-from .jsonl_loader import load_jsonl
+from .tsv_loader import load_tsv, iter_tsv_chunks
+from .jsonl_loader import load_jsonl, iter_jsonl_chunks
 from .yaml_loader import load_yaml
 
 __all__ = [
     'load_csv',
+    'iter_csv_chunks',
     'load_excel',
+    'iter_excel_sheets',
     'load_json',
+    'iter_json_chunks',
     'load_parquet',
     'ingest_from_api',
     'ingest_from_sql',
     'load_tsv',
+    'iter_tsv_chunks',
     'load_jsonl',
+    'iter_jsonl_chunks',
     'load_yaml'
 ]
@@ -0,0 +1,430 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import codecs
+import csv
+import io
+import os
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Sequence, Union, BinaryIO
+
+# Filas por trozo en la lectura incremental.
+DEFAULT_CHUNK_ROWS = int(os.getenv("SADI_ETL_CSV_CHUNK_ROWS", "100000"))
+# Bytes iniciales del archivo con los que se detectan codificación, separador y cabecera.
+CSV_SNIFF_BYTES = int(os.getenv("SADI_CSV_SNIFF_BYTES", str(64 * 1024)))
+# Tamaño de los bloques que pyarrow analiza en paralelo.
+CSV_BLOCK_BYTES = int(os.getenv("SADI_CSV_BLOCK_BYTES", str(16 * 1024 * 1024)))
+# Lector multihilo de pyarrow.csv; si se desactiva, se lee siempre con pandas.
+CSV_ARROW_ENABLED = os.getenv("SADI_CSV_ARROW_ENABLED", "1") == "1"
+
+CSV_DELIMITERS = (',', ';', '\t', '|')
+# Codificaciones que se prueban cuando el archivo no es UTF-8, habituales en
+# fuentes exportadas desde Excel en español. latin-1 acepta cualquier byte.
+FALLBACK_ENCODINGS = ('cp1252', 'latin-1')
+# Opciones de configuración que el lector de Arrow respeta; con cualquier otra
+# opción de pd.read_csv se lee con pandas.
+ARROW_CONFIG_KEYS = {'sep', 'delimiter', 'encoding'}
+# Valores que pd.read_csv lee como nulos por defecto, para que ambos lectores coincidan.
+NULL_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+TRUE_VALUES = ['True', 'TRUE', 'true']
+FALSE_VALUES = ['False', 'FALSE', 'false']
+# Filas de la muestra con las que se detectan el separador y la cabecera.
+SNIFF_ROWS = 50
+
+CsvSource = Union[bytes, str, os.PathLike, BinaryIO]
+
+class CsvDialect(NamedTuple):
+    """Formato detectado de un archivo delimitado."""
+    encoding: str
+    delimiter: str
+    has_header: bool
+    # Nombres de la primera fila, o columna_1, columna_2... si no hay cabecera.
+    column_names: List[str]
+
+def _as_readable(source: CsvSource):
+    """Envuelve los bytes en un buffer; las rutas y los objetos de archivo se pasan tal cual."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+def _read_prefix(source: CsvSource, size: int = CSV_SNIFF_BYTES) -> Optional[bytes]:
+    """Lee los primeros bytes sin consumir la fuente; None si es un flujo sin retroceso."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:size])
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(size)
+    if not source.seekable():
+        return None
+    position = source.tell()
+    prefix = source.read(size)
+    source.seek(position)
+    return prefix
+
+def _detect_encoding(prefix: bytes) -> str:
+    if prefix.startswith(codecs.BOM_UTF8):
+        return 'utf-8'
+    if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        prefix.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # Un carácter multibyte cortado al final del prefijo no descarta UTF-8.
+        if e.reason == 'unexpected end of data':
+            return 'utf-8'
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            prefix.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return FALLBACK_ENCODINGS[-1]
+
+def _complete_lines(prefix: bytes) -> bytes:
+    """Descarta la última línea del prefijo si el archivo continúa (puede estar cortada)."""
+    if len(prefix) < CSV_SNIFF_BYTES or b'\n' not in prefix:
+        return prefix
+    return prefix[:prefix.rindex(b'\n') + 1]
+
+def _sample_rows(text: str, delimiter: str) -> List[List[str]]:
+    rows = []
+    try:
+        for row in csv.reader(io.StringIO(text), delimiter=delimiter):
+            if row:
+                rows.append(row)
+            if len(rows) == SNIFF_ROWS:
+                break
+    except csv.Error:
+        pass
+    return rows
+
+def _detect_delimiter(text: str) -> str:
+    """El separador que divide todas las filas de la muestra en el mismo número (> 1) de campos."""
+    best, best_score = ',', (False, 1)
+    for delimiter in CSV_DELIMITERS:
+        field_counts = [len(row) for row in _sample_rows(text, delimiter)]
+        if not field_counts or field_counts[0] < 2:
+            continue
+        score = (min(field_counts) == max(field_counts), field_counts[0])
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+def _is_integer(value: str) -> bool:
+    try:
+        int(value)
+        return True
+    except ValueError:
+        return False
+
+def _first_row_is_data(rows: List[List[str]]) -> bool:
+    """
+    Indica si la primera fila de la muestra es de datos y no una cabecera.
+
+    Por defecto es cabecera, como en pd.read_csv. Solo se trata como datos si
+    todos sus valores son números, alguno no es entero (una cabecera de años o
+    códigos, como '2019,2020', sigue siendo cabecera) y las filas siguientes
+    tienen números en esas mismas columnas.
+    """
+    first_row = rows[0] if rows else []
+    values = [value.strip() for value in first_row if value.strip()]
+    if not values or not all(_is_number(value) for value in values):
+        return False
+    if all(_is_integer(value) for value in values):
+        return False
+    for row in rows[1:]:
+        if len(row) != len(first_row):
+            return False
+        for header_value, value in zip(first_row, row):
+            if header_value.strip() and value.strip() and not _is_number(value.strip()):
+                return False
+    return True
+
+def sniff_csv_dialect(prefix: bytes, delimiter: Optional[str] = None, encoding: Optional[str] = None) -> CsvDialect:
+    """
+    Detecta la codificación, el separador y la cabecera de un archivo a partir de sus primeros bytes.
+
+    Se considera que el archivo tiene cabecera salvo que la primera fila tenga
+    claramente forma de datos (ver _first_row_is_data).
+
+    :param prefix: Los primeros bytes del archivo (ver CSV_SNIFF_BYTES).
+    :param delimiter: Separador conocido; si se indica, no se detecta.
+    :param encoding: Codificación conocida; si se indica, no se detecta.
+    :return: El CsvDialect detectado.
+    """
+    encoding = encoding or _detect_encoding(prefix)
+    text = _complete_lines(prefix).decode(encoding, errors='ignore').lstrip('﻿')
+    delimiter = delimiter or _detect_delimiter(text)
+
+    rows = _sample_rows(text, delimiter)
+    first_row = rows[0] if rows else []
+    has_header = not _first_row_is_data(rows)
+    column_names = first_row if has_header else [f"columna_{i + 1}" for i in range(len(first_row))]
+    return CsvDialect(encoding, delimiter, has_header, column_names)
+
+# --- Lectura con pyarrow ---
+
+def _arrow_supports(dialect: CsvDialect, config: Dict[str, Any]) -> bool:
+    return (
+        CSV_ARROW_ENABLED
+        and not set(config) - ARROW_CONFIG_KEYS
+        and len(dialect.delimiter) == 1
+        # pandas renombra las cabeceras repetidas ('a', 'a.1'); Arrow no lo admite.
+        and len(set(dialect.column_names)) == len(dialect.column_names)
+    )
+
+def _arrow_input(source: CsvSource):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return pa.BufferReader(source)
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    return source
+
+def _arrow_options(dialect: CsvDialect, string_columns: Sequence[str] = ()):
+    read_options = pacsv.ReadOptions(
+        use_threads=True,
+        block_size=CSV_BLOCK_BYTES,
+        encoding=dialect.encoding,
+        column_names=None if dialect.has_header else dialect.column_names,
+    )
+    parse_options = pacsv.ParseOptions(delimiter=dialect.delimiter)
+    convert_options = pacsv.ConvertOptions(
+        null_values=NULL_VALUES,
+        strings_can_be_null=True,
+        true_values=TRUE_VALUES,
+        false_values=FALSE_VALUES,
+        # pandas no interpreta fechas ni horas por defecto; se dejan como texto.
+        column_types={name: pa.string() for name in string_columns},
+    )
+    return read_options, parse_options, convert_options
+
+def _temporal_columns(schema: pa.Schema) -> List[str]:
+    return [field.name for field in schema if pa.types.is_temporal(field.type)]
+
+def _prefix_schema(prefix: bytes, dialect: CsvDialect) -> Optional[pa.Schema]:
+    """Esquema que Arrow infiere para las líneas completas del prefijo."""
+    try:
+        return pacsv.read_csv(pa.BufferReader(_complete_lines(prefix)), *_arrow_options(dialect)).schema
+    except (pa.ArrowInvalid, UnicodeDecodeError):
+        return None
+
+def _is_encoding_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return isinstance(error, UnicodeDecodeError) or 'utf8' in message or 'utf-8' in message
+
+def _read_arrow(source: CsvSource, dialect: CsvDialect, string_columns: Sequence[str]) -> pd.DataFrame:
+    start = source.tell() if hasattr(source, 'tell') else None
+    table = pacsv.read_csv(_arrow_input(source), *_arrow_options(dialect, string_columns))
+    # read_csv infiere los tipos con todo el archivo: una columna vacía en el
+    # prefijo puede resultar ser de fechas.
+    temporal = [name for name in _temporal_columns(table.schema) if name not in string_columns]
+    if temporal:
+        if start is not None:
+            source.seek(start)
+        table = pacsv.read_csv(_arrow_input(source), *_arrow_options(dialect, list(string_columns) + temporal))
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+# --- Lectura con pandas ---
+
+def _pandas_options(dialect: CsvDialect, config: Dict[str, Any]) -> Dict[str, Any]:
+    options = {'sep': dialect.delimiter, 'encoding': dialect.encoding}
+    if not dialect.has_header:
+        options.update(header=None, names=dialect.column_names)
+    if 'delimiter' in config:
+        del options['sep']
+    options.update(config)
+    return options
+
+def _default_pandas_options(config: Dict[str, Any], delimiter: Optional[str]) -> Dict[str, Any]:
+    """Opciones para flujos sin retroceso, en los que no se puede detectar el formato."""
+    options = {'encoding': 'utf-8', 'sep': delimiter or ','}
+    if 'delimiter' in config:
+        del options['sep']
+    options.update(config)
+    return options
+
+def _sniff(source: CsvSource, config: Dict[str, Any], delimiter: Optional[str]):
+    prefix = _read_prefix(source)
+    if prefix is None:
+        return None, None
+    dialect = sniff_csv_dialect(
+        prefix,
+        delimiter=config.get('sep') or config.get('delimiter') or delimiter,
+        encoding=config.get('encoding'),
+    )
+    return prefix, dialect
+
+def read_delimited(source: CsvSource, config: Dict[str, Any] = None, delimiter: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lee un archivo delimitado completo, detectando su codificación, separador y cabecera.
+
+    Usa pyarrow.csv, que analiza bloques del archivo en varios hilos, con los
+    mismos nulos y booleanos que pd.read_csv y sin interpretar fechas. Se lee
+    con pandas si `config` trae opciones que Arrow no admite, si hay cabeceras
+    repetidas o si Arrow no puede leer el archivo (p. ej. filas con distinto
+    número de campos). Si una parte posterior al prefijo no es UTF-8, se
+    reintenta con FALLBACK_ENCODINGS.
+
+    :param source: Contenido en bytes, ruta al archivo u objeto de archivo binario.
+    :param config: Opciones de pd.read_csv; 'sep', 'delimiter' y 'encoding' también valen para Arrow.
+    :param delimiter: Separador propio del formato (p. ej. '\\t' en TSV); si no se indica, se detecta.
+    :return: DataFrame de pandas con los datos cargados.
+    """
+    config = dict(config or {})
+    prefix, dialect = _sniff(source, config, delimiter)
+    if dialect is None:
+        return pd.read_csv(source, **_default_pandas_options(config, delimiter))
+
+    start = source.tell() if hasattr(source, 'tell') else None
+    encodings = [dialect.encoding]
+    if 'encoding' not in config:
+        encodings += [encoding for encoding in FALLBACK_ENCODINGS if encoding != dialect.encoding]
+
+    if _arrow_supports(dialect, config):
+        schema = _prefix_schema(prefix, dialect)
+        string_columns = _temporal_columns(schema) if schema is not None else []
+        for encoding in encodings:
+            if start is not None:
+                source.seek(start)
+            try:
+                return _read_arrow(source, dialect._replace(encoding=encoding), string_columns)
+            except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+                if not _is_encoding_error(e):
+                    break
+
+    for encoding in encodings:
+        if start is not None:
+            source.seek(start)
+        try:
+            return pd.read_csv(_as_readable(source), **_pandas_options(dialect._replace(encoding=encoding), config))
+        except UnicodeDecodeError:
+            if encoding == encodings[-1]:
+                raise
+
+def iter_delimited_chunks(
+    source: CsvSource,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    config: Dict[str, Any] = None,
+    delimiter: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee un archivo delimitado por trozos de exactamente `chunksize` filas (salvo el último).
+
+    Con Arrow, los tipos se fijan con el prefijo del archivo y las columnas sin
+    valores en él se leen como texto. Si un bloque posterior no encaja con esos
+    tipos, la lectura sigue con pandas desde la primera fila aún no entregada.
+
+    :param source: Contenido en bytes, ruta al archivo u objeto de archivo binario.
+    :param chunksize: Número de filas por trozo.
+    :param config: Opciones de pd.read_csv, como en read_delimited.
+    :param delimiter: Separador propio del formato; si no se indica, se detecta.
+    :return: Un iterador de DataFrames.
+    """
+    config = dict(config or {})
+    prefix, dialect = _sniff(source, config, delimiter)
+    if dialect is None:
+        with pd.read_csv(source, chunksize=chunksize, **_default_pandas_options(config, delimiter)) as reader:
+            yield from reader
+        return
+
+    start = source.tell() if hasattr(source, 'tell') else None
+    rows_done = 0
+    if _arrow_supports(dialect, config):
+        try:
+            for df in _iter_arrow_chunks(source, prefix, dialect, chunksize):
+                df.index = pd.RangeIndex(rows_done, rows_done + len(df))
+                rows_done += len(df)
+                yield df
+            return
+        except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+            if _is_encoding_error(e) and 'encoding' not in config:
+                # Lo ya entregado era UTF-8; el resto del archivo no lo es.
+                dialect = dialect._replace(encoding=FALLBACK_ENCODINGS[0])
+                config['encoding_errors'] = 'replace'
+
+    if start is not None:
+        source.seek(start)
+    options = _pandas_options(dialect, config)
+    if rows_done:
+        first_data_row = 1 if dialect.has_header else 0
+        options['skiprows'] = range(first_data_row, first_data_row + rows_done)
+    with pd.read_csv(_as_readable(source), chunksize=chunksize, **options) as reader:
+        for df in reader:
+            df.index = df.index + rows_done
+            yield df
+
+def _iter_arrow_chunks(source: CsvSource, prefix: bytes, dialect: CsvDialect, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Lee con el lector incremental de Arrow y reagrupa sus lotes en trozos de `chunksize` filas."""
+    schema = _prefix_schema(prefix, dialect)
+    string_columns = [
+        field.name for field in schema
+        if pa.types.is_temporal(field.type) or pa.types.is_null(field.type)
+    ] if schema is not None else []
+    reader = pacsv.open_csv(_arrow_input(source), *_arrow_options(dialect, string_columns))
+    pending: List[pa.RecordBatch] = []
+    pending_rows = 0
+    yielded = False
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunksize:
+            table = pa.Table.from_batches(pending, schema=reader.schema)
+            yield table.slice(0, chunksize).to_pandas(split_blocks=True)
+            yielded = True
+            rest = table.slice(chunksize)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows or not yielded:
+        # Un archivo solo con cabecera produce un trozo vacío con sus columnas, como en pandas.
+        yield pa.Table.from_batches(pending, schema=reader.schema).to_pandas(split_blocks=True)
+
+def load_csv(file_content: bytes, config: Dict[str, Any] = None) -> pd.DataFrame:
+    """
+    Carga datos desde el contenido en bytes de un archivo CSV a un DataFrame de pandas.
+
+    La codificación, el separador y la cabecera se detectan si `config` no los
+    indica (ver read_delimited).
+
+    :param file_content: Contenido del archivo CSV en bytes.
+    :param config: Configuración opcional para la lectura del CSV (e.g., separador, codificación).
+    :return: DataFrame de pandas con los datos cargados.
+    :raises: Exception para errores de decodificación o lectura.
+    """
+    try:
+        return read_delimited(file_content, config)
+    except UnicodeDecodeError as e:
+        raise Exception(f"Error de codificación al procesar el archivo CSV. Error: {e}")
+    except Exception as e:
+        raise Exception(f"Error al leer el contenido del archivo CSV: {e}")
+
+def iter_csv_chunks(
+    source: CsvSource,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    config: Dict[str, Any] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee un CSV por trozos de `chunksize` filas, con memoria acotada.
+
+    :param source: Contenido en bytes, ruta al archivo u objeto de archivo binario.
+    :param chunksize: Número de filas por trozo.
+    :param config: Configuración opcional para pd.read_csv.
+    :return: Un iterador de DataFrames.
+    :raises: Exception para errores de decodificación o lectura.
+    """
+    try:
+        yield from iter_delimited_chunks(source, chunksize=chunksize, config=config)
+    except UnicodeDecodeError as e:
+        raise Exception(f"Error de codificación al procesar el archivo CSV. Error: {e}")
+    except pd.errors.EmptyDataError:
+        return
+    except Exception as e:
+        raise Exception(f"Error al leer el contenido del archivo CSV: {e}")
@@ -0,0 +1,142 @@
+import pandas as pd
+import io
+import fnmatch
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import python_calamine  # noqa: F401 -- motor 'calamine' de pd.read_excel (pandas >= 2.2)
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+# --- Configuración ---
+# Motor de lectura: calamine (Rust) si está instalado; si no, pandas elige el suyo
+# (openpyxl en modo read_only para .xlsx, xlrd para .xls).
+EXCEL_ENGINE = os.getenv("SADI_EXCEL_ENGINE") or ('calamine' if CALAMINE_AVAILABLE else None)
+# Procesos que leen hojas de un mismo libro a la vez (1 = secuencial).
+EXCEL_MAX_WORKERS = int(os.getenv("SADI_EXCEL_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Por debajo de este tamaño, arrancar procesos cuesta más que leer las hojas en serie.
+EXCEL_PARALLEL_MIN_BYTES = int(os.getenv("SADI_EXCEL_PARALLEL_MIN_BYTES", str(4 * 1024 * 1024)))
+# Patrones (estilo fnmatch, separados por comas) de las hojas a cargar; vacío = todas.
+EXCEL_SHEETS = [pattern.strip() for pattern in os.getenv("SADI_EXCEL_SHEETS", "").split(",") if pattern.strip()]
+EXCEL_MP_START_METHOD = os.getenv("SADI_ETL_MP_START_METHOD", "spawn")
+
+# Un libro puede llegar como bytes o como ruta en disco.
+ExcelSource = Union[bytes, str, os.PathLike]
+
+def _as_readable(source: ExcelSource):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+def _source_size(source: ExcelSource) -> int:
+    return len(source) if isinstance(source, (bytes, bytearray, memoryview)) else os.path.getsize(source)
+
+def list_excel_sheets(source: ExcelSource, engine: Optional[str] = EXCEL_ENGINE) -> List[str]:
+    """Devuelve los nombres de las hojas del libro, en orden, sin leer su contenido."""
+    with pd.ExcelFile(_as_readable(source), engine=engine) as workbook:
+        return list(workbook.sheet_names)
+
+def select_sheets(sheet_names: Sequence[str], patterns: Optional[Sequence[str]]) -> List[str]:
+    """Filtra los nombres de hoja con patrones fnmatch; sin patrones se conservan todas."""
+    if not patterns:
+        return list(sheet_names)
+    return [name for name in sheet_names if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)]
+
+def _read_sheet(source: ExcelSource, sheet_name: str, engine: Optional[str]) -> pd.DataFrame:
+    return pd.read_excel(_as_readable(source), sheet_name=sheet_name, engine=engine)
+
+def _create_executor(max_workers: int) -> Executor:
+    # Los procesos daemon no pueden tener hijos; en ellos se usan hilos. Tampoco
+    # se arrancan procesos desde otro pool (p. ej. los workers del ETL, uno por
+    # CPU): serían hasta cpu_count * EXCEL_MAX_WORKERS procesos compitiendo.
+    if multiprocessing.current_process().daemon or multiprocessing.parent_process() is not None:
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="excel-sheet")
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(EXCEL_MP_START_METHOD)
+    )
+
+def iter_excel_sheets(
+    source: ExcelSource,
+    sheets: Optional[Sequence[str]] = None,
+    max_workers: int = None,
+    ordered: bool = False,
+    engine: Optional[str] = EXCEL_ENGINE
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Lee las hojas de un libro Excel y devuelve cada una en cuanto termina de leerse.
+
+    Las hojas se filtran por nombre antes de leerlas. En libros grandes con
+    varias hojas, cada hoja se lee en un proceso propio (hasta `max_workers` a
+    la vez; en hilos si el llamador ya es un worker de otro pool) y se devuelven por orden de finalización, o por el orden del libro
+    si `ordered` es True. Como mucho hay 2 * `max_workers` hojas leyéndose o
+    leídas a la espera de ser consumidas.
+
+    :param source: Contenido del libro en bytes o ruta al archivo.
+    :param sheets: Patrones fnmatch de las hojas a leer; por defecto, EXCEL_SHEETS (vacío = todas).
+    :param max_workers: Hojas que se leen en paralelo; por defecto, EXCEL_MAX_WORKERS.
+    :param ordered: Devolver las hojas en el orden del libro en lugar del de finalización.
+    :param engine: Motor de pd.read_excel; por defecto, calamine si está instalado.
+    :return: Un iterador de tuplas (nombre de la hoja, DataFrame).
+    """
+    sheet_names = select_sheets(list_excel_sheets(source, engine), EXCEL_SHEETS if sheets is None else sheets)
+    max_workers = min(max_workers or EXCEL_MAX_WORKERS, len(sheet_names))
+    if max_workers <= 1 or _source_size(source) < EXCEL_PARALLEL_MIN_BYTES:
+        for sheet_name in sheet_names:
+            yield sheet_name, _read_sheet(source, sheet_name, engine)
+        return
+
+    spool_dir = None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        # Los workers reciben la ruta en lugar de una copia del libro por hoja.
+        spool_dir = tempfile.mkdtemp(prefix="sadi-excel-")
+        path = os.path.join(spool_dir, "libro")
+        with open(path, 'wb') as f:
+            f.write(source)
+        source = path
+
+    executor = _create_executor(max_workers)
+    try:
+        running = {}
+        finished: Dict[int, pd.DataFrame] = {}
+        next_submit = next_yield = 0
+        while next_yield < len(sheet_names):
+            while (next_submit < len(sheet_names) and len(running) < max_workers
+                   and len(running) + len(finished) < 2 * max_workers):
+                running[executor.submit(_read_sheet, source, sheet_names[next_submit], engine)] = next_submit
+                next_submit += 1
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[running.pop(future)] = future.result()
+            ready = [next_yield] if ordered else sorted(finished)
+            while ready and ready[0] in finished:
+                position = ready.pop(0)
+                next_yield += 1
+                if ordered:
+                    ready.append(next_yield)
+                yield sheet_names[position], finished.pop(position)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if spool_dir is not None:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+def load_excel(file_content: bytes, sheets: Optional[Sequence[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Carga datos desde el contenido en bytes de un archivo Excel.
+    Si el archivo tiene múltiples hojas, las devuelve todas como un diccionario de DataFrames.
+
+    :param file_content: Contenido del archivo Excel en bytes.
+    :param sheets: Patrones fnmatch de las hojas a cargar (ver iter_excel_sheets).
+    :return: Un diccionario donde las claves son los nombres de las hojas y los valores son los DataFrames.
+    :raises: Exception para errores de lectura.
+    """
+    try:
+        return dict(iter_excel_sheets(file_content, sheets=sheets, ordered=True))
+    except Exception as e:
+        raise Exception(f"Error al leer el contenido del archivo Excel: {e}")
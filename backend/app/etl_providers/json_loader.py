@@ -0,0 +1,253 @@
+import pandas as pd
+import pyarrow as pa
+import codecs
+import io
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+
+from .csv_loader import CsvSource, DEFAULT_CHUNK_ROWS
+
+# Niveles de anidamiento que se aplanan en columnas 'padre.hijo' al leer por
+# trozos; vacío = todos. Los valores que siguen anidados se guardan como texto JSON.
+_max_level = os.getenv("SADI_JSON_FLATTEN_MAX_LEVEL", "")
+JSON_FLATTEN_MAX_LEVEL: Optional[int] = int(_max_level) if _max_level else None
+# Bytes que se leen del archivo en cada paso del análisis incremental.
+JSON_READ_BLOCK_BYTES = int(os.getenv("SADI_JSON_READ_BLOCK_BYTES", str(1024 * 1024)))
+
+@contextmanager
+def _open_binary(source: CsvSource):
+    """Abre la fuente como flujo binario; los objetos de archivo se usan sin cerrarlos."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield f
+    else:
+        yield source
+
+def _to_json_text(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+def _key_paths(records: List[dict]) -> Dict[str, int]:
+    """Posición de cada ruta de claves ('padre', 'padre.hijo'...) por orden de aparición."""
+    paths: Dict[str, int] = {}
+
+    def visit(record: dict, prefix: str):
+        for key, value in record.items():
+            path = f"{prefix}{key}"
+            paths.setdefault(path, len(paths))
+            if isinstance(value, dict):
+                visit(value, f"{path}.")
+
+    for record in records:
+        visit(record, '')
+    return paths
+
+def records_to_frame(records: List[Any], max_level: Optional[int] = JSON_FLATTEN_MAX_LEVEL) -> pd.DataFrame:
+    """
+    Convierte una lista de registros JSON en un DataFrame plano.
+
+    Los objetos anidados se aplanan en columnas 'padre.hijo' hasta `max_level`
+    niveles, igual que flatten_table con Arrow: un objeto nulo no genera
+    columna propia si otros registros lo traen con claves. Las listas y los
+    objetos por debajo de `max_level` se guardan como texto JSON, de modo que
+    toda celda es un valor escalar.
+    """
+    if not records or not all(isinstance(record, dict) for record in records):
+        return pd.DataFrame({'valor': [_to_json_text(record) for record in records]})
+    df = pd.json_normalize(records, max_level=max_level)
+    # json_normalize deja las columnas aplanadas al final; Arrow, en su sitio.
+    key_order = _key_paths(records)
+    df = df[sorted(df.columns, key=lambda name: key_order.get(name, len(key_order)))]
+    flattened_parents = {name.rsplit('.', 1)[0] for name in df.columns if '.' in name}
+    empty_parents = [name for name in df.columns if name in flattened_parents and df[name].isna().all()]
+    if empty_parents:
+        df = df.drop(columns=empty_parents)
+    for name in df.columns[df.dtypes == object]:
+        column = df[name]
+        if column.map(lambda value: isinstance(value, (dict, list))).any():
+            df[name] = column.map(_to_json_text)
+    return df
+
+def drop_flattened_parents(df: pd.DataFrame, seen_columns: set) -> pd.DataFrame:
+    """
+    Quita las columnas sin valores que en trozos anteriores ya se aplanaron en
+    columnas hijas ('cliente' si ya existe 'cliente.nombre'), para que todos los
+    trozos de una fuente compartan columnas. Registra las columnas en `seen_columns`.
+    """
+    seen_parents = {name.rsplit('.', 1)[0] for name in seen_columns if '.' in name}
+    empty_parents = [name for name in df.columns if name in seen_parents and df[name].isna().all()]
+    if empty_parents:
+        df = df.drop(columns=empty_parents)
+    seen_columns.update(df.columns)
+    return df
+
+def flatten_table(table: pa.Table, max_level: Optional[int] = JSON_FLATTEN_MAX_LEVEL) -> pa.Table:
+    """
+    Aplana las columnas struct de una tabla de Arrow en columnas 'padre.hijo'
+    hasta `max_level` niveles; las listas y los struct restantes pasan a texto JSON.
+    """
+    level = 0
+    while (max_level is None or level < max_level) and any(pa.types.is_struct(field.type) for field in table.schema):
+        table = table.flatten()
+        level += 1
+    for i, field in enumerate(table.schema):
+        if pa.types.is_nested(field.type):
+            values = [_to_json_text(value) for value in table.column(i).to_pylist()]
+            table = table.set_column(i, field.name, pa.array(values, pa.string()))
+    return table
+
+def iter_json_array(stream, block_bytes: int = JSON_READ_BLOCK_BYTES) -> Iterator[Any]:
+    """
+    Recorre los elementos de un array JSON de nivel superior leyendo el flujo por bloques.
+
+    Cada elemento se decodifica con json.JSONDecoder.raw_decode sobre un buffer
+    que solo retiene el texto aún no analizado, de modo que la memoria depende
+    del tamaño de un elemento y no del archivo.
+
+    :param stream: Flujo binario en UTF-8 posicionado al inicio del documento.
+    :raises ValueError: Si el documento no es un array JSON o está mal formado.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer, position, eof = '', 0, False
+
+    def read_more(size: int) -> bool:
+        nonlocal buffer, position, eof
+        if eof:
+            return False
+        block = stream.read(size)
+        eof = not block
+        buffer = buffer[position:] + text_decoder.decode(block, final=eof)
+        position = 0
+        return True
+
+    def next_char() -> str:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or not read_more(block_bytes):
+                return buffer[position] if position < len(buffer) else ''
+
+    if next_char() != '[':
+        raise ValueError("El documento JSON no es un array de registros.")
+    position += 1
+    if next_char() == ']':
+        return
+    while True:
+        read_size = block_bytes
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                # Un número o literal al final del buffer podría continuar en el siguiente bloque.
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            read_more(read_size)
+            # Los elementos grandes necesitan bloques cada vez mayores.
+            read_size *= 2
+        position = end
+        yield item
+        separator = next_char()
+        position += 1
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError(f"Separador inesperado {separator!r} en el array JSON.")
+        next_char()
+
+def iter_json_chunks(
+    source: CsvSource,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    config: Dict[str, Any] = None,
+    max_level: Optional[int] = JSON_FLATTEN_MAX_LEVEL
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee un array JSON de registros por trozos de `chunksize` filas, con memoria acotada.
+
+    Los registros se aplanan con records_to_frame. Un documento cuyo nivel
+    superior no es un array (p. ej. un objeto en orient='columns') no admite
+    lectura incremental: se carga completo con pd.read_json y `config`, y se
+    devuelve por trozos.
+
+    :param source: Contenido en bytes, ruta al archivo u objeto de archivo binario.
+    :param chunksize: Número de registros por trozo.
+    :param config: Configuración opcional para pd.read_json (solo para documentos que no son arrays).
+    :param max_level: Niveles de anidamiento a aplanar; por defecto, JSON_FLATTEN_MAX_LEVEL.
+    :return: Un iterador de DataFrames.
+    :raises: Exception para errores de decodificación o lectura.
+    """
+    rows_done = 0
+    seen_columns = set()
+    try:
+        with _open_binary(source) as stream:
+            start = stream.tell() if stream.seekable() else None
+            records = []
+            try:
+                for record in iter_json_array(stream):
+                    records.append(record)
+                    if len(records) == chunksize:
+                        df = drop_flattened_parents(records_to_frame(records, max_level), seen_columns)
+                        df.index = pd.RangeIndex(rows_done, rows_done + len(df))
+                        rows_done += len(df)
+                        records = []
+                        yield df
+            except ValueError:
+                if rows_done or records or start is None:
+                    raise
+                stream.seek(start)
+                df = pd.read_json(io.StringIO(stream.read().decode('utf-8-sig')), **(config or {}))
+                for offset in range(0, len(df), chunksize):
+                    yield df.iloc[offset:offset + chunksize]
+                return
+            if records:
+                df = drop_flattened_parents(records_to_frame(records, max_level), seen_columns)
+                df.index = pd.RangeIndex(rows_done, rows_done + len(df))
+                yield df
+    except UnicodeDecodeError as e:
+        raise Exception(f"Error de codificación al procesar el archivo JSON. Se esperaba UTF-8. Error: {e}")
+    except Exception as e:
+        raise Exception(f"Error al leer el contenido del archivo JSON: {e}")
+
+def load_json(
+    file_content: bytes,
+    config: Dict[str, Any] = None,
+    max_level: Optional[int] = JSON_FLATTEN_MAX_LEVEL
+) -> pd.DataFrame:
+    """
+    Carga datos desde el contenido en bytes de un archivo JSON a un DataFrame de pandas.
+
+    Un array de registros se aplana con records_to_frame, igual que en
+    iter_json_chunks, de modo que un archivo da las mismas columnas se lea
+    completo o por trozos. Los demás documentos se leen con pd.read_json y `config`.
+
+    :param file_content: Contenido del archivo JSON en bytes.
+    :param config: Configuración opcional para la lectura del JSON (e.g., orient, lines).
+    :param max_level: Niveles de anidamiento a aplanar; por defecto, JSON_FLATTEN_MAX_LEVEL.
+    :return: DataFrame de pandas con los datos cargados.
+    :raises: Exception para errores de decodificación o lectura.
+    """
+    config = config or {}
+    try:
+        # Decodificar los bytes a una cadena y usar StringIO
+        content_str = file_content.decode('utf-8-sig')
+        try:
+            document = json.loads(content_str)
+        except ValueError:
+            document = None
+        if isinstance(document, list):
+            # Un array vacío no tiene columnas, como al leerlo por trozos.
+            return records_to_frame(document, max_level) if document else pd.DataFrame()
+        df = pd.read_json(io.StringIO(content_str), **config)
+        return df
+    except UnicodeDecodeError as e:
+        raise Exception(f"Error de codificación al procesar el archivo JSON. Se esperaba UTF-8. Error: {e}")
+    except Exception as e:
+        raise Exception(f"Error al leer el contenido del archivo JSON: {e}")
@@ -0,0 +1,112 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.json as pajson
+import json
+import os
+from typing import Dict, Any, Iterator, List, Optional
+
+from .csv_loader import CsvSource, DEFAULT_CHUNK_ROWS
+from .json_loader import JSON_FLATTEN_MAX_LEVEL, _open_binary, drop_flattened_parents, flatten_table, records_to_frame
+
+# Lector JSON de pyarrow (multihilo) para cada lote de líneas; si se desactiva,
+# o si Arrow no puede leer un lote, se decodifica línea a línea con json.
+JSONL_ARROW_ENABLED = os.getenv("SADI_JSONL_ARROW_ENABLED", "1") == "1"
+# Tamaño de los bloques que pyarrow analiza en paralelo dentro de un lote.
+JSONL_BLOCK_BYTES = int(os.getenv("SADI_JSONL_BLOCK_BYTES", str(4 * 1024 * 1024)))
+
+def _read_lines_with_arrow(lines: List[bytes], max_level: Optional[int]) -> Optional[pd.DataFrame]:
+    """Lee un lote de líneas con pyarrow.json; None si Arrow no puede leerlo igual que json."""
+    try:
+        table = pajson.read_json(
+            pa.BufferReader(b''.join(lines)),
+            read_options=pajson.ReadOptions(use_threads=True, block_size=JSONL_BLOCK_BYTES),
+        )
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # Tipos mezclados en un campo, líneas mayores que un bloque, valores que no son objetos...
+        return None
+    table = flatten_table(table, max_level)
+    if any(pa.types.is_temporal(field.type) for field in table.schema):
+        # Arrow convierte los textos con forma de fecha; json los deja como texto.
+        return None
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def _lines_to_frame(lines: List[bytes], max_level: Optional[int]) -> pd.DataFrame:
+    df = _read_lines_with_arrow(lines, max_level) if JSONL_ARROW_ENABLED else None
+    if df is None:
+        df = records_to_frame([json.loads(line) for line in lines], max_level)
+    return df
+
+def iter_jsonl_chunks(
+    source: CsvSource,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    config: Dict[str, Any] = None,
+    max_level: Optional[int] = JSON_FLATTEN_MAX_LEVEL
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee un archivo JSON Lines por trozos de `chunksize` registros, con memoria acotada.
+
+    Las líneas se agrupan en lotes que se leen con el lector JSON de pyarrow
+    (o con json si Arrow no puede) y se aplanan hasta `max_level` niveles con
+    las mismas reglas que json_loader.records_to_frame. Las líneas vacías se ignoran.
+
+    :param source: Contenido en bytes, ruta al archivo u objeto de archivo binario.
+    :param chunksize: Número de registros por trozo.
+    :param config: Sin uso; se acepta por compatibilidad con los demás lectores por trozos.
+    :param max_level: Niveles de anidamiento a aplanar; por defecto, JSON_FLATTEN_MAX_LEVEL.
+    :return: Un iterador de DataFrames.
+    :raises: Exception para errores de decodificación o lectura.
+    """
+    rows_done = 0
+    seen_columns = set()
+    try:
+        with _open_binary(source) as stream:
+            lines: List[bytes] = []
+            for line in stream:
+                if not line.strip():
+                    continue
+                lines.append(line if line.endswith(b'\n') else line + b'\n')
+                if len(lines) == chunksize:
+                    df = drop_flattened_parents(_lines_to_frame(lines, max_level), seen_columns)
+                    df.index = pd.RangeIndex(rows_done, rows_done + len(df))
+                    rows_done += len(df)
+                    lines = []
+                    yield df
+            if lines:
+                df = drop_flattened_parents(_lines_to_frame(lines, max_level), seen_columns)
+                df.index = pd.RangeIndex(rows_done, rows_done + len(df))
+                yield df
+    except UnicodeDecodeError as e:
+        raise Exception(f"Error de codificación al procesar el archivo JSONL. Se esperaba UTF-8. Error: {e}")
+    except Exception as e:
+        raise Exception(f"Error al leer el contenido del archivo JSONL: {e}")
+
+def load_jsonl(
+    file_content: bytes,
+    config: Dict[str, Any] = None,
+    max_level: Optional[int] = JSON_FLATTEN_MAX_LEVEL
+) -> pd.DataFrame:
+    """
+    Carga datos desde el contenido en bytes de un archivo JSON Lines (JSONL) a un DataFrame.
+
+    Las líneas se leen y aplanan como un único lote de iter_jsonl_chunks, de modo
+    que un archivo da las mismas columnas se lea completo o por trozos.
+
+    :param file_content: Contenido del archivo JSONL en bytes.
+    :param config: Sin uso; se acepta por compatibilidad con los demás cargadores.
+    :param max_level: Niveles de anidamiento a aplanar; por defecto, JSON_FLATTEN_MAX_LEVEL.
+    :return: DataFrame de pandas con los datos cargados.
+    :raises: Exception para errores de decodificación o lectura.
+    """
+    try:
+        lines = [
+            line if line.endswith(b'\n') else line + b'\n'
+            for line in bytes(file_content).splitlines(keepends=True) if line.strip()
+        ]
+        if not lines:
+            return pd.DataFrame()
+        df = _lines_to_frame(lines, max_level)
+        return df
+    except UnicodeDecodeError as e:
+        raise Exception(f"Error de codificación al procesar el archivo JSONL. Se esperaba UTF-8. Error: {e}")
+    except Exception as e:
+        raise Exception(f"Error al leer el contenido del archivo JSONL: {e}")
@@ -0,0 +1,46 @@
+import pandas as pd
+from typing import Dict, Any, Iterator
+
+from .csv_loader import CsvSource, DEFAULT_CHUNK_ROWS, read_delimited, iter_delimited_chunks
+
+def load_tsv(file_content: bytes, config: Dict[str, Any] = None) -> pd.DataFrame:
+    """
+    Carga datos desde el contenido en bytes de un archivo TSV a un DataFrame de pandas.
+
+    Usa el mismo lector que los CSV (ver csv_loader.read_delimited) con '\\t'
+    como separador; la codificación y la cabecera se detectan.
+
+    :param file_content: Contenido del archivo TSV en bytes.
+    :param config: Configuración opcional para la lectura del CSV.
+    :return: DataFrame de pandas con los datos cargados.
+    :raises: Exception para errores de decodificación o lectura.
+    """
+    try:
+        return read_delimited(file_content, config, delimiter='\t')
+    except UnicodeDecodeError as e:
+        raise Exception(f"Error de codificación al procesar el archivo TSV. Error: {e}")
+    except Exception as e:
+        raise Exception(f"Error al leer el contenido del archivo TSV: {e}")
+
+def iter_tsv_chunks(
+    source: CsvSource,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    config: Dict[str, Any] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee un TSV por trozos de `chunksize` filas, con memoria acotada.
+
+    :param source: Contenido en bytes, ruta al archivo u objeto de archivo binario.
+    :param chunksize: Número de filas por trozo.
+    :param config: Configuración opcional para pd.read_csv.
+    :return: Un iterador de DataFrames.
+    :raises: Exception para errores de decodificación o lectura.
+    """
+    try:
+        yield from iter_delimited_chunks(source, chunksize=chunksize, config=config, delimiter='\t')
+    except UnicodeDecodeError as e:
+        raise Exception(f"Error de codificación al procesar el archivo TSV. Error: {e}")
+    except pd.errors.EmptyDataError:
+        return
+    except Exception as e:
+        raise Exception(f"Error al leer el contenido del archivo TSV: {e}")
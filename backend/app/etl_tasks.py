@@ -1,19 +1,79 @@
+import os
+from celery.exceptions import SoftTimeLimitExceeded, WorkerLostError
 from backend.celery_worker import celery_app
-from backend.app.services.etl_multisource_service import run_etl_pipeline
-from typing import Dict, Any
+from backend.app.services.etl_multisource_service import TRANSIENT_ERRORS, changed_failed_inputs, run_full_etl_process
+from backend.app.services.state_store import get_state_store
+from typing import Dict, Any, Optional
 
-@celery_app.task(name='app.run_etl_pipeline_task')
-def run_etl_pipeline_task(config: Dict[str, Any]) -> str:
+# Reintentos automáticos de una tarea ETL con errores transitorios. Cada
+# reintento reanuda el trabajo desde sus puntos de control en lugar de empezar de cero.
+ETL_TASK_MAX_RETRIES = int(os.getenv("SADI_ETL_TASK_MAX_RETRIES", "3"))
+ETL_TASK_RETRY_DELAY_SECONDS = int(os.getenv("SADI_ETL_TASK_RETRY_DELAY_SECONDS", "30"))
+# Excepciones de la ejecución completa que justifican un reintento; cualquier
+# otra (p. ej. un error de programación) hace fallar la tarea de inmediato.
+ETL_TASK_RETRY_ERRORS = TRANSIENT_ERRORS + (WorkerLostError, SoftTimeLimitExceeded)
+
+class EtlJobFailedError(Exception):
+    """Uno o más archivos de un trabajo ETL fallaron; `errors` asocia cada fuente a su error."""
+    def __init__(self, job_id: str, errors: Dict[str, str]):
+        # Los argumentos se pasan tal cual para que la excepción se pueda serializar con pickle.
+        super().__init__(job_id, errors)
+        self.job_id = job_id
+        self.errors = errors
+
+    def __str__(self) -> str:
+        return f"El trabajo ETL '{self.job_id}' no procesó {len(self.errors)} fuente(s): {self.errors}"
+
+# acks_late + reject_on_worker_lost: si el worker muere a mitad del trabajo, el
+# mensaje vuelve a la cola y otro worker lo reanuda con el mismo job_id.
+@celery_app.task(
+    name='app.run_etl_pipeline_task',
+    bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    max_retries=ETL_TASK_MAX_RETRIES,
+    default_retry_delay=ETL_TASK_RETRY_DELAY_SECONDS
+)
+def run_etl_pipeline_task(self, file_paths: Dict[str, str], job_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Tarea de Celery para ejecutar el pipeline ETL multi-fuente de forma asíncrona.
 
-    :param config: El diccionario de configuración para el trabajo ETL.
-    :return: El resultado de la ejecución del pipeline (mensaje de éxito o error).
+    El avance se registra en el StateStore con el job_id (por defecto, el id de
+    la tarea, que se conserva entre reintentos), de modo que un reintento o una
+    nueva entrega solo procesa los archivos que no se completaron. El avance se
+    puede consultar mientras se ejecuta con get_etl_job_progress.
+
+    run_full_etl_process anota los errores de cada archivo en su resultado sin
+    lanzar excepciones; aquí se convierten en EtlJobFailedError. La tarea solo
+    se reintenta (procesando solo los archivos fallidos) si el fallo puede no
+    repetirse: un error transitorio (ETL_TASK_RETRY_ERRORS, o un archivo marcado
+    'transient') o un archivo fallido cuyo contenido cambió desde que se
+    procesó. Un archivo que no se puede leer, sin cambios, falla de inmediato.
+
+    :param file_paths: Diccionario nombre de archivo -> ruta en disco compartida con el worker.
+    :param job_id: Identificador del trabajo; reutilizar uno anterior reanuda ese trabajo.
+    :return: El resultado de run_full_etl_process.
+    :raises EtlJobFailedError: Si alguna fuente falla y no procede reintentar, o tras el último reintento.
     """
+    job_id = job_id or self.request.id
     try:
-        result_message = run_etl_pipeline(config)
-        return result_message
-    except Exception as e:
-        # Celery manejará el rastreo de la excepción.
-        # Opcionalmente, se puede registrar de nuevo aquí o realizar acciones de limpieza.
-        return f"La tarea ETL falló: {e}"
+        result = run_full_etl_process(file_paths, job_id=job_id)
+    except ETL_TASK_RETRY_ERRORS as e:
+        # Con max_retries agotados, retry vuelve a lanzar `e` y Celery registra el fallo.
+        raise self.retry(exc=e)
+    failures = {
+        name: outcome for name, outcome in result["individual_files"].items() if isinstance(outcome, dict)
+    }
+    if failures:
+        error = EtlJobFailedError(job_id, {name: outcome["error"] for name, outcome in failures.items()})
+        if any(outcome.get("transient") for outcome in failures.values()) or changed_failed_inputs(job_id, file_paths):
+            raise self.retry(exc=error)
+        raise error
+    return result
+
+def get_etl_job_progress(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Devuelve el estado de un trabajo ETL: archivos procesados / totales y bytes
+    procesados / totales, o None si el trabajo no existe.
+    """
+    return get_state_store().get_etl_job_progress(job_id)
@@ -1,36 +1,360 @@
 import zipfile
 import tarfile
+import tempfile
+import bz2
+import gzip
 import io
-from typing import Dict
+import lzma
+import os
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple, Union
 
-def decompress_files(filename: str, file_content: bytes) -> Dict[str, bytes]:
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# --- Límites de Extracción ---
+# Protegen contra archivos comprimidos maliciosos ("zip bombs") y contra
+# extracciones que agoten la memoria o el disco.
+ARCHIVE_MAX_MEMBER_BYTES = int(os.getenv("SADI_ARCHIVE_MAX_MEMBER_BYTES", str(4 * 1024 ** 3)))
+ARCHIVE_MAX_TOTAL_BYTES = int(os.getenv("SADI_ARCHIVE_MAX_TOTAL_BYTES", str(16 * 1024 ** 3)))
+ARCHIVE_MAX_COMPRESSION_RATIO = float(os.getenv("SADI_ARCHIVE_MAX_COMPRESSION_RATIO", "100"))
+# La relación de compresión solo se evalúa a partir de este volumen: los
+# archivos pequeños y repetitivos comprimen legítimamente muy por encima del límite.
+ARCHIVE_RATIO_MIN_BYTES = int(os.getenv("SADI_ARCHIVE_RATIO_MIN_BYTES", str(10 * 1024 ** 2)))
+# Niveles de archivos comprimidos anidados que se extraen.
+ARCHIVE_MAX_DEPTH = int(os.getenv("SADI_ARCHIVE_MAX_DEPTH", "3"))
+# Los miembros de hasta este tamaño se mantienen en memoria; los mayores se
+# vuelcan a un archivo temporal en disco.
+ARCHIVE_SPOOL_MEMORY_BYTES = int(os.getenv("SADI_ARCHIVE_SPOOL_MEMORY_BYTES", str(32 * 1024 ** 2)))
+COPY_BLOCK_BYTES = 1024 * 1024
+
+ZIP_EXTENSIONS = ('.zip',)
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+ARCHIVE_EXTENSIONS = ZIP_EXTENSIONS + TAR_EXTENSIONS
+
+# Compresión de un único archivo ('ventas.csv.gz'): códec -> (bytes mágicos, extensiones).
+COMPRESSION_CODECS = {
+    'gzip': (b'\x1f\x8b', ('.gz', '.gzip')),
+    'bz2': (b'BZh', ('.bz2',)),
+    'xz': (b'\xfd7zXZ\x00', ('.xz',)),
+    'zstd': (b'\x28\xb5\x2f\xfd', ('.zst', '.zstd')),
+}
+
+ArchiveSource = Union[bytes, str, os.PathLike, BinaryIO]
+
+class ArchiveLimitError(ValueError):
+    """Se lanza cuando un archivo comprimido supera alguno de los límites de extracción."""
+
+def is_archive(filename: str) -> bool:
+    """Indica si el nombre corresponde a un formato de archivo comprimido soportado."""
+    return filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+def _read_head(source: ArchiveSource, size: int = 8) -> bytes:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:size])
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(size)
+    position = source.tell()
+    head = source.read(size)
+    source.seek(position)
+    return head
+
+def detect_compression(filename: str, source: Optional[ArchiveSource] = None) -> Optional[str]:
     """
-    Descomprime un archivo ZIP o TAR.GZ en memoria.
+    Devuelve el códec de compresión de un único archivo ('gzip', 'bz2', 'xz' o
+    'zstd'), o None si no está comprimido o es un ZIP/TAR (ver is_archive).
 
-    :param filename: El nombre del archivo original, para determinar el tipo de compresión.
-    :param file_content: El contenido del archivo comprimido en bytes.
-    :return: Un diccionario donde las claves son los nombres de los archivos extraídos
-             y los valores son su contenido en bytes.
-    :raises: ValueError si el tipo de archivo no está soportado.
+    Los bytes mágicos del contenido, si se proporciona, prevalecen sobre la extensión.
+    """
+    if is_archive(filename):
+        return None
+    if source is not None:
+        head = _read_head(source)
+        for codec, (magic, _) in COMPRESSION_CODECS.items():
+            if head.startswith(magic):
+                return codec
+    lower_name = filename.lower()
+    for codec, (_, extensions) in COMPRESSION_CODECS.items():
+        if lower_name.endswith(extensions):
+            return codec
+    return None
+
+def strip_compression_extension(filename: str) -> str:
+    """Quita la extensión de compresión: 'ventas.csv.gz' -> 'ventas.csv'."""
+    lower_name = filename.lower()
+    for _, extensions in COMPRESSION_CODECS.values():
+        for extension in extensions:
+            if lower_name.endswith(extension):
+                return filename[:-len(extension)]
+    return filename
+
+class _DecompressedReader(io.RawIOBase):
+    """
+    Flujo descomprimido de un archivo con compresión de un único archivo.
+
+    Descomprime a medida que se lee, aplicando los mismos límites de tamaño y
+    de relación de compresión que la extracción de archivos comprimidos. Admite
+    seek: hacia delante descarta bytes y hacia atrás vuelve a descomprimir desde
+    el principio, lo que permite a los lectores detectar el formato con un
+    prefijo y reintentar si es necesario.
+    """
+    def __init__(self, source: ArchiveSource, codec: str, max_bytes: int, max_ratio: float):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._compressed, self._owned = io.BytesIO(source), True
+        elif isinstance(source, (str, os.PathLike)):
+            self._compressed, self._owned = open(source, 'rb'), True
+        else:
+            self._compressed, self._owned = source, False
+        self._start = self._compressed.tell()
+        self._compressed_bytes = max(_source_size(self._compressed) - self._start, 1)
+        self._codec = codec
+        self._max_bytes = max_bytes
+        self._max_ratio = max_ratio
+        self._stream = None
+        self._position = 0
+        self._open()
+
+    def _open(self):
+        if self._stream is not None:
+            self._stream.close()
+        self._compressed.seek(self._start)
+        if self._codec == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._compressed, mode='rb')
+        elif self._codec == 'bz2':
+            self._stream = bz2.BZ2File(self._compressed, mode='rb')
+        elif self._codec == 'xz':
+            self._stream = lzma.LZMAFile(self._compressed, mode='rb')
+        elif self._codec == 'zstd':
+            if zstandard is None:
+                raise ValueError("La descompresión zstd requiere el paquete 'zstandard'.")
+            # Sin read_across_frames la lectura termina en el primer frame (pzstd,
+            # zstd --long o frames concatenados escriben varios).
+            self._stream = zstandard.ZstdDecompressor().stream_reader(
+                self._compressed, closefd=False, read_across_frames=True
+            )
+        else:
+            raise ValueError(f"Códec de compresión no soportado: {self._codec}")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self._position += size
+        if self._position > self._max_bytes:
+            raise ArchiveLimitError(f"El archivo descomprimido supera el límite de {self._max_bytes} bytes.")
+        if self._position >= ARCHIVE_RATIO_MIN_BYTES and self._position / self._compressed_bytes > self._max_ratio:
+            raise ArchiveLimitError(f"El archivo supera la relación de compresión máxima de {self._max_ratio}.")
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("Solo se admite seek desde el inicio o la posición actual.")
+        if offset < self._position:
+            self._open()
+        while self._position < offset:
+            skipped = self.read(min(COPY_BLOCK_BYTES, offset - self._position))
+            if not skipped:
+                break
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            if self._stream is not None:
+                self._stream.close()
+            if self._owned:
+                self._compressed.close()
+        super().close()
+
+def open_compressed(
+    source: ArchiveSource,
+    codec: str,
+    max_bytes: int = ARCHIVE_MAX_MEMBER_BYTES,
+    max_compression_ratio: float = ARCHIVE_MAX_COMPRESSION_RATIO
+) -> BinaryIO:
+    """
+    Abre un archivo con compresión de un único archivo como flujo binario descomprimido.
+
+    El contenido nunca se descomprime completo en memoria ni en disco: los
+    lectores por trozos lo consumen directamente del flujo.
+
+    :param source: Contenido comprimido en bytes, ruta al archivo u objeto de archivo con acceso aleatorio.
+    :param codec: Códec devuelto por detect_compression.
+    :param max_bytes: Tamaño descomprimido máximo.
+    :param max_compression_ratio: Relación máxima entre bytes descomprimidos y comprimidos.
+    :return: Un objeto de archivo binario con buffer (admite seek, ver _DecompressedReader).
+    :raises: ArchiveLimitError al leer, si se supera algún límite.
     """
-    extracted_files = {}
+    return io.BufferedReader(
+        _DecompressedReader(source, codec, max_bytes, max_compression_ratio),
+        buffer_size=COPY_BLOCK_BYTES
+    )
+
+class _ExtractionBudget:
+    """Contabiliza los bytes extraídos de un archivo (y sus anidados) frente a los límites."""
+
+    def __init__(self, archive_bytes: int, max_member_bytes: int, max_total_bytes: int, max_ratio: float):
+        self.archive_bytes = max(archive_bytes, 1)
+        self.max_member_bytes = max_member_bytes
+        self.max_total_bytes = max_total_bytes
+        self.max_ratio = max_ratio
+        self.total_bytes = 0
 
-    if filename.lower().endswith('.zip'):
-        with zipfile.ZipFile(io.BytesIO(file_content)) as zf:
-            for name in zf.namelist():
+    def check_declared(self, name: str, size: int, compressed_size: int):
+        """Rechaza un miembro por su tamaño declarado antes de descomprimirlo."""
+        if size > self.max_member_bytes:
+            raise ArchiveLimitError(f"El miembro '{name}' declara {size} bytes, más del límite de {self.max_member_bytes}.")
+        if size >= ARCHIVE_RATIO_MIN_BYTES and size / max(compressed_size, 1) > self.max_ratio:
+            raise ArchiveLimitError(f"El miembro '{name}' supera la relación de compresión máxima de {self.max_ratio}.")
+
+    def spool(self, name: str, stream: BinaryIO, compressed_size: Optional[int] = None) -> BinaryIO:
+        """
+        Copia un miembro a un archivo temporal (en memoria hasta ARCHIVE_SPOOL_MEMORY_BYTES)
+        comprobando los límites con los bytes realmente descomprimidos, ya que los
+        tamaños declarados en la cabecera pueden ser falsos.
+        """
+        spooled = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_MEMORY_BYTES)
+        written = 0
+        try:
+            while True:
+                block = stream.read(COPY_BLOCK_BYTES)
+                if not block:
+                    break
+                written += len(block)
+                self.total_bytes += len(block)
+                if written > self.max_member_bytes:
+                    raise ArchiveLimitError(f"El miembro '{name}' supera el límite de {self.max_member_bytes} bytes.")
+                if self.total_bytes > self.max_total_bytes:
+                    raise ArchiveLimitError(f"La extracción supera el límite total de {self.max_total_bytes} bytes.")
+                if compressed_size is not None and written >= ARCHIVE_RATIO_MIN_BYTES \
+                        and written / max(compressed_size, 1) > self.max_ratio:
+                    raise ArchiveLimitError(f"El miembro '{name}' supera la relación de compresión máxima de {self.max_ratio}.")
+                if self.total_bytes >= ARCHIVE_RATIO_MIN_BYTES and self.total_bytes / self.archive_bytes > self.max_ratio:
+                    raise ArchiveLimitError(f"El archivo supera la relación de compresión máxima de {self.max_ratio}.")
+                spooled.write(block)
+            spooled.seek(0)
+            return spooled
+        except BaseException:
+            spooled.close()
+            raise
+
+def _source_size(fileobj: BinaryIO) -> int:
+    position = fileobj.tell()
+    size = fileobj.seek(0, io.SEEK_END)
+    fileobj.seek(position)
+    return size
+
+def _iter_raw_members(filename: str, fileobj: BinaryIO, budget: _ExtractionBudget) -> Iterator[Tuple[str, BinaryIO]]:
+    """Recorre los miembros de un único nivel de archivo comprimido, ya volcados a disco/memoria."""
+    lower_name = filename.lower()
+    if lower_name.endswith(ZIP_EXTENSIONS):
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in zf.infolist():
                 # Omitir directorios o archivos __MACOSX
-                if not name.endswith('/') and '__MACOSX' not in name:
-                    extracted_files[name] = zf.read(name)
+                if info.is_dir() or '__MACOSX' in info.filename:
+                    continue
+                budget.check_declared(info.filename, info.file_size, info.compress_size)
+                with zf.open(info) as member:
+                    yield info.filename, budget.spool(info.filename, member, info.compress_size)
 
-    elif filename.lower().endswith(('.tar.gz', '.tgz')):
-        with tarfile.open(fileobj=io.BytesIO(file_content), mode='r:gz') as tf:
-            for member in tf.getmembers():
-                if member.isfile():
-                    f = tf.extractfile(member)
-                    if f:
-                        extracted_files[member.name] = f.read()
+    elif lower_name.endswith(TAR_EXTENSIONS):
+        # Modo flujo ('r|*'): los miembros se leen en orden sin volver atrás.
+        with tarfile.open(fileobj=fileobj, mode='r|*') as tf:
+            for member in tf:
+                if not member.isfile():
+                    continue
+                budget.check_declared(member.name, member.size, budget.archive_bytes)
+                f = tf.extractfile(member)
+                if f:
+                    yield member.name, budget.spool(member.name, f)
 
     else:
         raise ValueError(f"Tipo de archivo comprimido no soportado: {filename}")
 
-    return extracted_files
+def _iter_members(
+    filename: str, fileobj: BinaryIO, budget: _ExtractionBudget, depth: int, max_depth: int, prefix: str = ""
+) -> Iterator[Tuple[str, BinaryIO]]:
+    for name, handle in _iter_raw_members(filename, fileobj, budget):
+        try:
+            if is_archive(name):
+                if depth >= max_depth:
+                    raise ArchiveLimitError(f"'{prefix}{name}' supera la profundidad máxima de anidamiento ({max_depth}).")
+                # El miembro ya está volcado, así que el archivo anidado se lee directamente de él.
+                yield from _iter_members(name, handle, budget, depth + 1, max_depth, prefix=f"{prefix}{name}/")
+            else:
+                yield f"{prefix}{name}", handle
+        finally:
+            handle.close()
+
+def iter_archive_members(
+    filename: str,
+    source: ArchiveSource,
+    max_member_bytes: int = ARCHIVE_MAX_MEMBER_BYTES,
+    max_total_bytes: int = ARCHIVE_MAX_TOTAL_BYTES,
+    max_compression_ratio: float = ARCHIVE_MAX_COMPRESSION_RATIO,
+    max_depth: int = ARCHIVE_MAX_DEPTH
+) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Recorre de forma perezosa los archivos contenidos en un ZIP o TAR.
+
+    Cada miembro se vuelca a un archivo temporal (en memoria si es pequeño) y se
+    entrega como un objeto de archivo binario posicionado al inicio. El objeto solo
+    es válido hasta pedir el siguiente miembro, momento en que se cierra. Los
+    archivos comprimidos anidados se recorren recursivamente y sus miembros se
+    nombran 'externo.zip/interno.csv'.
+
+    :param filename: El nombre del archivo original, para determinar el tipo de compresión.
+    :param source: Contenido en bytes, ruta al archivo u objeto de archivo binario con acceso aleatorio.
+    :param max_member_bytes: Tamaño descomprimido máximo de un miembro.
+    :param max_total_bytes: Tamaño descomprimido máximo de todos los miembros juntos.
+    :param max_compression_ratio: Relación máxima entre bytes descomprimidos y comprimidos.
+    :param max_depth: Niveles máximos de archivos comprimidos anidados.
+    :return: Un iterador de tuplas (nombre del miembro, objeto de archivo).
+    :raises: ArchiveLimitError si se supera algún límite.
+    :raises: ValueError si el tipo de archivo no está soportado.
+    """
+    if not is_archive(filename):
+        raise ValueError(f"Tipo de archivo comprimido no soportado: {filename}")
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        fileobj, owned = io.BytesIO(source), True
+    elif isinstance(source, (str, os.PathLike)):
+        fileobj, owned = open(source, 'rb'), True
+    else:
+        fileobj, owned = source, False
+
+    try:
+        budget = _ExtractionBudget(_source_size(fileobj), max_member_bytes, max_total_bytes, max_compression_ratio)
+        yield from _iter_members(filename, fileobj, budget, depth=0, max_depth=max_depth)
+    finally:
+        if owned:
+            fileobj.close()
+
+def decompress_files(filename: str, file_content: bytes) -> Dict[str, bytes]:
+    """
+    Descomprime un archivo ZIP o TAR.GZ en memoria.
+
+    Conservado por compatibilidad: carga todos los miembros a la vez. Para
+    archivos grandes, usar iter_archive_members.
+
+    :param filename: El nombre del archivo original, para determinar el tipo de compresión.
+    :param file_content: El contenido del archivo comprimido en bytes.
+    :return: Un diccionario donde las claves son los nombres de los archivos extraídos
+             y los valores son su contenido en bytes.
+    :raises: ValueError si el tipo de archivo no está soportado.
+    :raises: ArchiveLimitError si se supera algún límite de extracción.
+    """
+    return {name: handle.read() for name, handle in iter_archive_members(filename, file_content)}
@@ -1,9 +1,26 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple, Union
+
+from backend.app.services.row_deduplicator import RowDeduplicator
 
 # --- Constantes de Exportación ---
 OUTPUT_DIRECTORY = "data/processed"
+# Filas por lote al volcar fuentes en el dataset unificado.
+UNIFY_BATCH_ROWS = int(os.getenv("SADI_UNIFY_BATCH_ROWS", "65536"))
+# Clave de los metadatos del esquema Parquet con la procedencia de cada columna.
+PROVENANCE_METADATA_KEY = b"sadi.provenance"
+# Tipo de las columnas cuyos tipos no se pueden unificar: sus valores se guardan
+# como texto (los anidados, como JSON) en lugar de hacer fallar la unificación.
+FALLBACK_TYPE = pa.large_string()
+
+# Una fuente a unificar: un DataFrame en memoria o la ruta a un archivo Parquet.
+UnifySource = Union[pd.DataFrame, str, os.PathLike]
 
 def unify_dataframes(dataframes: List[pd.DataFrame]) -> pd.DataFrame:
     """
@@ -15,30 +32,493 @@ def unify_dataframes(dataframes: List[pd.DataFrame]) -> pd.DataFrame:
     unified_df = pd.concat(dataframes, ignore_index=True)
     return unified_df
 
-def export_data(df: pd.DataFrame, output_filename: str, config: Dict[str, Any] = None) -> str:
+# --- Unificación con Esquema Arrow ---
+
+def _unwrap(data_type: pa.DataType) -> pa.DataType:
+    """Las columnas categóricas se unifican por el tipo de sus valores."""
+    return data_type.value_type if pa.types.is_dictionary(data_type) else data_type
+
+def promote_types(left: pa.DataType, right: pa.DataType) -> pa.DataType:
+    """
+    Devuelve el tipo común de dos tipos de Arrow según reglas explícitas:
+
+    - null con cualquier tipo: el otro tipo.
+    - booleanos y enteros: el entero más ancho (int64 si se mezclan con o sin signo,
+      salvo con uint64, cuyos valores pueden no caber en int64).
+    - enteros o booleanos con flotantes: el flotante más ancho.
+    - fechas y timestamps: timestamp con la unidad más fina (en UTC si las zonas difieren).
+    - string y large_string: large_string.
+    - cualquier otra combinación de tipos simples: string.
+
+    :raises: ValueError si se mezclan tipos anidados (listas, structs) incompatibles
+             o uint64 con enteros con signo.
+    """
+    left, right = _unwrap(left), _unwrap(right)
+    if left == right:
+        return left
+    if pa.types.is_null(left):
+        return right
+    if pa.types.is_null(right):
+        return left
+
+    def is_integral(t):
+        return pa.types.is_integer(t) or pa.types.is_boolean(t)
+
+    if is_integral(left) and is_integral(right):
+        if pa.types.is_boolean(left):
+            return right
+        if pa.types.is_boolean(right):
+            return left
+        if pa.types.is_signed_integer(left) == pa.types.is_signed_integer(right):
+            return left if left.bit_width >= right.bit_width else right
+        if pa.types.is_uint64(left) or pa.types.is_uint64(right):
+            raise ValueError(f"No se pueden unificar los tipos {left} y {right} sin desbordar int64.")
+        return pa.int64()
+    if (is_integral(left) or pa.types.is_floating(left)) and (is_integral(right) or pa.types.is_floating(right)):
+        widths = [t.bit_width for t in (left, right) if pa.types.is_floating(t)]
+        return pa.float64() if max(widths) >= 64 or len(widths) < 2 else pa.float32()
+
+    def is_temporal(t):
+        return pa.types.is_timestamp(t) or pa.types.is_date(t)
+
+    if is_temporal(left) and is_temporal(right):
+        units = ['s', 'ms', 'us', 'ns']
+        stamps = [t for t in (left, right) if pa.types.is_timestamp(t)]
+        unit = max((t.unit for t in stamps), key=units.index, default='ms')
+        zones = {t.tz for t in stamps}
+        return pa.timestamp(unit, tz=zones.pop() if len(zones) == 1 else 'UTC')
+
+    if pa.types.is_nested(left) or pa.types.is_nested(right):
+        raise ValueError(f"No se pueden unificar los tipos {left} y {right}.")
+    if pa.types.is_large_string(left) or pa.types.is_large_string(right):
+        return pa.large_string()
+    return pa.string()
+
+def _source_schema(source: UnifySource) -> pa.Schema:
+    if isinstance(source, pd.DataFrame):
+        return pa.Schema.from_pandas(source, preserve_index=False)
+    return pq.read_schema(source)
+
+def _source_batches(source: UnifySource, batch_rows: int) -> Iterator[pa.Table]:
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), batch_rows):
+            yield pa.Table.from_pandas(source.iloc[start:start + batch_rows], preserve_index=False)
+        return
+    parquet_file = pq.ParquetFile(source)
+    for batch in parquet_file.iter_batches(batch_size=batch_rows):
+        yield pa.Table.from_batches([batch])
+
+def cast_column(column: Union[pa.Array, pa.ChunkedArray], data_type: pa.DataType) -> pa.Array:
+    """
+    Convierte una columna al tipo indicado. Arrow no convierte listas ni structs a
+    texto, así que, para FALLBACK_TYPE o string, los valores anidados se serializan como JSON.
+    """
+    if column.type == data_type:
+        return column
+    if (pa.types.is_string(data_type) or pa.types.is_large_string(data_type)) and pa.types.is_nested(_unwrap(column.type)):
+        values = [None if value is None else json.dumps(value, ensure_ascii=False, default=str)
+                  for value in column.to_pylist()]
+        return pa.array(values, type=data_type)
+    return column.cast(data_type)
+
+def _conform_table(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Ajusta una tabla al esquema unificado: castea columnas y rellena las ausentes con nulos."""
+    columns = []
+    for field in schema:
+        if field.name in table.column_names:
+            columns.append(cast_column(table.column(field.name), field.type))
+        else:
+            columns.append(pa.nulls(table.num_rows, type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+def unified_schema(schemas: Sequence[Tuple[str, pa.Schema]]) -> Tuple[pa.Schema, Dict[str, Dict[str, Any]]]:
+    """
+    Calcula el esquema común de varias fuentes y la procedencia de cada columna.
+
+    Las columnas aparecen en el orden en que se ven por primera vez. Una columna
+    cuyos tipos no se pueden unificar pasa a FALLBACK_TYPE y su procedencia
+    guarda el motivo en 'fallback'.
+
+    :param schemas: Lista de tuplas (nombre de la fuente, esquema).
+    :return: El esquema unificado y, por columna, las fuentes que la aportan,
+             el tipo original en cada una, el tipo unificado y, si lo hubo, el
+             motivo del paso a texto.
+    """
+    types: Dict[str, pa.DataType] = {}
+    provenance: Dict[str, Dict[str, Any]] = {}
+    for source_name, schema in schemas:
+        for field in schema:
+            if field.name in types:
+                try:
+                    types[field.name] = promote_types(types[field.name], field.type)
+                except ValueError as e:
+                    types[field.name] = FALLBACK_TYPE
+                    provenance[field.name].setdefault("fallback", f"Columna '{field.name}' de '{source_name}': {e}")
+            else:
+                types[field.name] = _unwrap(field.type)
+                provenance[field.name] = {"sources": {}}
+            provenance[field.name]["sources"][source_name] = str(field.type)
+
+    schema = pa.schema([pa.field(name, data_type) for name, data_type in types.items()])
+    for name, data_type in types.items():
+        provenance[name]["unified_type"] = str(data_type)
+    return schema, provenance
+
+def unify_to_parquet(
+    sources: Sequence[Tuple[str, UnifySource]],
+    output_path: str,
+    batch_rows: int = UNIFY_BATCH_ROWS,
+    compression: str = 'snappy',
+    deduplicator: Optional[RowDeduplicator] = None
+) -> Dict[str, Any]:
+    """
+    Unifica varias fuentes en un único archivo Parquet sin cargarlas a la vez.
+
+    Primero se calcula el esquema común leyendo solo los esquemas (ver promote_types);
+    después cada fuente se vuelca lote a lote, de modo que la memoria queda acotada
+    por el lote más grande y no por la suma de las fuentes. La procedencia de cada
+    columna se guarda en los metadatos del archivo bajo PROVENANCE_METADATA_KEY.
+
+    :param sources: Lista de tuplas (nombre de la fuente, DataFrame o ruta a un Parquet).
+    :param output_path: Ruta del archivo Parquet de salida.
+    :param batch_rows: Filas por lote.
+    :param compression: Códec de compresión del Parquet.
+    :param deduplicator: Si se indica, se omiten las filas ya vistas en cualquier
+                         fuente (comparadas tras ajustarlas al esquema común).
+    :return: Un informe con las filas totales, filas escritas por fuente, el esquema,
+             la procedencia y, con deduplicator, los duplicados eliminados por fuente.
+    :raises: ValueError si la lista está vacía.
+    """
+    if not sources:
+        raise ValueError("La entrada debe ser una lista no vacía de fuentes.")
+
+    schema, provenance = unified_schema([(name, _source_schema(source)) for name, source in sources])
+    schema = schema.with_metadata({PROVENANCE_METADATA_KEY: json.dumps(provenance).encode("utf-8")})
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    rows_per_source: Dict[str, int] = {}
+    try:
+        with pq.ParquetWriter(tmp_path, schema, compression=compression) as writer:
+            for source_name, source in sources:
+                rows = 0
+                for table in _source_batches(source, batch_rows):
+                    table = _conform_table(table, schema)
+                    if deduplicator is not None:
+                        table = deduplicator.filter(table, source_name)
+                    writer.write_table(table)
+                    rows += table.num_rows
+                rows_per_source[source_name] = rows
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    report = {
+        "total_rows": sum(rows_per_source.values()),
+        "rows_per_source": rows_per_source,
+        "columns": schema.names,
+        "provenance": provenance,
+    }
+    if deduplicator is not None:
+        report["duplicates_removed"] = sum(deduplicator.duplicates_per_source.get(name, 0) for name, _ in sources)
+        report["duplicates_per_source"] = {name: deduplicator.duplicates_per_source.get(name, 0) for name, _ in sources}
+    return report
+
+# --- Exportación ---
+
+EXPORT_FORMATS = ('csv', 'parquet', 'feather')
+# Alias aceptados para el formato Feather v2 (Arrow IPC).
+FORMAT_ALIASES = {'ipc': 'feather', 'arrow': 'feather'}
+FORMAT_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
+CSV_COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz', 'zstd': '.zst', 'zip': '.zip'}
+DEFAULT_COMPRESSION = {'csv': None, 'parquet': 'zstd', 'feather': 'zstd'}
+EXPORT_ROW_GROUP_SIZE = int(os.getenv("SADI_EXPORT_ROW_GROUP_SIZE", str(128 * 1024)))
+# Columnas con una proporción de valores distintos igual o menor se
+# codifican con diccionario.
+DICTIONARY_MAX_CARDINALITY_RATIO = float(os.getenv("SADI_EXPORT_DICTIONARY_MAX_RATIO", "0.5"))
+
+def _resolve_output_path(output_filename: str, extension: str) -> str:
     """
-    Exporta un DataFrame a un archivo CSV en el directorio predefinido.
+    Un nombre simple se guarda en OUTPUT_DIRECTORY; una ruta con directorio se
+    respeta. La extensión se añade si no está ya presente.
+    """
+    if not os.path.dirname(output_filename):
+        output_filename = os.path.join(OUTPUT_DIRECTORY, output_filename)
+    if extension and not output_filename.endswith(extension):
+        output_filename += extension
+    return output_filename
+
+def low_cardinality_columns(df: pd.DataFrame, max_ratio: float = DICTIONARY_MAX_CARDINALITY_RATIO) -> List[str]:
+    """Devuelve las columnas cuya proporción de valores distintos no supera `max_ratio`."""
+    if df.empty:
+        return []
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns.append(col)
+            continue
+        try:
+            distinct = series.nunique(dropna=True)
+        except TypeError:
+            # Listas o diccionarios (p. ej. de un JSON anidado): no se pueden contar ni codificar.
+            continue
+        if distinct <= max_ratio * len(series):
+            columns.append(col)
+    return columns
+
+def _write_atomically(full_path: str, writer) -> str:
+    """Escribe en un archivo temporal y lo renombra, para no dejar archivos a medias."""
+    directory = os.path.dirname(full_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{full_path}.tmp"
+    try:
+        writer(tmp_path)
+        os.replace(tmp_path, full_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return full_path
+
+def _export_parquet(df: pd.DataFrame, output_filename: str, compression: Optional[str], options: Dict[str, Any]) -> str:
+    row_group_size = options.pop('row_group_size', EXPORT_ROW_GROUP_SIZE)
+    partition_cols = options.pop('partition_cols', None)
+    if isinstance(partition_cols, str):
+        partition_cols = [partition_cols]
+    dictionary_columns = low_cardinality_columns(df, options.pop('dictionary_max_ratio', DICTIONARY_MAX_CARDINALITY_RATIO))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    if partition_cols:
+        # Un directorio por valor de la columna (estilo Hive: columna=valor/).
+        base_dir = _resolve_output_path(output_filename, '')
+        ds.write_dataset(
+            table, base_dir, format='parquet',
+            partitioning=partition_cols,
+            partitioning_flavor='hive',
+            file_options=ds.ParquetFileFormat().make_write_options(
+                compression=compression or 'none',
+                use_dictionary=[c for c in dictionary_columns if c not in partition_cols]
+            ),
+            max_rows_per_group=row_group_size,
+            existing_data_behavior='delete_matching',
+            **options
+        )
+        return base_dir
+
+    full_path = _resolve_output_path(output_filename, FORMAT_EXTENSIONS['parquet'])
+    return _write_atomically(full_path, lambda path: pq.write_table(
+        table, path, compression=compression or 'none', row_group_size=row_group_size,
+        use_dictionary=dictionary_columns, **options
+    ))
+
+def _export_feather(df: pd.DataFrame, output_filename: str, compression: Optional[str], options: Dict[str, Any]) -> str:
+    row_group_size = options.pop('row_group_size', EXPORT_ROW_GROUP_SIZE)
+    dictionary_columns = set(low_cardinality_columns(df, options.pop('dictionary_max_ratio', DICTIONARY_MAX_CARDINALITY_RATIO)))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Feather no tiene codificación por diccionario propia: se usan columnas de tipo diccionario.
+    table = pa.Table.from_arrays([
+        column.dictionary_encode() if name in dictionary_columns and not pa.types.is_dictionary(column.type) else column
+        for name, column in zip(table.column_names, table.columns)
+    ], names=table.column_names)
+    full_path = _resolve_output_path(output_filename, FORMAT_EXTENSIONS['feather'])
+    return _write_atomically(full_path, lambda path: feather.write_feather(
+        table, path, compression=compression or 'uncompressed', chunksize=row_group_size, **options
+    ))
+
+def _export_csv(df: pd.DataFrame, output_filename: str, compression: Optional[str], options: Dict[str, Any]) -> str:
+    extension = FORMAT_EXTENSIONS['csv'] + CSV_COMPRESSION_EXTENSIONS.get(compression, '')
+    full_path = _resolve_output_path(output_filename, extension)
+    return _write_atomically(full_path, lambda path: df.to_csv(path, index=False, compression=compression, **options))
+
+_EXPORTERS = {
+    'csv': _export_csv,
+    'parquet': _export_parquet,
+    'feather': _export_feather,
+}
+
+def export_data(
+    df: pd.DataFrame,
+    output_filename: str,
+    export_format: Union[str, Dict[str, Any], None] = 'csv',
+    config: Dict[str, Any] = None
+) -> str:
+    """
+    Exporta un DataFrame en el formato indicado.
+
+    Formatos:
+    - 'parquet': compresión zstd por defecto (o 'snappy', 'gzip', None), tamaño de
+      row group (`row_group_size`), codificación por diccionario solo en columnas de
+      baja cardinalidad y particionado estilo Hive opcional (`partition_cols`), que
+      produce un directorio en lugar de un archivo.
+    - 'feather' (alias 'ipc', 'arrow'): Arrow IPC con compresión zstd o lz4.
+    - 'csv': sin comprimir por defecto, o con `compression` 'gzip', 'bz2', 'xz' o 'zstd'.
+
+    Un nombre sin directorio se guarda en OUTPUT_DIRECTORY; una ruta con directorio
+    se respeta. La extensión se añade si falta. Por compatibilidad, si el tercer
+    argumento es un diccionario se interpreta como configuración de to_csv.
 
     :param df: El DataFrame a exportar.
-    :param output_filename: El nombre del archivo de salida (sin extensión).
-    :param config: Configuración adicional para la función to_csv de pandas.
-    :return: La ruta completa al archivo exportado.
+    :param output_filename: Nombre o ruta del archivo de salida (la extensión es opcional).
+    :param export_format: 'csv', 'parquet' o 'feather'.
+    :param config: Opciones del formato ('compression', 'row_group_size',
+                   'dictionary_max_ratio', 'partition_cols'); el resto se pasa al escritor.
+    :return: La ruta al archivo (o directorio particionado) exportado.
+    :raises: ValueError si el formato no está soportado.
     :raises: Exception para errores durante el proceso de escritura del archivo.
     """
-    config = config or {}
+    if isinstance(export_format, dict) or export_format is None:
+        export_format, config = 'csv', export_format
+    export_format = FORMAT_ALIASES.get(export_format.lower(), export_format.lower())
+    if export_format not in _EXPORTERS:
+        raise ValueError(f"Formato de exportación no soportado: '{export_format}'. Use uno de {EXPORT_FORMATS}.")
+
+    options = dict(config or {})
+    compression = options.pop('compression', DEFAULT_COMPRESSION[export_format])
 
     try:
-        # Asegurar que el directorio de salida existe
-        os.makedirs(OUTPUT_DIRECTORY, exist_ok=True)
+        full_path = _EXPORTERS[export_format](df, output_filename, compression, options)
+    except Exception as e:
+        raise Exception(f"Error al exportar datos a '{output_filename}' en formato {export_format}: {e}")
 
-        # Construir la ruta completa
-        full_path = os.path.join(OUTPUT_DIRECTORY, f"{output_filename}.csv")
+    print(f"Datos exportados exitosamente a {full_path}")
+    return full_path
 
-        # Exportar a CSV
-        df.to_csv(full_path, index=False, **config)
+# --- Escritura Incremental ---
 
-        print(f"Datos exportados exitosamente a {full_path}")
-        return full_path
+class ParquetChunkWriter:
+    """
+    Escribe un DataFrame troceado en un único archivo Parquet, trozo a trozo.
 
-    except Exception as e:
-        raise Exception(f"Error al exportar datos a {full_path}: {e}")
+    El esquema lo fija el primer trozo con filas. Los siguientes se convierten a él: los
+    tipos compatibles se convierten sin pérdida (p. ej. enteros leídos como
+    float por tener nulos) y las columnas ausentes se rellenan con nulos. Las
+    columnas totalmente nulas se declaran de tipo null hasta que llega un valor.
+
+    Un trozo que no encaja amplía el esquema: las columnas nuevas (p. ej.
+    registros JSON que añaden una clave) se añaden a nulo, y una columna cuyo
+    tipo cambia (enteros y después "N/A") pasa al tipo común de promote_types,
+    o a FALLBACK_TYPE si no lo hay. Lo ya escrito se reescribe por lotes con el
+    nuevo esquema; solo ocurre cuando el esquema cambia.
+
+    Se escribe en un archivo temporal que solo sustituye a `path` al cerrar sin
+    errores, así que nunca queda un Parquet a medias en la ruta final.
+    """
+    def __init__(self, path: str, compression: str = 'snappy'):
+        self.path = path
+        self.compression = compression
+        self.schema: Optional[pa.Schema] = None
+        self.rows_written = 0
+        self.chunks_written = 0
+        self.schema_changes = 0
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._tmp_path = f"{path}.tmp"
+        # Columnas de los trozos vacíos recibidos antes del primero con filas.
+        self._empty_schema: Optional[pa.Schema] = None
+
+    def write(self, df: pd.DataFrame):
+        """Añade un trozo al archivo."""
+        self.write_table(pa.Table.from_pandas(df, preserve_index=False))
+
+    def write_table(self, table: pa.Table):
+        """Añade una tabla de Arrow al archivo."""
+        if self._writer is None and table.num_rows == 0:
+            # Un trozo vacío no sirve para fijar los tipos del archivo.
+            self._empty_schema = self._empty_schema or table.schema
+            return
+        if self._writer is None:
+            self.schema = pa.schema([self._declared_field(field, table) for field in table.schema])
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp_path, self.schema, compression=self.compression)
+        # _conform puede sustituir el escritor al ampliar el esquema.
+        table = self._conform(table)
+        self._writer.write_table(table)
+        self.rows_written += table.num_rows
+        self.chunks_written += 1
+
+    @staticmethod
+    def _declared_field(field: pa.Field, table: pa.Table) -> pa.Field:
+        if table.column(field.name).null_count == len(table):
+            return pa.field(field.name, pa.null())
+        return field
+
+    @staticmethod
+    def _widen(current: pa.DataType, incoming: pa.DataType) -> pa.DataType:
+        try:
+            widened = promote_types(current, incoming)
+        except ValueError:
+            return FALLBACK_TYPE
+        # El tipo común no cambia pero los valores no caben (p. ej. otra zona horaria).
+        return FALLBACK_TYPE if widened == current else widened
+
+    def _evolve(self, schema: pa.Schema):
+        """Reescribe lo ya escrito con el esquema `schema` y sigue escribiendo con él."""
+        self._writer.close()
+        previous_path = self._tmp_path
+        self.schema_changes += 1
+        self._tmp_path = f"{self.path}.tmp{self.schema_changes}"
+        self.schema = schema
+        self._writer = pq.ParquetWriter(self._tmp_path, schema, compression=self.compression)
+        try:
+            with pq.ParquetFile(previous_path) as previous:
+                for batch in previous.iter_batches(batch_size=UNIFY_BATCH_ROWS):
+                    self._writer.write_table(_conform_table(pa.Table.from_batches([batch]), schema))
+        finally:
+            os.remove(previous_path)
+
+    def _conform(self, table: pa.Table) -> pa.Table:
+        new_fields = [self._declared_field(field, table) for field in table.schema if field.name not in self.schema.names]
+        if new_fields:
+            self._evolve(pa.schema(list(self.schema) + new_fields))
+        columns = []
+        for i, field in enumerate(self.schema):
+            if field.name not in table.column_names:
+                columns.append(pa.nulls(table.num_rows, type=field.type))
+                continue
+            column = table.column(field.name)
+            try:
+                columns.append(cast_column(column, field.type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                widened = self._widen(field.type, column.type)
+                self._evolve(self.schema.set(i, field.with_type(widened)))
+                columns.append(cast_column(column, widened))
+        return pa.Table.from_arrays(columns, schema=self.schema)
+
+    def close(self):
+        """
+        Cierra el archivo y lo publica en `path`. Si no se escribió ninguna fila
+        (una fuente sin registros), publica un Parquet vacío con las columnas de
+        los trozos recibidos, si los hubo.
+        """
+        if self._writer is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.schema = self._empty_schema or pa.schema([])
+            pq.write_table(self.schema.empty_table(), self._tmp_path, compression=self.compression)
+            os.replace(self._tmp_path, self.path)
+            return
+        self._writer.close()
+        self._writer = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Descarta lo escrito hasta ahora."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            os.remove(self._tmp_path)
+
+    def __enter__(self) -> "ParquetChunkWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+# --- DataFrame Cache ---
+
+class DataFrameCache:
+    """
+    A thread-safe LRU cache of session DataFrames with a memory budget.
+
+    Entries are keyed by session id and a version token (the file's mtime and
+    size), so a dataset rewritten by another process is never served stale.
+    When the total size of cached frames exceeds `max_bytes`, the least
+    recently used entries are evicted.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Hashable, pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, session_id: str, version: Hashable) -> Optional[pd.DataFrame]:
+        """Returns the cached frame for this version of the session, if any."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, session_id: str, version: Hashable, df: pd.DataFrame):
+        """Caches a frame, evicting older entries to stay within the budget."""
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            self._remove(session_id)
+            if size > self.max_bytes:
+                return
+            self._entries[session_id] = (version, df, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, session_id: str):
+        """Drops any cached version of a session's dataset."""
+        with self._lock:
+            self._remove(session_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, session_id: str):
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/eviction counters and current memory usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
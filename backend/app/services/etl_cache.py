@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# --- Configuración ---
+ETL_CACHE_ENABLED = os.getenv("SADI_ETL_CACHE_ENABLED", "1") == "1"
+ETL_CACHE_DIRECTORY = Path(os.getenv("SADI_ETL_CACHE_DIR", "data/cache/etl"))
+# Espacio en disco máximo de la caché; al superarlo se eliminan las entradas
+# usadas hace más tiempo.
+ETL_CACHE_MAX_BYTES = int(os.getenv("SADI_ETL_CACHE_MAX_BYTES", str(10 * 1024 ** 3)))
+# Cambiar este valor invalida todas las entradas existentes (p. ej. si cambia
+# el formato de salida de la normalización).
+CACHE_FORMAT_VERSION = "4"
+MANIFEST_NAME = "manifest.json"
+HASH_BLOCK_BYTES = 1024 * 1024
+
+class EtlResultCache:
+    """
+    Caché de resultados del ETL direccionada por contenido.
+
+    La clave es un hash BLAKE2b de los bytes del archivo, el cargador, la
+    configuración de normalización y los ajustes que cambian la salida, de modo que el mismo archivo subido de nuevo
+    (con cualquier nombre) se resuelve sin volver a procesarlo. Cada entrada es
+    un directorio con los Parquet procesados y un manifiesto; la fecha de
+    modificación del manifiesto marca su último uso para la expulsión LRU.
+
+    Todo el estado vive en el sistema de archivos, así que varios workers o
+    procesos pueden compartir la caché sin coordinarse: las entradas se publican
+    con un rename atómico y una entrada que desaparece durante una lectura se
+    trata como un fallo de caché.
+    """
+    def __init__(self, directory: Union[str, Path] = ETL_CACHE_DIRECTORY, max_bytes: int = ETL_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(
+        content: Union[bytes, str, os.PathLike],
+        loader: str,
+        config: Any,
+        settings: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Calcula la clave de un archivo (bytes o ruta) para un cargador y configuración dados.
+
+        :param settings: Ajustes del entorno que cambian la salida (p. ej. SADI_JSON_FLATTEN_MAX_LEVEL);
+                         si cambia alguno, las entradas anteriores dejan de coincidir.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        material = [CACHE_FORMAT_VERSION, loader, config, settings or {}]
+        digest.update(json.dumps(material, sort_keys=True, default=str).encode("utf-8"))
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            digest.update(content)
+        else:
+            with open(content, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+                    digest.update(block)
+        return digest.hexdigest()
+
+    def lookup(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Devuelve las salidas guardadas para la clave, cada una con su 'sheet'
+        (None si el archivo no tiene hojas) y la 'path' del Parquet en la caché.
+        """
+        entry = self.directory / key
+        try:
+            manifest = json.loads((entry / MANIFEST_NAME).read_text(encoding="utf-8"))
+            os.utime(entry / MANIFEST_NAME)
+        except (FileNotFoundError, ValueError):
+            return None
+        return [{"sheet": output["sheet"], "path": str(entry / output["file"])} for output in manifest["outputs"]]
+
+    def store(self, key: str, outputs: List[Tuple[Optional[str], str]]):
+        """
+        Guarda las salidas de un archivo: una lista de tuplas (hoja o None, ruta del Parquet).
+        Después expulsa entradas antiguas si se supera el presupuesto de disco.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = self.directory / f".tmp-{uuid.uuid4().hex}"
+        staging.mkdir()
+        try:
+            manifest = {"created_at": time.time(), "outputs": []}
+            for i, (sheet, path) in enumerate(outputs):
+                file_name = f"{i}.parquet"
+                link_or_copy(path, staging / file_name)
+                manifest["outputs"].append({"sheet": sheet, "file": file_name})
+            (staging / MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+            try:
+                os.rename(staging, self.directory / key)
+            except OSError:
+                # Otro worker guardó la misma entrada mientras tanto.
+                pass
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def evict(self) -> int:
+        """Elimina las entradas menos usadas hasta cumplir el presupuesto. Devuelve los bytes liberados."""
+        entries = []
+        for entry in self.directory.iterdir() if self.directory.exists() else []:
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            try:
+                last_used = (entry / MANIFEST_NAME).stat().st_mtime
+                size = sum(f.stat().st_size for f in entry.iterdir())
+            except FileNotFoundError:
+                continue
+            entries.append((last_used, size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            freed += size
+        return freed
+
+    def size(self) -> int:
+        """Bytes ocupados por las entradas de la caché."""
+        if not self.directory.exists():
+            return 0
+        return sum(f.stat().st_size for f in self.directory.rglob('*') if f.is_file())
+
+def file_fingerprint(path: Union[str, Path]) -> List[Any]:
+    """[tamaño, hash BLAKE2b] de un archivo, para detectar si otro proceso lo reescribió."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return [os.path.getsize(path), digest.hexdigest()]
+
+def link_or_copy(source: Union[str, Path], destination: Union[str, Path]):
+    """
+    Crea `destination` como enlace duro a `source` (sin copiar datos) o, si no es
+    posible (p. ej. en otro sistema de archivos), como copia. Los escritores del
+    ETL reemplazan archivos con rename, por lo que un enlace nunca se modifica en sitio.
+    """
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
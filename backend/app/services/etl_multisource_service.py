@@ -1,15 +1,72 @@
 import pandas as pd
+import hashlib
 import os
-from typing import Dict, Any, List, Union
+import signal
+import threading
+import multiprocessing
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Container, Iterable, List, Optional, Tuple, Union
 
 from backend.app.etl_providers import (
     load_csv, load_excel, load_json, load_parquet,
-    load_tsv, load_jsonl, load_yaml
+    load_tsv, load_jsonl, load_yaml,
+    iter_csv_chunks, iter_tsv_chunks, iter_excel_sheets,
+    iter_json_chunks, iter_jsonl_chunks
 )
-from backend.app.services.normalization_pipeline import run_normalization_pipeline
-from backend.app.services.data_exporter import unify_dataframes, export_data
-from backend.app.services.compression_handler import decompress_files
-from backend.app.etl_audit import log_etl_event
+from backend.app.etl_providers import csv_loader, json_loader, jsonl_loader
+from backend.app.etl_providers.excel_loader import EXCEL_SHEETS
+from backend.app.services import data_exporter, normalization_pipeline
+from backend.app.services.normalization_pipeline import compile_pipeline, execute_plan, run_normalization_pipeline
+from backend.app.services.data_exporter import ParquetChunkWriter, export_data, unify_to_parquet
+from backend.app.services.compression_handler import (
+    ArchiveLimitError, detect_compression, is_archive, iter_archive_members, open_compressed,
+    strip_compression_extension
+)
+from backend.app.services.etl_cache import ETL_CACHE_ENABLED, EtlResultCache, file_fingerprint, link_or_copy
+from backend.app.services.row_deduplicator import RowDeduplicator
+from backend.app.services.state_store import get_state_store
+from backend.app.etl_audit import log_etl_event, peak_rss_bytes
+
+# --- Configuración de la Ejecución Paralela ---
+# Número de procesos que cargan y normalizan archivos a la vez (1 = secuencial).
+ETL_MAX_WORKERS = int(os.getenv("SADI_ETL_MAX_WORKERS", str(os.cpu_count() or 1)))
+# Tiempo máximo por archivo; 0 desactiva el límite.
+ETL_FILE_TIMEOUT_SECONDS = float(os.getenv("SADI_ETL_FILE_TIMEOUT_SECONDS", "300"))
+# 'spawn' evita heredar los hilos del proceso padre (API, write-behind) y
+# arranca los workers en el directorio de trabajo actual, del que dependen
+# las rutas relativas de salida.
+ETL_MP_START_METHOD = os.getenv("SADI_ETL_MP_START_METHOD", "spawn")
+# Directorio donde se vuelcan los miembros de los archivos comprimidos mientras
+# dura una ejecución (por defecto, el temporal del sistema).
+ETL_SPOOL_DIRECTORY = os.getenv("SADI_ETL_SPOOL_DIR") or None
+# Los archivos de texto a partir de este tamaño se procesan por trozos, con
+# memoria acotada, en lugar de cargarse completos.
+ETL_STREAMING_THRESHOLD_BYTES = int(os.getenv("SADI_ETL_STREAMING_THRESHOLD_BYTES", str(64 * 1024 * 1024)))
+# Directorio de los Parquet individuales y del dataset maestro.
+ETL_OUTPUT_DIRECTORY = os.getenv("SADI_ETL_OUTPUT_DIR", "data/output")
+# Elimina del dataset maestro las filas repetidas entre fuentes (y entre trozos
+# de una misma fuente procesada por trozos).
+ETL_GLOBAL_DEDUP = os.getenv("SADI_ETL_GLOBAL_DEDUP", "1") == "1"
+
+# Pasos de normalización obligatorios para toda fuente.
+MANDATORY_NORMALIZATION_CONFIG = [
+    {'step': 'to_snake_case'},
+    {'step': 'remove_duplicates'},
+    {'step': 'optimize_dtypes'}
+]
+# Pasos que no se aplican al procesar por trozos: optimize_dtypes elegiría tipos
+# distintos en cada trozo y el Parquet incremental necesita un esquema fijo.
+CHUNK_UNSAFE_STEPS = ('optimize_dtypes',)
+STREAMING_NORMALIZATION_CONFIG = [
+    step for step in MANDATORY_NORMALIZATION_CONFIG if step['step'] not in CHUNK_UNSAFE_STEPS
+]
+
+# Un archivo puede llegar como bytes o como ruta en disco (para archivos grandes).
+FileContent = Union[bytes, str, os.PathLike]
 
 # --- Mapeo de Extensiones a Funciones de Carga ---
 DATA_LOADERS = {
@@ -24,11 +81,51 @@ DATA_LOADERS = {
     'yml': load_yaml,
 }
 
+# Lectores por trozos para los formatos que admiten procesamiento incremental.
+STREAMING_LOADERS = {
+    'csv': iter_csv_chunks,
+    'tsv': iter_tsv_chunks,
+    'json': iter_json_chunks,
+    'jsonl': iter_jsonl_chunks,
+}
+
+# Lectores que devuelven las hojas de un libro a medida que terminan de leerse,
+# para normalizar cada una sin esperar al resto.
+SHEET_LOADERS = {
+    'xlsx': iter_excel_sheets,
+    'xls': iter_excel_sheets,
+}
+
+# Formatos cuyos cargadores aplanan los objetos anidados en columnas 'padre.hijo'.
+FLATTENED_JSON_EXTENSIONS = ('json', 'jsonl')
+
+def _join_flattened_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Une con '_' las claves de las columnas de JSON aplanado ('cliente.nombre' -> 'cliente_nombre')."""
+    return df.rename(columns=lambda name: name.replace('.', '_') if isinstance(name, str) else name)
+
+# Caché de resultados por contenido: un archivo ya procesado no se vuelve a procesar.
+etl_cache = EtlResultCache()
+
+# Errores que pueden no repetirse al reintentar: E/S (disco lleno, volumen
+# compartido no disponible) y el límite de tiempo por archivo (TimeoutError
+# es un OSError). Un archivo que falla por uno de ellos se marca 'transient'.
+TRANSIENT_ERRORS = (OSError,)
+
+def _is_transient(error: BaseException) -> bool:
+    """Si el error, o alguno de los que lo causaron (los cargadores los envuelven), es transitorio."""
+    while error is not None:
+        if isinstance(error, TRANSIENT_ERRORS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
 # --- Lógica del Servicio de Orquestación Actualizada ---
 
-def _process_dataframe(df: pd.DataFrame, source_name: str) -> Union[pd.DataFrame, None]:
+def _process_dataframe(df: pd.DataFrame, source_name: str, output_path: str) -> Union[str, None]:
     """
-    Función auxiliar para normalizar, auditar y exportar un único DataFrame.
+    Función auxiliar para normalizar, auditar y exportar un único DataFrame a `output_path`.
+
+    :return: La ruta del Parquet exportado, o None si falló.
     """
     try:
         # --- Auditoría Pre-Procesamiento ---
@@ -41,12 +138,8 @@ def _process_dataframe(df: pd.DataFrame, source_name: str) -> Union[pd.DataFrame
         })
 
         # --- Normalización ---
-        # Añadir pasos obligatorios al pipeline
-        normalization_config = [
-            {'step': 'to_snake_case'},
-            {'step': 'remove_duplicates'}
-        ]
-        processed_df = run_normalization_pipeline(df, normalization_config)
+        step_metrics: List[Dict[str, Any]] = []
+        processed_df = run_normalization_pipeline(df, MANDATORY_NORMALIZATION_CONFIG, metrics=step_metrics)
 
         # --- Auditoría Post-Procesamiento ---
         final_row_count = len(processed_df)
@@ -55,6 +148,10 @@ def _process_dataframe(df: pd.DataFrame, source_name: str) -> Union[pd.DataFrame
             initial: final for initial, final in zip(initial_columns, final_columns)
             if initial != final
         }
+        bytes_saved_by_column: Dict[str, int] = {}
+        for metric in step_metrics:
+            if metric["step"] == 'optimize_dtypes':
+                bytes_saved_by_column.update(metric.get("report", {}))
 
         log_etl_event(f"Finalizado el procesamiento para '{source_name}'.", extra_data={
             "source": source_name,
@@ -62,97 +159,614 @@ def _process_dataframe(df: pd.DataFrame, source_name: str) -> Union[pd.DataFrame
             "rows_after": final_row_count,
             "rows_removed": initial_row_count - final_row_count,
             "column_mapping": column_mapping,
-            "final_columns": final_columns
+            "final_columns": final_columns,
+            "step_metrics": step_metrics,
+            "bytes_saved_by_column": bytes_saved_by_column,
+            "bytes_saved": sum(bytes_saved_by_column.values()),
+            "peak_rss_bytes": peak_rss_bytes()
         })
 
         # --- Exportación Individual ---
-        # Sanitizar el nombre de la fuente para evitar problemas con subdirectorios
-        sanitized_source_name = os.path.basename(source_name)
-        individual_output_path = f"data/output/processed_{os.path.splitext(sanitized_source_name)[0]}"
-        export_data(processed_df, individual_output_path, 'parquet')
-        log_etl_event(f"'{source_name}' exportado individualmente a '{individual_output_path}.parquet'.")
+        # El Parquet individual es también la entrada de la unificación, de modo
+        # que el DataFrame no tiene que viajar de vuelta al proceso principal.
+        individual_output_path = export_data(processed_df, output_path, 'parquet')
+        log_etl_event(f"'{source_name}' exportado individualmente a '{individual_output_path}'.")
 
-        return processed_df
+        return individual_output_path
     except Exception as e:
+        if _is_transient(e):
+            # El archivo completo falla y se puede reintentar (ver _process_file).
+            raise
         error_msg = f"Error procesando la fuente de datos '{source_name}': {e}"
         log_etl_event(error_msg, level='error', extra_data={"source": source_name})
         return None
 
-def run_full_etl_process(file_contents: Dict[str, bytes]) -> Dict[str, Any]:
+def _source_name(filename: str, sheet: Optional[str]) -> str:
+    """Nombre de la fuente: el del archivo o, para libros Excel, archivo_hoja."""
+    return filename if sheet is None else f"{os.path.splitext(strip_compression_extension(filename))[0]}_{sheet}"
+
+def _loader_name(loader_func: Callable) -> str:
+    return f"{loader_func.__module__}.{loader_func.__qualname__}"
+
+def _restore_from_cache(filename: str, source_key: str, cache_key: str) -> Optional[List[Tuple[str, str]]]:
     """
-    Orquesta el pipeline ETL para múltiples archivos, manejando Excel con múltiples hojas.
+    Publica en ETL_OUTPUT_DIRECTORY los Parquet guardados para esta clave y devuelve las
+    fuentes, o None si no hay entrada (o desapareció mientras se leía).
     """
-    os.makedirs("data/output", exist_ok=True)
-    processed_dfs = []
-    individual_results = {}
+    entries = etl_cache.lookup(cache_key)
+    if entries is None:
+        return None
+    sources = []
+    try:
+        for entry in entries:
+            source_name = _source_name(filename, entry['sheet'])
+            output_path = _individual_output_path(_source_name(source_key, entry['sheet']))
+            link_or_copy(entry['path'], output_path)
+            sources.append((source_name, output_path))
+    except FileNotFoundError:
+        return None
+    log_etl_event(f"'{filename}' recuperado de la caché de resultados; se omite su procesamiento.", extra_data={
+        "source": filename,
+        "cache_hit": True,
+        "cache_key": cache_key,
+        "outputs": dict(sources)
+    })
+    return sources
 
-    log_etl_event("Inicio del proceso ETL multi-archivo.", extra_data={"file_count": len(file_contents)})
+def _individual_output_path(source_key: str) -> str:
+    """
+    Ruta del Parquet individual de una fuente.
 
-    files_to_process = list(file_contents.items())
+    `source_key` identifica la fuente en toda la ejecución: el nombre del archivo
+    recibido, precedido por los archivos comprimidos que lo contienen
+    ('lote.zip/norte/datos.csv'). El nombre legible sale del último componente y
+    un hash de la clave completa evita que 'norte/datos.csv' y 'sur/datos.csv'
+    escriban en el mismo archivo.
+    """
+    name = strip_compression_extension(os.path.basename(source_key))
+    digest = hashlib.blake2b(source_key.encode('utf-8'), digest_size=4).hexdigest()
+    return f"{ETL_OUTPUT_DIRECTORY}/processed_{os.path.splitext(name)[0]}_{digest}.parquet"
 
-    i = 0
-    while i < len(files_to_process):
-        filename, content = files_to_process[i]
-        i += 1
+def _process_stream(chunks: Iterable[pd.DataFrame], source_name: str, output_path: str) -> Union[str, None]:
+    """
+    Normaliza una fuente trozo a trozo y la escribe de forma incremental en Parquet en `output_path`.
 
-        try:
+    Solo un trozo está en memoria a la vez. La eliminación de duplicados actúa
+    dentro de cada trozo, no entre trozos.
+
+    :return: La ruta del Parquet generado, o None si falló.
+    """
+    try:
+        log_etl_event(f"Iniciando procesamiento por trozos para '{source_name}'.", extra_data={
+            "source": source_name,
+            "streaming": True
+        })
+        rows_before = 0
+        column_mapping: Dict[str, str] = {}
+        # El plan se compila una vez y se aplica a cada trozo.
+        plan = compile_pipeline(STREAMING_NORMALIZATION_CONFIG)
+        step_metrics: Dict[str, Dict[str, Any]] = {}
+        with ParquetChunkWriter(output_path) as writer:
+            for chunk in chunks:
+                rows_before += len(chunk)
+                initial_columns = list(chunk.columns)
+                chunk_metrics: List[Dict[str, Any]] = []
+                processed_chunk = execute_plan(chunk, plan, metrics=chunk_metrics)
+                for metric in chunk_metrics:
+                    totals = step_metrics.setdefault(metric["step"], {"seconds": 0.0, "rows_removed": 0})
+                    totals["seconds"] += metric["seconds"]
+                    totals["rows_removed"] += metric["rows_before"] - metric["rows_after"]
+                column_mapping.update({
+                    initial: final for initial, final in zip(initial_columns, processed_chunk.columns)
+                    if initial != final
+                })
+                writer.write(processed_chunk)
+            rows_after = writer.rows_written
+            chunk_count = writer.chunks_written
+            final_columns = writer.schema.names if writer.schema is not None else []
+
+        log_etl_event(f"Finalizado el procesamiento por trozos para '{source_name}'.", extra_data={
+            "source": source_name,
+            "chunks": chunk_count,
+            "rows_before": rows_before,
+            "rows_after": rows_after,
+            "rows_removed": rows_before - rows_after,
+            "column_mapping": column_mapping,
+            "final_columns": final_columns,
+            "step_metrics": step_metrics,
+            "peak_rss_bytes": peak_rss_bytes()
+        })
+        log_etl_event(f"'{source_name}' exportado individualmente a '{output_path}'.")
+        return output_path
+    except Exception as e:
+        if _is_transient(e):
+            # El archivo completo falla y se puede reintentar (ver _process_file).
+            raise
+        error_msg = f"Error procesando la fuente de datos '{source_name}': {e}"
+        log_etl_event(error_msg, level='error', extra_data={"source": source_name})
+        return None
+
+def _content_size(content: FileContent) -> int:
+    return len(content) if isinstance(content, (bytes, bytearray)) else os.path.getsize(content)
+
+def _read_content(content: FileContent) -> bytes:
+    if isinstance(content, (bytes, bytearray)):
+        return content
+    with open(content, 'rb') as f:
+        return f.read()
+
+@contextmanager
+def _time_limit(seconds: float, filename: str):
+    """
+    Interrumpe con TimeoutError el bloque que supere `seconds`.
+
+    Usa SIGALRM, por lo que solo actúa en el hilo principal de un proceso
+    (los workers del pool de procesos); en cualquier otro caso no limita nada.
+    """
+    if (not seconds or not hasattr(signal, "SIGALRM")
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    def _raise_timeout(signum, frame):
+        raise TimeoutError(f"Se superó el tiempo máximo de {seconds}s procesando '{filename}'.")
+
+    previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+def _extract_archive(filename: str, content: FileContent, spool_dir: str) -> Dict[str, str]:
+    """
+    Extrae los miembros de un archivo comprimido, uno a uno, a archivos en `spool_dir`.
+
+    Ningún miembro se carga completo en memoria y los límites de extracción se
+    aplican mientras se descomprime. Devuelve nombre del miembro -> ruta extraída.
+    """
+    extracted_files: Dict[str, str] = {}
+    for member_name, handle in iter_archive_members(filename, content):
+        member_path = os.path.join(spool_dir, uuid.uuid4().hex)
+        with open(member_path, 'wb') as f:
+            shutil.copyfileobj(handle, f)
+        extracted_files[member_name] = member_path
+    return extracted_files
+
+def _process_file(
+    filename: str, content: FileContent, spool_dir: str, timeout_seconds: float = 0, source_key: str = None
+) -> Dict[str, Any]:
+    """
+    Procesa un único archivo: lo descomprime o lo carga y normaliza cada una de sus fuentes.
+
+    Se ejecuta dentro de un worker, por lo que devuelve un resultado serializable
+    en lugar de modificar estado compartido.
+
+    :param source_key: Clave única del archivo en la ejecución (ver _individual_output_path);
+                       por defecto, su nombre.
+
+    :return: {'extracted': {nombre: ruta en spool_dir}} para archivos comprimidos,
+             {'sources': [(nombre_fuente, ruta del Parquet procesado o None)]} para datos
+             (también cuando se recuperan de la caché de resultados),
+             {'skipped': True} para tipos no soportados o {'error': mensaje}; si el
+             error es transitorio (ver TRANSIENT_ERRORS), con 'transient': True.
+    """
+    source_key = source_key or filename
+    try:
+        with _time_limit(timeout_seconds, filename):
             log_etl_event(f"Procesando: {filename}")
 
-            if filename.lower().endswith(('.zip', '.tar.gz', '.tgz')):
+            if is_archive(filename):
                 log_etl_event(f"Detectado archivo comprimido: {filename}. Descomprimiendo...")
                 try:
-                    extracted_files = decompress_files(filename, content)
-                    files_to_process.extend(extracted_files.items())
-                    log_etl_event(f"{len(extracted_files)} archivos extraídos de {filename}.")
-                    continue
+                    extracted_files = _extract_archive(filename, content, spool_dir)
+                except ArchiveLimitError as e:
+                    error_msg = f"Archivo comprimido '{filename}' rechazado: {e}"
+                    log_etl_event(error_msg, level='error')
+                    return {'error': error_msg}
                 except Exception as e:
                     log_etl_event(f"Error al descomprimir '{filename}': {e}", level='error')
-                    continue
+                    return {'skipped': True}
+                log_etl_event(f"{len(extracted_files)} archivos extraídos de {filename}.")
+                return {'extracted': extracted_files}
 
-            extension = filename.split('.')[-1].lower()
+            # 'ventas.csv.gz' se lee como 'ventas.csv' a través de un flujo descomprimido.
+            codec = detect_compression(filename, content)
+            data_name = strip_compression_extension(filename) if codec else filename
+            extension = data_name.split('.')[-1].lower()
 
             if extension not in DATA_LOADERS:
                 log_etl_event(f"Archivo '{filename}' omitido: tipo de archivo no soportado.", level='warning')
+                return {'skipped': True}
+
+            # Los archivos comprimidos con lector por trozos se leen siempre en
+            # flujo: su tamaño descomprimido no se conoce de antemano.
+            streaming = extension in STREAMING_LOADERS and (
+                codec is not None or _content_size(content) >= ETL_STREAMING_THRESHOLD_BYTES
+            )
+            by_sheet = extension in SHEET_LOADERS
+            if streaming:
+                loader_func = STREAMING_LOADERS[extension]
+            elif by_sheet:
+                loader_func = SHEET_LOADERS[extension]
+            else:
+                loader_func = DATA_LOADERS[extension]
+
+            cache_key = None
+            if ETL_CACHE_ENABLED:
+                normalization_config = STREAMING_NORMALIZATION_CONFIG if streaming else MANDATORY_NORMALIZATION_CONFIG
+                loader_name = _loader_name(loader_func)
+                if by_sheet and EXCEL_SHEETS:
+                    # El filtro de hojas cambia las salidas del libro.
+                    loader_name += f"[{','.join(EXCEL_SHEETS)}]"
+                cache_key = etl_cache.key(content, loader_name, normalization_config, _output_settings())
+                cached_sources = _restore_from_cache(filename, source_key, cache_key)
+                if cached_sources is not None:
+                    return {'sources': cached_sources}
+
+            if codec and not streaming:
+                # Los formatos sin lector por trozos (Excel, Parquet, YAML) necesitan
+                # el archivo completo: se descomprime en memoria, con los mismos límites.
+                with open_compressed(content, codec) as stream:
+                    content = stream.read()
+
+            # Cada salida es (hoja o None, nombre de la fuente, ruta del Parquet o None).
+            outputs: List[Tuple[Optional[str], str, Optional[str]]] = []
+            output_path = _individual_output_path(source_key)
+            flattened = extension in FLATTENED_JSON_EXTENSIONS
+            if streaming and codec:
+                with open_compressed(content, codec) as stream:
+                    chunks = loader_func(stream)
+                    if flattened:
+                        chunks = map(_join_flattened_keys, chunks)
+                    outputs.append((None, filename, _process_stream(chunks, filename, output_path)))
+            elif streaming:
+                chunks = loader_func(content)
+                if flattened:
+                    chunks = map(_join_flattened_keys, chunks)
+                outputs.append((None, filename, _process_stream(chunks, filename, output_path)))
+            elif by_sheet:
+                # Cada hoja se normaliza y exporta mientras se leen las siguientes;
+                # el orden del libro mantiene estable el dataset maestro.
+                for sheet_name, df in loader_func(content, sheets=EXCEL_SHEETS, ordered=True):
+                    source_name = _source_name(filename, sheet_name)
+                    output_path = _individual_output_path(_source_name(source_key, sheet_name))
+                    outputs.append((sheet_name, source_name, _process_dataframe(df, source_name, output_path)))
+                    del df
+            else:
+                loaded_data = loader_func(_read_content(content))
+                if flattened:
+                    loaded_data = _join_flattened_keys(loaded_data)
+                data_sources: Dict[Optional[str], pd.DataFrame] = {}
+                if isinstance(loaded_data, pd.DataFrame):
+                    data_sources[None] = loaded_data
+                elif isinstance(loaded_data, dict):
+                    data_sources.update(loaded_data)
+                for sheet_name, df in data_sources.items():
+                    source_name = _source_name(filename, sheet_name)
+                    output_path = _individual_output_path(_source_name(source_key, sheet_name))
+                    outputs.append((sheet_name, source_name, _process_dataframe(df, source_name, output_path)))
+
+            if cache_key is not None and outputs and all(path is not None for _, _, path in outputs):
+                etl_cache.store(cache_key, [(sheet_name, path) for sheet_name, _, path in outputs])
+
+            return {'sources': [(source_name, path) for _, source_name, path in outputs]}
+
+    except Exception as e:
+        error_msg = f"Error crítico procesando el archivo '{filename}': {e}"
+        log_etl_event(error_msg, level='error')
+        if _is_transient(e):
+            return {'error': error_msg, 'transient': True}
+        return {'error': error_msg}
+
+def _create_executor(max_workers: int) -> Executor:
+    """
+    Crea el pool de workers del ETL.
+
+    Los procesos daemon (p. ej. los workers prefork de Celery) no pueden tener
+    hijos, así que en ellos se usa un pool de hilos en su lugar.
+    """
+    if multiprocessing.current_process().daemon:
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="etl-worker")
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(ETL_MP_START_METHOD)
+    )
+
+def _execute_files(
+    files: List[Tuple[str, FileContent]], max_workers: int, timeout_seconds: float, spool_dir: str,
+    skip: Container[int] = (),
+    on_result: Optional[Callable[[Tuple[int, ...], str, Dict[str, Any]], None]] = None
+) -> Dict[Tuple[int, ...], Tuple[str, Dict[str, Any]]]:
+    """
+    Procesa los archivos y devuelve sus resultados indexados por su posición.
+
+    La clave de cada resultado es su ruta de orden: (i,) para el i-ésimo archivo
+    recibido y (i, j) para el j-ésimo miembro de ese archivo comprimido, de modo
+    que ordenar las claves reproduce el orden de entrada sin importar qué worker
+    termine primero.
+
+    :param skip: Posiciones de archivos que no se procesan (ya completados en un intento anterior).
+    :param on_result: Se llama en el proceso principal con (clave, nombre, resultado)
+                      en cuanto termina cada archivo o miembro.
+    """
+    results: Dict[Tuple[int, ...], Tuple[str, Dict[str, Any]]] = {}
+    files = [(i, filename, content) for i, (filename, content) in enumerate(files) if i not in skip]
+
+    if max_workers <= 1:
+        pending = [((i,), filename, content, filename) for i, filename, content in files]
+        while pending:
+            key, filename, content, source_key = pending.pop(0)
+            outcome = _process_file(filename, content, spool_dir, timeout_seconds, source_key)
+            results[key] = (filename, outcome)
+            if on_result is not None:
+                on_result(key, filename, outcome)
+            for j, (member_name, member_content) in enumerate(outcome.get('extracted', {}).items()):
+                pending.append((key + (j,), member_name, member_content, f"{source_key}/{member_name}"))
+        return results
+
+    with _create_executor(max_workers) as executor:
+        running = {
+            executor.submit(_process_file, filename, content, spool_dir, timeout_seconds): ((i,), filename, filename)
+            for i, filename, content in files
+        }
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, filename, source_key = running.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    # El worker murió (p. ej. por falta de memoria) antes de devolver un resultado.
+                    error_msg = f"Error crítico procesando el archivo '{filename}': {e}"
+                    log_etl_event(error_msg, level='error')
+                    outcome = {'error': error_msg, 'transient': True}
+                results[key] = (filename, outcome)
+                if on_result is not None:
+                    on_result(key, filename, outcome)
+                # Los miembros de un archivo comprimido se reparten entre los workers.
+                for j, (member_name, member_content) in enumerate(outcome.get('extracted', {}).items()):
+                    member_key = f"{source_key}/{member_name}"
+                    member_future = executor.submit(
+                        _process_file, member_name, member_content, spool_dir, timeout_seconds, member_key
+                    )
+                    running[member_future] = (key + (j,), member_name, member_key)
+
+    return results
+
+def _output_settings() -> Dict[str, Any]:
+    """
+    Ajustes del entorno que cambian el contenido o los tipos de las salidas; forman
+    parte de las claves de la caché y de los puntos de control.
+    """
+    return {
+        'json_flatten_max_level': json_loader.JSON_FLATTEN_MAX_LEVEL,
+        'csv_arrow': csv_loader.CSV_ARROW_ENABLED,
+        'jsonl_arrow': jsonl_loader.JSONL_ARROW_ENABLED,
+        'categorical_max_ratio': normalization_pipeline.CATEGORICAL_MAX_RATIO,
+        'dictionary_max_ratio': data_exporter.DICTIONARY_MAX_CARDINALITY_RATIO,
+        'row_group_size': data_exporter.EXPORT_ROW_GROUP_SIZE,
+    }
+
+def _input_hash(content: FileContent) -> str:
+    # Incluye la configuración de normalización y los ajustes de salida: si
+    # cambian, el punto de control deja de valer.
+    return EtlResultCache.key(content, 'checkpoint', MANDATORY_NORMALIZATION_CONFIG, _output_settings())
+
+def changed_failed_inputs(job_id: str, file_contents: Dict[str, FileContent]) -> List[str]:
+    """
+    Archivos que fallaron en el trabajo y cuyo contenido ya no es el que se
+    procesó (o que ya no se pueden leer); reintentar solo tiene sentido para estos.
+    """
+    changed = []
+    for filename, checkpoint in get_state_store().get_etl_checkpoints(job_id).items():
+        if checkpoint['status'] != 'failed' or filename not in file_contents:
+            continue
+        try:
+            if _input_hash(file_contents[filename]) != checkpoint['input_hash']:
+                changed.append(filename)
+        except OSError:
+            changed.append(filename)
+    return changed
+
+def _outcome_failed(outcome: Dict[str, Any]) -> bool:
+    return 'error' in outcome or any(path is None for _, path in outcome.get('sources', []))
+
+class JobCheckpoints:
+    """
+    Puntos de control de una ejecución del ETL con identificador de trabajo.
+
+    Cada archivo recibido tiene un punto de control en el StateStore con el hash
+    de su contenido, su estado y sus resultados (las rutas de los Parquet de
+    cada fuente, con su tamaño y hash), que se registra en cuanto el archivo y,
+    si es un comprimido, todos sus miembros terminan. Al reanudar el mismo
+    trabajo, los archivos completados cuyo contenido no cambió y cuyos Parquet
+    siguen en disco sin cambios no se vuelven a procesar; si otro trabajo
+    reescribió alguno de esos Parquet, el archivo se procesa de nuevo. Los
+    miembros de un comprimido a medias también se procesan de nuevo.
+    """
+    def __init__(self, job_id: str, files: List[Tuple[str, FileContent]]):
+        self.job_id = job_id
+        self.store = get_state_store()
+        self.filenames = [filename for filename, _ in files]
+        self.hashes = [_input_hash(content) for _, content in files]
+        self.sizes = [_content_size(content) for _, content in files]
+        previous = self.store.get_etl_checkpoints(job_id)
+        self.store.start_etl_job(job_id, len(files), sum(self.sizes))
+
+        # Resultados recuperados de un intento anterior, con las claves de _execute_files.
+        self.restored: Dict[Tuple[int, ...], Tuple[str, Dict[str, Any]]] = {}
+        self._pending: Dict[int, int] = {}
+        self._entries: Dict[int, List[Any]] = {}
+        for i, filename in enumerate(self.filenames):
+            entries = self._reusable_entries(previous.get(filename), self.hashes[i])
+            if entries is None:
+                self._pending[i] = 1
+                self._entries[i] = []
                 continue
+            for suffix, name, outcome in entries:
+                self.restored[(i, *suffix)] = (name, outcome)
+        # Posiciones de los archivos que no hay que volver a procesar.
+        self.completed = [i for i in range(len(self.filenames)) if i not in self._pending]
+
+        if self.completed:
+            log_etl_event(f"Reanudando el trabajo ETL '{job_id}'.", extra_data={
+                "job_id": job_id,
+                "resumed_files": [self.filenames[i] for i in self.completed],
+                "pending_files": [self.filenames[i] for i in self._pending]
+            })
+
+    @staticmethod
+    def _reusable_entries(checkpoint: Optional[Dict[str, Any]], input_hash: str) -> Optional[List[Any]]:
+        if checkpoint is None or checkpoint['status'] != 'completed' or checkpoint['input_hash'] != input_hash:
+            return None
+        outputs = checkpoint['outputs'] or {}
+        for path, fingerprint in outputs.get('files', {}).items():
+            try:
+                if os.path.getsize(path) != fingerprint[0] or file_fingerprint(path) != fingerprint:
+                    return None
+            except FileNotFoundError:
+                return None
+        return outputs.get('results', [])
+
+    def record(self, key: Tuple[int, ...], filename: str, outcome: Dict[str, Any]):
+        """Anota el resultado de un archivo o miembro; guarda el punto de control al completar el archivo."""
+        i = key[0]
+        self._pending[i] += len(outcome.get('extracted', {})) - 1
+        if 'sources' in outcome or 'error' in outcome:
+            self._entries[i].append((list(key[1:]), filename, outcome))
+        if self._pending[i]:
+            return
+        entries = self._entries.pop(i)
+        failed = any(_outcome_failed(outcome) for _, _, outcome in entries)
+        files = {} if failed else {
+            path: file_fingerprint(path)
+            for _, _, outcome in entries for _, path in outcome.get('sources', [])
+        }
+        self.store.record_etl_checkpoint(
+            self.job_id, self.filenames[i], self.hashes[i],
+            'failed' if failed else 'completed', self.sizes[i], {'results': entries, 'files': files}
+        )
+
+    def finish(self, status: str):
+        self.store.finish_etl_job(self.job_id, status)
+
+def run_full_etl_process(
+    file_contents: Dict[str, FileContent],
+    max_workers: int = None,
+    timeout_seconds: float = None,
+    job_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Orquesta el pipeline ETL para múltiples archivos, manejando Excel con múltiples hojas.
+
+    Cada archivo (y cada miembro de un archivo comprimido) se descomprime, carga y
+    normaliza en paralelo en un pool de procesos. Los resultados se recogen a medida
+    que terminan, pero se unifican en el orden de entrada para que la salida sea
+    determinista. Con ETL_GLOBAL_DEDUP, una fila repetida en varias fuentes solo
+    se conserva en el dataset maestro la primera vez que aparece.
 
-            loader_func = DATA_LOADERS[extension]
-            loaded_data = loader_func(content)
-
-            data_sources: Dict[str, pd.DataFrame] = {}
-            if isinstance(loaded_data, pd.DataFrame):
-                data_sources[filename] = loaded_data
-            elif isinstance(loaded_data, dict):
-                for sheet_name, df in loaded_data.items():
-                    source_name = f"{os.path.splitext(filename)[0]}_{sheet_name}"
-                    data_sources[source_name] = df
-
-            for source_name, df in data_sources.items():
-                processed_df = _process_dataframe(df, source_name)
-                if processed_df is not None:
-                    processed_dfs.append(processed_df)
-                    individual_results[source_name] = f"data/output/processed_{os.path.splitext(source_name)[0]}.parquet"
-                else:
-                    individual_results[source_name] = {"error": f"Fallo el procesamiento para {source_name}"}
-
-        except Exception as e:
-            error_msg = f"Error crítico procesando el archivo '{filename}': {e}"
-            log_etl_event(error_msg, level='error')
-            individual_results[filename] = {"error": error_msg}
-
-    if not processed_dfs:
+    :param file_contents: Diccionario nombre de archivo -> contenido en bytes o ruta en disco.
+                          Los CSV/TSV de al menos ETL_STREAMING_THRESHOLD_BYTES se procesan
+                          por trozos con memoria acotada.
+    :param max_workers: Workers en paralelo; por defecto ETL_MAX_WORKERS (1 = secuencial).
+    :param timeout_seconds: Tiempo máximo por archivo; por defecto ETL_FILE_TIMEOUT_SECONDS.
+    :param job_id: Identificador del trabajo. Si se indica, el avance se registra en el
+                   StateStore archivo a archivo (ver JobCheckpoints) y una nueva ejecución
+                   con el mismo job_id solo procesa los archivos que no se completaron.
+    """
+    max_workers = ETL_MAX_WORKERS if max_workers is None else max_workers
+    timeout_seconds = ETL_FILE_TIMEOUT_SECONDS if timeout_seconds is None else timeout_seconds
+
+    os.makedirs(ETL_OUTPUT_DIRECTORY, exist_ok=True)
+
+    log_etl_event("Inicio del proceso ETL multi-archivo.", extra_data={
+        "file_count": len(file_contents),
+        "max_workers": max_workers,
+        "job_id": job_id
+    })
+
+    files = list(file_contents.items())
+    checkpoints = JobCheckpoints(job_id, files) if job_id is not None else None
+    try:
+        # Los miembros extraídos de archivos comprimidos solo viven durante la ejecución.
+        with tempfile.TemporaryDirectory(prefix="sadi-etl-", dir=ETL_SPOOL_DIRECTORY) as spool_dir:
+            if checkpoints is None:
+                results = _execute_files(files, max_workers, timeout_seconds, spool_dir)
+            else:
+                results = _execute_files(
+                    files, max_workers, timeout_seconds, spool_dir,
+                    skip=set(checkpoints.completed), on_result=checkpoints.record
+                )
+                results.update(checkpoints.restored)
+        result = _unify_results(results)
+    except BaseException:
+        if checkpoints is not None:
+            checkpoints.finish('failed')
+        raise
+    if checkpoints is not None:
+        failed = any(_outcome_failed(outcome) for _, outcome in results.values())
+        checkpoints.finish('failed' if failed else 'completed')
+
+    log_etl_event("Proceso ETL multi-archivo completado.")
+    return result
+
+def _unify_results(results: Dict[Tuple[int, ...], Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """Une las fuentes procesadas, en el orden de entrada, en el dataset maestro."""
+    processed_sources: List[Tuple[str, str]] = []
+    individual_results = {}
+
+    for key in sorted(results):
+        filename, outcome = results[key]
+        if 'error' in outcome:
+            individual_results[filename] = {
+                key: value for key, value in outcome.items() if key in ('error', 'transient')
+            }
+            continue
+        for source_name, output_path in outcome.get('sources', []):
+            if output_path is not None:
+                processed_sources.append((source_name, output_path))
+                individual_results[source_name] = output_path
+            else:
+                individual_results[source_name] = {"error": f"Fallo el procesamiento para {source_name}"}
+
+    provenance = None
+    deduplication = None
+    if not processed_sources:
         log_etl_event("No se procesaron datos, no se realizará la unificación.", level='warning')
         master_file_path = None
     else:
-        log_etl_event("Iniciando unificación de todos los DataFrames procesados.")
-        unified_df = unify_dataframes(processed_dfs)
-        master_file_path = "data/output/master_dataset"
-        export_data(unified_df, master_file_path, 'parquet')
-        log_etl_event(f"DataFrame unificado exportado a {master_file_path}.parquet.", extra_data={"total_rows": len(unified_df)})
-        master_file_path += ".parquet"
-
-    log_etl_event("Proceso ETL multi-archivo completado.")
+        # Las fuentes se leen desde sus Parquet individuales lote a lote, así que
+        # la memoria queda acotada por el lote más grande.
+        log_etl_event("Iniciando unificación de todas las fuentes procesadas.")
+        master_file_path = f"{ETL_OUTPUT_DIRECTORY}/master_dataset.parquet"
+        with RowDeduplicator() as deduplicator:
+            report = unify_to_parquet(
+                processed_sources, master_file_path,
+                deduplicator=deduplicator if ETL_GLOBAL_DEDUP else None
+            )
+        provenance = report["provenance"]
+        promoted_columns = {
+            name: info for name, info in provenance.items()
+            if len(set(info["sources"].values())) > 1
+        }
+        if ETL_GLOBAL_DEDUP:
+            deduplication = {
+                "duplicates_removed": report["duplicates_removed"],
+                "duplicates_per_source": report["duplicates_per_source"],
+            }
+        log_etl_event(f"DataFrame unificado exportado a {master_file_path}.", extra_data={
+            "total_rows": report["total_rows"],
+            "rows_per_source": report["rows_per_source"],
+            "promoted_columns": promoted_columns,
+            "deduplication": deduplication,
+            "peak_rss_bytes": peak_rss_bytes()
+        })
 
     return {
         "individual_files": individual_results,
-        "master_dataset": master_file_path
+        "master_dataset": master_file_path,
+        "provenance": provenance,
+        "deduplication": deduplication
     }
@@ -0,0 +1,435 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from backend.app.services.normalization_pipeline import (
+    FUSABLE_FILL_STRATEGIES,
+    LABEL_STEPS,
+    PIPELINE_STEPS,
+    compile_pipeline,
+    execute_plan,
+)
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# --- Configuración ---
+# Hilos con los que el motor Arrow calcula en paralelo las agregaciones por
+# columna (media, mediana, moda). Polars usa su propio pool (POLARS_MAX_THREADS).
+ARROW_AGGREGATION_THREADS = int(os.getenv("SADI_ARROW_AGGREGATION_THREADS", str(pa.cpu_count())))
+ROW_NUMBER_COLUMN = "__sadi_row_number"
+
+# Conversiones de convert_types que los motores reproducen igual que pandas:
+# tipo destino -> (tipo canónico, clases de tipo de origen admitidas). Las demás
+# (texto, fechas, categorías...) se ejecutan con pandas.
+NATIVE_CASTS = {
+    'int': ('int64', ('integer', 'boolean')),
+    'int64': ('int64', ('integer', 'boolean')),
+    'float': ('float64', ('integer', 'floating', 'boolean')),
+    'float64': ('float64', ('integer', 'floating', 'boolean')),
+}
+
+class UnsupportedStepError(Exception):
+    """El motor no puede reproducir un paso con la semántica de pandas; el paso se ejecuta con pandas."""
+
+def _value_kind(value: Any) -> Optional[str]:
+    """Clase de tipo de un valor de relleno, comparable con la de una columna."""
+    if isinstance(value, (bool, np.bool_)):
+        return 'boolean'
+    if isinstance(value, (int, np.integer)):
+        return 'integer'
+    if isinstance(value, (float, np.floating)):
+        return 'floating'
+    if isinstance(value, str):
+        return 'string'
+    return None
+
+def _fill_compatible(column_kind: Optional[str], value: Any) -> bool:
+    """Indica si rellenar la columna con `value` conserva su tipo, como hace pandas."""
+    value_kind = _value_kind(value)
+    if column_kind == 'floating':
+        return value_kind in ('integer', 'floating')
+    return column_kind is not None and column_kind == value_kind
+
+def _native_cast(new_type: str, source_kind: Optional[str], allowed_sources: Optional[tuple] = None) -> str:
+    """Devuelve el tipo canónico de la conversión o lanza UnsupportedStepError."""
+    if new_type not in NATIVE_CASTS:
+        raise UnsupportedStepError(f"Conversión a '{new_type}' no soportada de forma nativa.")
+    target, sources = NATIVE_CASTS[new_type]
+    if source_kind not in (allowed_sources if allowed_sources is not None else sources):
+        raise UnsupportedStepError(f"Conversión de '{source_kind}' a '{new_type}' no soportada de forma nativa.")
+    return target
+
+# --- Motores ---
+
+class NormalizationEngine(ABC):
+    """
+    Ejecuta los pasos de PIPELINE_STEPS sobre un formato columnar propio.
+
+    Cada paso se implementa como un método `step_<nombre>` que recibe los mismos
+    parámetros que su versión de pandas y devuelve el resultado sin modificar la
+    entrada. Los pasos sin método, los que lanzan UnsupportedStepError y los que
+    fallan se ejecutan con pandas (ver run_with_engine), de modo que el resultado
+    es siempre el mismo que con el motor 'pandas'.
+    """
+    # Los motores perezosos solo ejecutan los pasos al convertir a pandas, así
+    # que sus métricas se registran una vez para todo el pipeline.
+    lazy = False
+
+    @abstractmethod
+    def from_pandas(self, df: pd.DataFrame) -> Any:
+        """Convierte el DataFrame al formato del motor."""
+
+    @abstractmethod
+    def to_pandas(self, data: Any) -> pd.DataFrame:
+        """Convierte el resultado del motor de vuelta a pandas."""
+
+    @abstractmethod
+    def num_rows(self, data: Any) -> int:
+        """Número de filas de los datos del motor."""
+
+    @abstractmethod
+    def nbytes(self, data: Any) -> int:
+        """Memoria que ocupan los datos del motor, en bytes."""
+
+    def run_step(self, data: Any, step_name: str, params: Dict[str, Any]) -> Any:
+        step = getattr(self, f"step_{step_name}", None)
+        if step is None:
+            raise UnsupportedStepError(f"El paso '{step_name}' no tiene implementación nativa.")
+        return step(data, **params)
+
+    @staticmethod
+    def _check_columns(df: pd.DataFrame):
+        if df.columns.has_duplicates or not all(isinstance(col, str) for col in df.columns):
+            raise UnsupportedStepError("Las columnas deben tener nombres de texto únicos.")
+
+class ArrowEngine(NormalizationEngine):
+    """Ejecuta los pasos con pyarrow.compute sobre una pyarrow.Table (multihilo)."""
+
+    def from_pandas(self, df: pd.DataFrame) -> pa.Table:
+        self._check_columns(df)
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def to_pandas(self, table: pa.Table) -> pd.DataFrame:
+        return table.to_pandas()
+
+    def num_rows(self, table: pa.Table) -> int:
+        return table.num_rows
+
+    def nbytes(self, table: pa.Table) -> int:
+        return table.nbytes
+
+    @staticmethod
+    def _kind(data_type: pa.DataType) -> Optional[str]:
+        if pa.types.is_integer(data_type):
+            return 'integer'
+        if pa.types.is_floating(data_type):
+            return 'floating'
+        if pa.types.is_boolean(data_type):
+            return 'boolean'
+        if pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+            return 'string'
+        return None
+
+    @staticmethod
+    def _replace(table: pa.Table, col: str, values) -> pa.Table:
+        return table.set_column(table.schema.get_field_index(col), col, values)
+
+    def _relabel(self, table: pa.Table, label_function: Callable[[Any], Any]) -> pa.Table:
+        return table.rename_columns([label_function(col) for col in table.column_names])
+
+    def step_rename_columns(self, table: pa.Table, rename_mapping: Dict[str, str]) -> pa.Table:
+        return self._relabel(table, LABEL_STEPS['rename_columns'](rename_mapping))
+
+    def step_to_snake_case(self, table: pa.Table) -> pa.Table:
+        return self._relabel(table, LABEL_STEPS['to_snake_case']())
+
+    def step_remove_duplicates(self, table: pa.Table, subset: List[str] = None) -> pa.Table:
+        # Se agrupa por las columnas clave y se conserva la primera fila de cada
+        # grupo, en el orden original, como drop_duplicates(keep='first').
+        keys = list(subset) if subset is not None else table.column_names
+        row_numbers = pa.array(np.arange(table.num_rows, dtype=np.int64))
+        first_rows = (
+            table.select(keys)
+            .append_column(ROW_NUMBER_COLUMN, row_numbers)
+            .group_by(keys)
+            .aggregate([(ROW_NUMBER_COLUMN, 'min')])
+            .column(f"{ROW_NUMBER_COLUMN}_min")
+        )
+        if len(first_rows) == table.num_rows:
+            return table
+        return table.take(np.sort(first_rows.to_numpy()))
+
+    def step_handle_nulls(self, table: pa.Table, strategy: str = 'mean', subset: List[str] = None) -> pa.Table:
+        columns = subset if subset is not None else table.column_names
+        if strategy == 'drop':
+            keep = None
+            for col in columns:
+                valid = pc.is_valid(table[col])
+                keep = valid if keep is None else pc.and_(keep, valid)
+            if keep is None or pc.all(keep).as_py():
+                return table
+            return table.filter(keep)
+        if strategy not in FUSABLE_FILL_STRATEGIES:
+            return table
+
+        targets = [
+            col for col in columns
+            if self._kind(table.schema.field(col).type) in ('integer', 'floating') and table[col].null_count > 0
+        ]
+        if not targets:
+            return table
+        aggregate = ARROW_FILL_AGGREGATES[strategy]
+        with ThreadPoolExecutor(max_workers=max(1, min(ARROW_AGGREGATION_THREADS, len(targets)))) as pool:
+            fill_values = list(pool.map(lambda col: aggregate(table[col]), targets))
+        for col, value in zip(targets, fill_values):
+            table = self._replace(table, col, pc.fill_null(table[col], value))
+        return table
+
+    def step_fill_nulls(self, table: pa.Table, value: Any, subset: List[str] = None) -> pa.Table:
+        columns = subset if subset is not None else table.column_names
+        for col in columns:
+            column = table[col]
+            if column.null_count == 0:
+                continue
+            if not _fill_compatible(self._kind(column.type), value):
+                raise UnsupportedStepError(f"Rellenar '{col}' con {value!r} cambia su tipo.")
+            table = self._replace(table, col, pc.fill_null(column, pa.scalar(value).cast(column.type)))
+        return table
+
+    def step_convert_types(self, table: pa.Table, type_mapping: Dict[str, str]) -> pa.Table:
+        for col, new_type in type_mapping.items():
+            if col not in table.column_names:
+                continue
+            column = table[col]
+            # Las columnas con nulos no pueden pasar a entero en pandas.
+            sources = ('integer', 'boolean') if column.null_count == 0 else ()
+            target = _native_cast(new_type, self._kind(column.type), sources if new_type in ('int', 'int64') else None)
+            table = self._replace(table, col, column.cast(pa.type_for_alias(target), safe=False))
+        return table
+
+ARROW_FILL_AGGREGATES: Dict[str, Callable[[pa.ChunkedArray], pa.Scalar]] = {
+    'mean': pc.mean,
+    'median': lambda values: pc.quantile(values, q=0.5, interpolation='linear')[0],
+    # pc.mode devuelve primero el valor más pequeño entre los empatados, como pandas.
+    'mode': lambda values: pc.mode(values, n=1)[0]['mode'],
+}
+
+class PolarsEngine(NormalizationEngine):
+    """Construye los pasos sobre un polars.LazyFrame y los ejecuta al convertir a pandas (multihilo)."""
+    lazy = True
+
+    def __init__(self):
+        if pl is None:
+            raise ValueError("El motor de normalización 'polars' requiere el paquete 'polars', que no está instalado.")
+
+    def from_pandas(self, df: pd.DataFrame) -> "pl.LazyFrame":
+        self._check_columns(df)
+        # Polars no conserva el orden de las categorías de pandas.
+        if any(isinstance(dtype, pd.CategoricalDtype) for dtype in df.dtypes):
+            raise UnsupportedStepError("Las columnas categóricas no se convierten a Polars.")
+        return pl.from_pandas(df).lazy()
+
+    def to_pandas(self, frame: "pl.LazyFrame") -> pd.DataFrame:
+        return frame.collect().to_pandas()
+
+    # Materializan el plan; run_with_engine no las usa con motores perezosos.
+    def num_rows(self, frame: "pl.LazyFrame") -> int:
+        return frame.select(pl.len()).collect().item()
+
+    def nbytes(self, frame: "pl.LazyFrame") -> int:
+        return int(frame.collect().estimated_size())
+
+    @staticmethod
+    def _kind(dtype) -> Optional[str]:
+        if dtype.is_integer():
+            return 'integer'
+        if dtype.is_float():
+            return 'floating'
+        if dtype == pl.Boolean:
+            return 'boolean'
+        if dtype == pl.String:
+            return 'string'
+        return None
+
+    def _relabel(self, frame: "pl.LazyFrame", label_function: Callable[[Any], Any]) -> "pl.LazyFrame":
+        names = frame.collect_schema().names()
+        labels = [label_function(col) for col in names]
+        if len(set(labels)) != len(labels):
+            raise UnsupportedStepError("Polars no admite nombres de columna duplicados.")
+        return frame.rename(dict(zip(names, labels)))
+
+    def step_rename_columns(self, frame: "pl.LazyFrame", rename_mapping: Dict[str, str]) -> "pl.LazyFrame":
+        return self._relabel(frame, LABEL_STEPS['rename_columns'](rename_mapping))
+
+    def step_to_snake_case(self, frame: "pl.LazyFrame") -> "pl.LazyFrame":
+        return self._relabel(frame, LABEL_STEPS['to_snake_case']())
+
+    def step_remove_duplicates(self, frame: "pl.LazyFrame", subset: List[str] = None) -> "pl.LazyFrame":
+        return frame.unique(subset=subset, keep='first', maintain_order=True)
+
+    def step_handle_nulls(self, frame: "pl.LazyFrame", strategy: str = 'mean', subset: List[str] = None) -> "pl.LazyFrame":
+        if strategy == 'drop':
+            return frame if subset == [] else frame.drop_nulls(subset=subset)
+        if strategy not in FUSABLE_FILL_STRATEGIES:
+            return frame
+        schema = frame.collect_schema()
+        columns = subset if subset is not None else schema.names()
+        # Las columnas enteras procedentes de pandas no tienen nulos; rellenarlas
+        # las convertiría a coma flotante.
+        targets = [col for col in columns if self._kind(schema[col]) == 'floating']
+        if not targets:
+            return frame
+        return frame.with_columns([pl.col(col).fill_null(POLARS_FILL_AGGREGATES[strategy](col)) for col in targets])
+
+    def step_fill_nulls(self, frame: "pl.LazyFrame", value: Any, subset: List[str] = None) -> "pl.LazyFrame":
+        schema = frame.collect_schema()
+        columns = subset if subset is not None else schema.names()
+        for col in columns:
+            if not _fill_compatible(self._kind(schema[col]), value):
+                raise UnsupportedStepError(f"Rellenar '{col}' con {value!r} cambia su tipo.")
+        return frame.with_columns([pl.col(col).fill_null(pl.lit(value)) for col in columns])
+
+    def step_convert_types(self, frame: "pl.LazyFrame", type_mapping: Dict[str, str]) -> "pl.LazyFrame":
+        schema = frame.collect_schema()
+        casts = []
+        for col, new_type in type_mapping.items():
+            if col not in schema:
+                continue
+            # Sin evaluar el plan no se sabe si hay nulos, así que a entero solo se convierten enteros.
+            sources = ('integer',) if new_type in ('int', 'int64') else None
+            target = _native_cast(new_type, self._kind(schema[col]), sources)
+            casts.append(pl.col(col).cast(pl.Int64 if target == 'int64' else pl.Float64))
+        return frame.with_columns(casts) if casts else frame
+
+POLARS_FILL_AGGREGATES: Dict[str, Callable[[str], Any]] = {
+    'mean': lambda col: pl.col(col).mean(),
+    'median': lambda col: pl.col(col).median(),
+    # mode() de Polars cuenta el nulo como un valor más; pandas lo ignora.
+    'mode': lambda col: pl.col(col).drop_nulls().mode().min(),
+}
+
+NORMALIZATION_ENGINES: Dict[str, Type[NormalizationEngine]] = {
+    'arrow': ArrowEngine,
+    'polars': PolarsEngine,
+}
+
+def get_engine(name: str) -> NormalizationEngine:
+    """
+    Crea el motor de normalización indicado.
+
+    :raises: ValueError si el motor no existe o su dependencia no está instalada.
+    """
+    if name not in NORMALIZATION_ENGINES:
+        available = ', '.join(['pandas', *NORMALIZATION_ENGINES])
+        raise ValueError(f"Motor de normalización desconocido: '{name}'. Disponibles: {available}.")
+    return NORMALIZATION_ENGINES[name]()
+
+# --- Ejecución ---
+
+def _run_with_pandas(df: pd.DataFrame, config: List[Dict[str, Any]], metrics: Optional[List[Dict[str, Any]]]) -> pd.DataFrame:
+    first_metric = len(metrics) if metrics is not None else 0
+    result = execute_plan(df, compile_pipeline(config), metrics)
+    for metric in (metrics or [])[first_metric:]:
+        metric["engine"] = "pandas"
+    return result
+
+def run_with_engine(
+    df: pd.DataFrame,
+    config: List[Dict[str, Any]],
+    engine_name: str,
+    metrics: Optional[List[Dict[str, Any]]] = None
+) -> pd.DataFrame:
+    """
+    Ejecuta la configuración del pipeline con un motor distinto de pandas.
+
+    La entrada se convierte una sola vez al formato del motor y el resultado se
+    convierte a pandas al final. Un paso que el motor no puede reproducir se
+    ejecuta con pandas sobre el resultado intermedio; si después no se puede
+    volver al formato del motor, el resto del pipeline sigue con pandas. Si falla
+    la evaluación del plan (en los motores perezosos los errores aparecen al
+    convertir a pandas), todo el pipeline se repite con pandas.
+
+    :param df: El DataFrame a normalizar (no se modifica).
+    :param config: Lista de pasos, como en run_normalization_pipeline.
+    :param engine_name: Clave de NORMALIZATION_ENGINES.
+    :param metrics: Lista opcional donde se añaden las métricas de cada paso, con el motor que lo ejecutó.
+    :return: El DataFrame normalizado, con un RangeIndex.
+    """
+    engine = get_engine(engine_name)
+    try:
+        data = engine.from_pandas(df)
+    except Exception as e:
+        print(f"El motor '{engine_name}' no admite este DataFrame ({e}); se usa pandas.")
+        return _run_with_pandas(df, config, metrics)
+
+    first_metric = len(metrics) if metrics is not None else 0
+
+    def rerun_with_pandas(error: Exception) -> pd.DataFrame:
+        print(f"Error al evaluar el pipeline con el motor '{engine_name}' ({error}); se repite con pandas.")
+        if metrics is not None:
+            del metrics[first_metric:]
+        return _run_with_pandas(df, config, metrics)
+
+    start = time.perf_counter()
+    step_names = []
+    for position, step_config in enumerate(config):
+        step_name = step_config.get('step')
+        params = step_config.get('params', {})
+        if step_name not in PIPELINE_STEPS:
+            print(f"Advertencia: Paso del pipeline '{step_name}' no reconocido y será omitido.")
+            continue
+
+        step_start = time.perf_counter()
+        if not engine.lazy:
+            rows_before, bytes_before = engine.num_rows(data), engine.nbytes(data)
+        try:
+            data = engine.run_step(data, step_name, params)
+        except Exception:
+            try:
+                current = engine.to_pandas(data)
+            except Exception as e:
+                return rerun_with_pandas(e)
+            intermediate = _run_with_pandas(current, [step_config], metrics)
+            try:
+                data = engine.from_pandas(intermediate)
+            except Exception:
+                return _run_with_pandas(intermediate, config[position + 1:], metrics).reset_index(drop=True)
+            continue
+
+        step_names.append(step_name)
+        if metrics is not None and not engine.lazy:
+            metrics.append({
+                "step": step_name,
+                "engine": engine_name,
+                "seconds": time.perf_counter() - step_start,
+                "rows_before": rows_before,
+                "rows_after": engine.num_rows(data),
+                "memory_delta_bytes": int(engine.nbytes(data) - bytes_before),
+            })
+
+    try:
+        result = engine.to_pandas(data)
+    except Exception as e:
+        return rerun_with_pandas(e)
+
+    if metrics is not None and engine.lazy and step_names:
+        metrics.append({
+            "step": '+'.join(step_names),
+            "engine": engine_name,
+            "seconds": time.perf_counter() - start,
+            "rows_before": len(df),
+            "rows_after": len(result),
+            "memory_delta_bytes": int(result.memory_usage(index=True, deep=False).sum()
+                                      - df.memory_usage(index=True, deep=False).sum()),
+        })
+    return result
@@ -1,6 +1,22 @@
+import os
+import numpy as np
 import pandas as pd
 import re
-from typing import Dict, Any, List, Callable
+import time
+from typing import Dict, Any, List, Callable, NamedTuple, Optional
+
+# Motor de ejecución por defecto: 'pandas', 'arrow' o 'polars' (ver normalization_engines).
+NORMALIZATION_ENGINE = os.getenv("SADI_NORMALIZATION_ENGINE", "pandas")
+# Proporción máxima de valores distintos para que optimize_dtypes convierta una
+# columna de texto en categoría.
+CATEGORICAL_MAX_RATIO = float(os.getenv("SADI_CATEGORICAL_MAX_RATIO", "0.5"))
+# Textos que optimize_dtypes reconoce como booleanos (sin distinguir mayúsculas).
+BOOLEAN_STRINGS = {
+    'true': True, 'false': False,
+    'yes': True, 'no': False,
+    'si': True, 'sí': True,
+    'verdadero': True, 'falso': False,
+}
 
 # --- Lógica de Conversión ---
 
@@ -11,83 +27,337 @@ def _to_snake_case(name: str) -> str:
     return re.sub(r'[\s\-]+', '_', s2)
 
 # --- Pasos de Transformación Modulares ---
+# Ningún paso modifica el DataFrame recibido: devuelven una copia superficial
+# (que comparte las columnas no tocadas) o el mismo DataFrame si no hay cambios.
+# Así el pipeline no necesita una copia defensiva completa de la entrada.
+
+def _fill_values(df: pd.DataFrame, strategy: str, subset: List[str] = None) -> pd.Series:
+    """
+    Calcula en una sola agregación vectorizada el valor de relleno de cada
+    columna numérica con nulos.
+    """
+    columns = subset if subset is not None else df.columns
+    dtypes = df.dtypes
+    non_null_counts = df.count()
+    targets = [
+        col for col in columns
+        if pd.api.types.is_numeric_dtype(dtypes[col]) and non_null_counts[col] < len(df)
+    ]
+    if not targets:
+        return pd.Series(dtype=object)
+    if strategy == 'mode':
+        return df[targets].mode().iloc[0]
+    return df[targets].agg(strategy)
 
 def handle_null_values(df: pd.DataFrame, strategy: str = 'mean', subset: List[str] = None) -> pd.DataFrame:
     """Maneja los valores nulos en el DataFrame."""
     if strategy == 'drop':
-        df.dropna(subset=subset, inplace=True)
-    elif strategy in ['mean', 'median', 'mode']:
-        for col in subset or df.columns:
-            if df[col].isnull().any():
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    fill_value = getattr(df[col], strategy)()
-                    df[col].fillna(fill_value, inplace=True)
+        keep = df.notna().all(axis=1) if subset is None else df[subset].notna().all(axis=1)
+        return df if keep.all() else df[keep]
+    if strategy in ['mean', 'median', 'mode']:
+        fill_values = _fill_values(df, strategy, subset)
+        if fill_values.empty:
+            return df
+        result = df.copy(deep=False)
+        for col, value in fill_values.items():
+            result[col] = df[col].fillna(value)
+        return result
     return df
 
+def fill_null_values(df: pd.DataFrame, value: Any, subset: List[str] = None) -> pd.DataFrame:
+    """Rellena los valores nulos de las columnas indicadas (todas por defecto) con un valor fijo."""
+    columns = subset if subset is not None else df.columns
+    null_counts = df[columns].isna().sum()
+    targets = [col for col in columns if null_counts[col] > 0]
+    if not targets:
+        return df
+    result = df.copy(deep=False)
+    for col in targets:
+        result[col] = df[col].fillna(value)
+    return result
+
 def convert_data_types(df: pd.DataFrame, type_mapping: Dict[str, str]) -> pd.DataFrame:
     """Convierte los tipos de datos de las columnas según el mapeo."""
+    result = df.copy(deep=False)
     for col, new_type in type_mapping.items():
-        if col in df.columns:
+        if col in result.columns:
             try:
                 if new_type == 'datetime':
-                    df[col] = pd.to_datetime(df[col])
+                    result[col] = pd.to_datetime(result[col])
                 else:
-                    df[col] = df[col].astype(new_type)
+                    result[col] = result[col].astype(new_type)
             except (TypeError, ValueError) as e:
                 print(f"No se pudo convertir la columna '{col}' a {new_type}: {e}")
-    return df
+    return result
 
 def remove_duplicates(df: pd.DataFrame, subset: List[str] = None) -> pd.DataFrame:
     """Elimina filas duplicadas."""
-    df.drop_duplicates(subset=subset, inplace=True)
-    return df
+    duplicated = df.duplicated(subset=subset)
+    return df[~duplicated] if duplicated.any() else df
+
+def _downcast_numeric(series: pd.Series, downcast_floats: bool) -> Optional[pd.Series]:
+    """Reduce un entero al menor tipo que admite sus valores, y un float64 a float32 si no pierde precisión."""
+    if not isinstance(series.dtype, np.dtype):
+        return None
+    if series.dtype.kind in 'iu':
+        result = pd.to_numeric(series, downcast='unsigned' if series.dtype.kind == 'u' else 'integer')
+    elif series.dtype.kind == 'f' and series.dtype.itemsize > 4 and downcast_floats:
+        values = series.to_numpy()
+        with np.errstate(over='ignore'):
+            narrowed = values.astype(np.float32)
+        if not np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+            return None
+        result = pd.Series(narrowed, index=series.index, name=series.name)
+    else:
+        return None
+    return result if result.dtype != series.dtype else None
+
+def _encode_object(series: pd.Series, categorical_max_ratio: float, parse_booleans: bool) -> Optional[pd.Series]:
+    """Convierte una columna object en booleana o categórica si sus valores lo permiten."""
+    try:
+        uniques = pd.unique(series.dropna())
+    except TypeError:
+        # Valores no hashables (listas, diccionarios...).
+        return None
+    if len(uniques) == 0:
+        return None
+
+    if parse_booleans and len(uniques) <= len(BOOLEAN_STRINGS):
+        mapping = {}
+        for value in uniques:
+            if isinstance(value, (bool, np.bool_)):
+                mapping[value] = bool(value)
+            elif isinstance(value, str) and value.strip().lower() in BOOLEAN_STRINGS:
+                mapping[value] = BOOLEAN_STRINGS[value.strip().lower()]
+            else:
+                break
+        else:
+            booleans = series.map(mapping)
+            return booleans.astype('boolean' if booleans.hasnans else bool)
+
+    if len(uniques) <= categorical_max_ratio * len(series) and all(isinstance(value, str) for value in uniques):
+        return series.astype('category')
+    return None
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    categorical_max_ratio: float = CATEGORICAL_MAX_RATIO,
+    parse_booleans: bool = True,
+    downcast_floats: bool = True
+) -> pd.DataFrame:
+    """
+    Reduce la memoria del DataFrame sin cambiar sus valores: enteros al menor
+    tipo que los admite, float64 a float32 cuando la conversión es exacta,
+    columnas de texto con valores booleanos ('true', 'no', 'sí'...) a bool y
+    columnas de texto repetitivo a category (diccionario en Arrow/Parquet).
+    """
+    result = None
+    for position, dtype in enumerate(df.dtypes):
+        series = df.iloc[:, position]
+        if dtype == object:
+            converted = _encode_object(series, categorical_max_ratio, parse_booleans)
+        else:
+            converted = _downcast_numeric(series, downcast_floats)
+        if converted is not None:
+            if result is None:
+                result = df.copy(deep=False)
+            result.isetitem(position, converted)
+    return df if result is None else result
+
+def dtype_memory_savings(before: pd.DataFrame, after: pd.DataFrame) -> Dict[str, int]:
+    """Bytes ahorrados por cada columna cuyo tipo cambió entre `before` y `after`."""
+    savings = {}
+    for position, (old_dtype, new_dtype) in enumerate(zip(before.dtypes, after.dtypes)):
+        if old_dtype != new_dtype:
+            savings[str(after.columns[position])] = int(
+                before.iloc[:, position].memory_usage(index=False, deep=True)
+                - after.iloc[:, position].memory_usage(index=False, deep=True)
+            )
+    return savings
+
+def _relabel(df: pd.DataFrame, label_function: Callable[[Any], Any]) -> pd.DataFrame:
+    """Cambia las etiquetas de las columnas sin copiar los datos."""
+    result = df.copy(deep=False)
+    result.columns = [label_function(col) for col in df.columns]
+    return result
 
 def rename_columns(df: pd.DataFrame, rename_mapping: Dict[str, str]) -> pd.DataFrame:
     """Renombra las columnas según el mapeo."""
-    df.rename(columns=rename_mapping, inplace=True)
-    return df
+    return _relabel(df, lambda col: rename_mapping.get(col, col))
 
 def convert_columns_to_snake_case(df: pd.DataFrame) -> pd.DataFrame:
     """Convierte todos los nombres de las columnas de un DataFrame a snake_case."""
-    df.columns = [_to_snake_case(col) for col in df.columns]
-    return df
+    return _relabel(df, _to_snake_case)
 
 # --- Mapeo de pasos del pipeline ---
 
 PIPELINE_STEPS: Dict[str, Callable[..., pd.DataFrame]] = {
     'handle_nulls': handle_null_values,
+    'fill_nulls': fill_null_values,
     'convert_types': convert_data_types,
     'remove_duplicates': remove_duplicates,
     'rename_columns': rename_columns,
     'to_snake_case': convert_columns_to_snake_case,
+    'optimize_dtypes': optimize_dtypes,
 }
 
-# --- Orquestador del Pipeline ---
+# Informes adicionales de un paso, calculados a partir del DataFrame antes y
+# después del paso solo cuando se piden métricas (ver execute_plan).
+STEP_REPORTERS: Dict[str, Callable[[pd.DataFrame, pd.DataFrame], Dict[str, Any]]] = {
+    'optimize_dtypes': dtype_memory_savings,
+}
+
+# Pasos que solo cambian etiquetas de columnas, expresados como función
+# etiqueta -> etiqueta, para poder componerlos en una única pasada.
+LABEL_STEPS: Dict[str, Callable[..., Callable[[Any], Any]]] = {
+    'rename_columns': lambda rename_mapping: (lambda col: rename_mapping.get(col, col)),
+    'to_snake_case': lambda: _to_snake_case,
+}
+# Estrategias de handle_nulls cuyos pasos consecutivos se rellenan en una sola agregación.
+FUSABLE_FILL_STRATEGIES = ('mean', 'median', 'mode')
+
+# --- Plan de Ejecución ---
+
+class PlanStep(NamedTuple):
+    """Un paso del plan compilado: uno o varios pasos de la configuración fusionados."""
+    name: str
+    run: Callable[[pd.DataFrame], pd.DataFrame]
+    report: Optional[Callable[[pd.DataFrame, pd.DataFrame], Dict[str, Any]]] = None
 
-def run_normalization_pipeline(df: pd.DataFrame, config: List[Dict[str, Any]]) -> pd.DataFrame:
+def _compose_labels(functions: List[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    def composed(col):
+        for function in functions:
+            col = function(col)
+        return col
+    return composed
+
+def _fused_fill(strategy: str, subsets: List[Optional[List[str]]]) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    if any(subset is None for subset in subsets):
+        subset = None
+    else:
+        subset = list(dict.fromkeys(col for cols in subsets for col in cols))
+    return lambda df: handle_null_values(df, strategy=strategy, subset=subset)
+
+def compile_pipeline(config: List[Dict[str, Any]]) -> List[PlanStep]:
     """
-    Ejecuta una serie de pasos de normalización en un DataFrame basados en una configuración.
+    Compila la configuración del pipeline en un plan de ejecución.
+
+    Los pasos consecutivos que solo renombran columnas (rename_columns,
+    to_snake_case) se fusionan en un único cambio de etiquetas, y los
+    handle_nulls consecutivos con la misma estrategia de relleno se resuelven
+    con una sola agregación. Los pasos no reconocidos se omiten con un aviso.
     """
-    if not isinstance(df, pd.DataFrame):
-        raise TypeError("La entrada 'df' debe ser un DataFrame de pandas.")
+    plan: List[PlanStep] = []
+    pending_labels: List[Callable[[Any], Any]] = []
+    pending_label_names: List[str] = []
+    pending_fill: Optional[Dict[str, Any]] = None
 
-    processed_df = df.copy()
+    def flush():
+        nonlocal pending_labels, pending_label_names, pending_fill
+        if pending_labels:
+            label_function = _compose_labels(pending_labels)
+            plan.append(PlanStep('+'.join(pending_label_names), lambda df, f=label_function: _relabel(df, f)))
+            pending_labels, pending_label_names = [], []
+        if pending_fill is not None:
+            plan.append(PlanStep(
+                '+'.join(['handle_nulls'] * len(pending_fill['subsets'])),
+                _fused_fill(pending_fill['strategy'], pending_fill['subsets'])
+            ))
+            pending_fill = None
 
     for step_config in config:
         step_name = step_config.get('step')
         params = step_config.get('params', {})
 
-        if step_name in PIPELINE_STEPS:
-            transform_function = PIPELINE_STEPS[step_name]
-            try:
-                # Pasar solo 'processed_df' si no hay 'params'
-                if not params:
-                    processed_df = transform_function(processed_df)
-                else:
-                    processed_df = transform_function(processed_df, **params)
-            except Exception as e:
-                print(f"Error en el paso del pipeline '{step_name}': {e}")
-        else:
+        if step_name not in PIPELINE_STEPS:
             print(f"Advertencia: Paso del pipeline '{step_name}' no reconocido y será omitido.")
+            continue
+
+        if step_name in LABEL_STEPS:
+            if pending_fill is not None:
+                flush()
+            pending_labels.append(LABEL_STEPS[step_name](**params))
+            pending_label_names.append(step_name)
+            continue
+
+        strategy = params.get('strategy', 'mean')
+        if step_name == 'handle_nulls' and strategy in FUSABLE_FILL_STRATEGIES:
+            if pending_labels or (pending_fill is not None and pending_fill['strategy'] != strategy):
+                flush()
+            if pending_fill is None:
+                pending_fill = {'strategy': strategy, 'subsets': []}
+            pending_fill['subsets'].append(params.get('subset'))
+            continue
+
+        flush()
+        transform_function = PIPELINE_STEPS[step_name]
+        # Pasar solo el DataFrame si no hay 'params'
+        plan.append(PlanStep(
+            step_name,
+            lambda df, f=transform_function, p=params: f(df, **p) if p else f(df),
+            STEP_REPORTERS.get(step_name)
+        ))
+
+    flush()
+    return plan
 
+def execute_plan(df: pd.DataFrame, plan: List[PlanStep], metrics: Optional[List[Dict[str, Any]]] = None) -> pd.DataFrame:
+    """
+    Ejecuta un plan compilado. Si se pasa `metrics`, añade por paso su duración,
+    las filas antes y después, la variación de memoria del DataFrame y, para los
+    pasos con informe (STEP_REPORTERS), su 'report'.
+    """
+    processed_df = df
+    for step in plan:
+        start = time.perf_counter()
+        memory_before = processed_df.memory_usage(index=True, deep=False).sum()
+        step_input = processed_df
+        try:
+            processed_df = step.run(processed_df)
+        except Exception as e:
+            print(f"Error en el paso del pipeline '{step.name}': {e}")
+        if metrics is not None:
+            metric = {
+                "step": step.name,
+                "seconds": time.perf_counter() - start,
+                "rows_before": len(step_input),
+                "rows_after": len(processed_df),
+                "memory_delta_bytes": int(processed_df.memory_usage(index=True, deep=False).sum() - memory_before),
+            }
+            if step.report is not None:
+                metric["report"] = step.report(step_input, processed_df)
+            metrics.append(metric)
     return processed_df
+
+# --- Orquestador del Pipeline ---
+
+def run_normalization_pipeline(
+    df: pd.DataFrame,
+    config: List[Dict[str, Any]],
+    metrics: Optional[List[Dict[str, Any]]] = None,
+    engine: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Ejecuta una serie de pasos de normalización en un DataFrame basados en una configuración.
+
+    El DataFrame de entrada no se modifica. Con el motor 'pandas' las columnas que
+    ningún paso cambia se comparten con él en lugar de copiarse; los motores
+    'arrow' y 'polars' convierten la entrada una vez, ejecutan todos los pasos en
+    su formato (con varios hilos) y solo convierten a pandas el resultado final,
+    que entonces lleva un RangeIndex.
+
+    :param df: El DataFrame a normalizar.
+    :param config: Lista de pasos, cada uno {'step': nombre, 'params': {...}}.
+    :param metrics: Lista opcional donde se añaden las métricas de cada paso (ver execute_plan).
+    :param engine: Motor de ejecución; por defecto NORMALIZATION_ENGINE.
+    :return: El DataFrame normalizado.
+    :raises: ValueError si el motor no existe o no está instalado.
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError("La entrada 'df' debe ser un DataFrame de pandas.")
+
+    engine = engine or NORMALIZATION_ENGINE
+    if engine != 'pandas':
+        from backend.app.services.normalization_engines import run_with_engine
+        return run_with_engine(df, config, engine, metrics)
+    return execute_plan(df, compile_pipeline(config), metrics)
@@ -0,0 +1,57 @@
+import json
+import zlib
+from typing import Any
+
+# msgpack + zstd is the preferred encoding. Both are optional: without them
+# payloads are stored as zlib-compressed JSON, which every node can read.
+try:
+    import msgpack
+    import zstandard
+except ImportError:
+    msgpack = None
+    zstandard = None
+
+# Every encoded payload starts with a tag naming its codec, so rows written
+# by nodes with different libraries installed remain readable.
+MSGPACK_ZSTD_TAG = b"MZ1"
+JSON_ZLIB_TAG = b"JZ1"
+ZSTD_LEVEL = 3
+
+
+def _default(obj: Any) -> Any:
+    """Converts numpy scalars and arrays, which charts often contain, to plain values."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def encode_payload(data: Any) -> bytes:
+    """Serializes and compresses a payload for storage in a BLOB column."""
+    if msgpack is not None:
+        packed = msgpack.packb(data, default=_default, use_bin_type=True)
+        return MSGPACK_ZSTD_TAG + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(packed)
+    return JSON_ZLIB_TAG + zlib.compress(json.dumps(data, default=_default).encode("utf-8"))
+
+
+def decode_payload(raw: Any) -> Any:
+    """
+    Decodes a stored payload.
+
+    Accepts the tagged binary formats written by encode_payload as well as
+    the plain JSON text stored by earlier versions.
+    """
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        return json.loads(raw)
+    raw = bytes(raw)
+    tag, body = raw[:3], raw[3:]
+    if tag == MSGPACK_ZSTD_TAG:
+        if msgpack is None:
+            raise RuntimeError("This payload needs the 'msgpack' and 'zstandard' packages to be decoded.")
+        return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(body), raw=False, strict_map_key=False)
+    if tag == JSON_ZLIB_TAG:
+        return json.loads(zlib.decompress(body).decode("utf-8"))
+    return json.loads(raw.decode("utf-8"))
@@ -0,0 +1,174 @@
+import os
+import shutil
+import tempfile
+import uuid
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# --- Configuración ---
+# Claves (8 bytes cada una) que se mantienen en memoria; al superarlas se
+# vuelcan a disco como un run ordenado que se consulta mediante memmap.
+DEDUP_SPILL_THRESHOLD_KEYS = int(os.getenv("SADI_DEDUP_SPILL_KEYS", str(64 * 1024 * 1024)))
+# Directorio de los volcados (por defecto, el temporal del sistema).
+DEDUP_SPILL_DIRECTORY = os.getenv("SADI_DEDUP_SPILL_DIR") or None
+
+_NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+def _column_hash(column: pa.ChunkedArray) -> np.ndarray:
+    """Hash de 64 bits de cada valor de una columna; los nulos tienen un hash propio."""
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    if pa.types.is_null(column.type):
+        return np.full(len(column), _NULL_HASH, dtype=np.uint64)
+    if pa.types.is_nested(column.type):
+        values = np.array([str(value) for value in column.to_pylist()], dtype=object)
+    else:
+        filler = '' if pa.types.is_string(column.type) or pa.types.is_large_string(column.type) else None
+        if filler is None and (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+                               or pa.types.is_boolean(column.type)):
+            filler = pa.scalar(0).cast(column.type)
+        filled = pc.fill_null(column, filler) if filler is not None and column.null_count else column
+        values = filled.to_numpy()
+    hashes = pd.util.hash_array(values)
+    if column.null_count:
+        hashes = np.where(pc.is_valid(column).to_numpy(zero_copy_only=False), hashes, _NULL_HASH)
+    return hashes
+
+def hash_rows(data: Union[pa.Table, pd.DataFrame]) -> np.ndarray:
+    """
+    Calcula un hash de 64 bits por fila combinando los hashes vectorizados de cada columna.
+
+    El hash depende del tipo Arrow de cada columna y no de su representación en
+    pandas, así que dos lotes con el mismo esquema producen la misma clave para
+    la misma fila aunque uno tenga nulos y el otro no.
+    """
+    table = pa.Table.from_pandas(data, preserve_index=False) if isinstance(data, pd.DataFrame) else data
+    hashes = np.zeros(table.num_rows, dtype=np.uint64)
+    for column in table.columns:
+        hashes ^= _column_hash(column)
+        hashes *= _HASH_MULTIPLIER
+    return hashes
+
+def _merge_runs(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    merged = np.concatenate([left, right])
+    # La ordenación estable aprovecha que ambas partes ya están ordenadas.
+    merged.sort(kind='stable')
+    return merged
+
+def _contains(run: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    positions = np.searchsorted(run, keys)
+    positions[positions == len(run)] = 0
+    return run[positions] == keys
+
+class RowDeduplicator:
+    """
+    Elimina filas repetidas entre todos los lotes que recibe, de una o varias fuentes.
+
+    Cada fila se reduce a un hash de 64 bits (ver hash_rows) y el conjunto de
+    filas vistas se guarda como runs ordenados de uint64, 8 bytes por fila
+    distinta. Los runs en memoria se fusionan de forma geométrica, de modo que
+    nunca hay más de unos pocos, y al superar `spill_threshold_keys` se vuelcan
+    a disco y se consultan mediante memmap.
+
+    Dos filas distintas con el mismo hash se considerarían duplicadas; con 64
+    bits la probabilidad es despreciable hasta cientos de millones de filas.
+    """
+    def __init__(
+        self,
+        spill_threshold_keys: int = DEDUP_SPILL_THRESHOLD_KEYS,
+        spill_directory: Optional[str] = DEDUP_SPILL_DIRECTORY
+    ):
+        self.spill_threshold_keys = spill_threshold_keys
+        self.spill_directory = spill_directory
+        self.rows_seen = 0
+        self.duplicates_per_source: Dict[str, int] = {}
+        self._memory_runs: List[np.ndarray] = []
+        self._memory_keys = 0
+        self._disk_runs: List[np.ndarray] = []
+        self._spill_path: Optional[str] = None
+
+    @property
+    def distinct_rows(self) -> int:
+        return self._memory_keys + sum(len(run) for run in self._disk_runs)
+
+    @property
+    def duplicates_removed(self) -> int:
+        return sum(self.duplicates_per_source.values())
+
+    def keep_mask(self, data: Union[pa.Table, pd.DataFrame], source_name: str) -> np.ndarray:
+        """
+        Devuelve una máscara con True en las filas vistas por primera vez (dentro
+        del lote y en todos los anteriores) y las registra como vistas.
+        """
+        hashes = hash_rows(data)
+        unique_hashes, first_positions = np.unique(hashes, return_index=True)
+        unseen = np.ones(len(unique_hashes), dtype=bool)
+        for run in self._memory_runs + self._disk_runs:
+            unseen &= ~_contains(run, unique_hashes)
+
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[first_positions[unseen]] = True
+        self._add(unique_hashes[unseen])
+
+        self.rows_seen += len(hashes)
+        self.duplicates_per_source[source_name] = (
+            self.duplicates_per_source.get(source_name, 0) + int(len(hashes) - keep.sum())
+        )
+        return keep
+
+    def filter(self, table: pa.Table, source_name: str) -> pa.Table:
+        """Devuelve el lote sin las filas ya vistas."""
+        keep = self.keep_mask(table, source_name)
+        return table if keep.all() else table.filter(pa.array(keep))
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "rows_seen": self.rows_seen,
+            "distinct_rows": self.distinct_rows,
+            "duplicates_removed": self.duplicates_removed,
+            "duplicates_per_source": dict(self.duplicates_per_source),
+            "spilled_runs": len(self._disk_runs),
+        }
+
+    def _add(self, run: np.ndarray):
+        if not len(run):
+            return
+        self._memory_runs.append(run)
+        self._memory_keys += len(run)
+        while len(self._memory_runs) > 1 and len(self._memory_runs[-2]) <= 2 * len(self._memory_runs[-1]):
+            right = self._memory_runs.pop()
+            self._memory_runs[-1] = _merge_runs(self._memory_runs[-1], right)
+        if self._memory_keys > self.spill_threshold_keys:
+            self._spill()
+
+    def _spill(self):
+        merged = self._memory_runs[0]
+        for run in self._memory_runs[1:]:
+            merged = _merge_runs(merged, run)
+        if self._spill_path is None:
+            self._spill_path = tempfile.mkdtemp(prefix="sadi-dedup-", dir=self.spill_directory)
+        path = os.path.join(self._spill_path, f"{uuid.uuid4().hex}.npy")
+        np.save(path, merged)
+        self._disk_runs.append(np.load(path, mmap_mode='r'))
+        self._memory_runs = []
+        self._memory_keys = 0
+
+    def close(self):
+        """Libera el conjunto de filas vistas y elimina los volcados a disco."""
+        self._memory_runs = []
+        self._memory_keys = 0
+        self._disk_runs = []
+        if self._spill_path is not None:
+            shutil.rmtree(self._spill_path, ignore_errors=True)
+            self._spill_path = None
+
+    def __enter__(self) -> "RowDeduplicator":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,191 @@
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from prometheus_client import Counter, Gauge
+
+from backend.app.services import state_store as state_store_module
+from backend.app.services.etl_cache import file_fingerprint
+from backend.app.services.state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Sessions without activity for this long are deleted unless they carry their
+# own retention (see StateStore.set_session_retention).
+SESSION_TTL_SECONDS = int(os.getenv("SADI_SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+# ETL jobs without activity for this long are deleted with their checkpoints
+# and per-source outputs.
+ETL_JOB_TTL_SECONDS = int(os.getenv("SADI_ETL_JOB_TTL_SECONDS", str(7 * 24 * 3600)))
+JANITOR_INTERVAL_SECONDS = int(os.getenv("SADI_JANITOR_INTERVAL_SECONDS", "3600"))
+JANITOR_BATCH_SIZE = int(os.getenv("SADI_JANITOR_BATCH_SIZE", "100"))
+# VACUUM rewrites the whole database, so it only runs every N janitor passes;
+# the other passes just checkpoint and truncate the WAL.
+JANITOR_VACUUM_EVERY = int(os.getenv("SADI_JANITOR_VACUUM_EVERY", "24"))
+JANITOR_ENABLED = os.getenv("SADI_JANITOR_ENABLED", "1") == "1"
+# Job artifacts (exports, code blocks) live under data/processed/<job_id>.
+PROCESSED_DATA_PATH = Path("data/processed")
+
+# --- Metrics ---
+SESSIONS_DELETED = Counter("sadi_janitor_sessions_deleted_total", "Expired sessions removed by the janitor.")
+ETL_JOBS_DELETED = Counter("sadi_janitor_etl_jobs_deleted_total", "Expired ETL jobs removed by the janitor.")
+FREED_BYTES = Counter("sadi_janitor_freed_bytes_total", "Bytes reclaimed by the janitor.", ["kind"])
+LAST_RUN = Gauge("sadi_janitor_last_run_timestamp_seconds", "Unix time of the last completed janitor pass.")
+
+
+def _remove_tree(path: Path) -> int:
+    """Deletes a file or directory and returns the bytes it occupied."""
+    if not path.exists():
+        return 0
+    if path.is_file():
+        size = path.stat().st_size
+        path.unlink()
+        return size
+    size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    shutil.rmtree(path, ignore_errors=True)
+    return size
+
+
+class SessionJanitor:
+    """
+    Deletes expired sessions and ETL jobs and compacts the state database.
+
+    Each pass removes expired sessions in batches: first their dataset
+    directory and job artifacts, then their rows. Expired ETL jobs go the
+    same way: first the per-source outputs their checkpoints recorded, then
+    the job and checkpoint rows. It also removes orphaned session directories
+    without a database row, checkpoints the WAL and, every `vacuum_every`
+    passes, runs VACUUM.
+    """
+    def __init__(
+        self,
+        store: StateStore,
+        ttl_seconds: int = SESSION_TTL_SECONDS,
+        batch_size: int = JANITOR_BATCH_SIZE,
+        interval_seconds: int = JANITOR_INTERVAL_SECONDS,
+        vacuum_every: int = JANITOR_VACUUM_EVERY,
+        processed_path: Path = PROCESSED_DATA_PATH,
+        etl_ttl_seconds: int = ETL_JOB_TTL_SECONDS,
+    ):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.etl_ttl_seconds = etl_ttl_seconds
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.vacuum_every = vacuum_every
+        self.processed_path = processed_path
+        self.passes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, int]:
+        """Runs one collection pass and returns what it freed."""
+        report = {
+            "sessions_deleted": 0, "etl_jobs_deleted": 0, "orphans_deleted": 0,
+            "file_bytes_freed": 0, "db_bytes_freed": 0,
+        }
+
+        while True:
+            session_ids = self.store.find_expired_sessions(self.ttl_seconds, self.batch_size)
+            if not session_ids:
+                break
+            # Files go first: if the pass dies halfway, the rows still point
+            # at what is left and the next pass finishes the job.
+            report["file_bytes_freed"] += self._remove_session_files(session_ids)
+            job_ids = self.store.delete_sessions(session_ids)
+            report["file_bytes_freed"] += self._remove_job_artifacts(job_ids)
+            report["sessions_deleted"] += len(session_ids)
+
+        while True:
+            etl_job_ids = self.store.find_expired_etl_jobs(self.etl_ttl_seconds, self.batch_size)
+            if not etl_job_ids:
+                break
+            report["file_bytes_freed"] += self._remove_etl_outputs(self.store.etl_job_output_files(etl_job_ids))
+            self.store.delete_etl_jobs(etl_job_ids)
+            report["etl_jobs_deleted"] += len(etl_job_ids)
+
+        orphans, orphan_bytes = self._remove_orphaned_directories()
+        report["orphans_deleted"] = orphans
+        report["file_bytes_freed"] += orphan_bytes
+
+        self.passes += 1
+        vacuum = self.vacuum_every > 0 and self.passes % self.vacuum_every == 0
+        report["db_bytes_freed"] = self.store.compact(vacuum=vacuum)
+
+        SESSIONS_DELETED.inc(report["sessions_deleted"])
+        ETL_JOBS_DELETED.inc(report["etl_jobs_deleted"])
+        FREED_BYTES.labels(kind="files").inc(report["file_bytes_freed"])
+        FREED_BYTES.labels(kind="database").inc(report["db_bytes_freed"])
+        LAST_RUN.set(time.time())
+        logger.info("Session janitor pass finished: %s", report)
+        return report
+
+    def _remove_session_files(self, session_ids: List[str]) -> int:
+        return sum(_remove_tree(state_store_module.DB_STORAGE_PATH / session_id) for session_id in session_ids)
+
+    def _remove_job_artifacts(self, job_ids: List[str]) -> int:
+        freed = 0
+        for job_id in job_ids:
+            freed += _remove_tree(self.processed_path / job_id)
+            freed += _remove_tree(self.processed_path / "code_blocks" / job_id)
+        return freed
+
+    @staticmethod
+    def _remove_etl_outputs(files: Dict[str, List]) -> int:
+        """
+        Removes ETL outputs that still hold what their job wrote. A file with
+        another size or hash was rewritten by a later job and is left alone.
+        """
+        freed = 0
+        for path, fingerprint in files.items():
+            try:
+                if os.path.getsize(path) != fingerprint[0] or file_fingerprint(path) != fingerprint:
+                    continue
+            except FileNotFoundError:
+                continue
+            freed += _remove_tree(Path(path))
+        return freed
+
+    def _remove_orphaned_directories(self):
+        """Removes stale session directories that have no row in the database."""
+        storage = state_store_module.DB_STORAGE_PATH
+        cutoff = time.time() - self.ttl_seconds
+        candidates = [
+            path for path in storage.iterdir()
+            if path.is_dir() and not path.name.startswith(".") and path.stat().st_mtime < cutoff
+        ]
+        removed, freed = 0, 0
+        for start in range(0, len(candidates), self.batch_size):
+            batch = candidates[start:start + self.batch_size]
+            known = self.store.existing_sessions([path.name for path in batch])
+            for path in batch:
+                if path.name not in known:
+                    freed += _remove_tree(path)
+                    removed += 1
+        return removed, freed
+
+    # --- Background execution ---
+
+    def start(self):
+        """Runs passes every `interval_seconds` on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="session-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Session janitor pass failed.")
@@ -1,14 +1,168 @@
+import os
+import asyncio
+import functools
 import sqlite3
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from backend.app.services.dataframe_cache import DataFrameCache
+from backend.app.services.payload_codec import encode_payload, decode_payload
+from backend.app.services.write_behind import WriteBehindQueue
 
 # --- Configuration ---
 DB_STORAGE_PATH = Path("backend/data")
 DB_STORAGE_PATH.mkdir(parents=True, exist_ok=True)
 DB_FILE = DB_STORAGE_PATH / "sadi_state.db"
 
+# SQLite tuning. WAL lets readers proceed while a writer commits, NORMAL
+# synchronous is durable across application crashes in WAL mode, and the busy
+# timeout makes concurrent writers wait for the lock instead of failing with
+# "database is locked".
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SADI_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SADI_SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SADI_SQLITE_CACHE_SIZE_KB", "16384"))
+
+# Rows per Parquet row group for session datasets. Smaller groups let
+# filtered and limited reads skip more data; larger ones compress better.
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("SADI_PARQUET_ROW_GROUP_SIZE", "65536"))
+
+# Also keep an uncompressed Arrow IPC copy of each session dataset. It can be
+# memory-mapped without decoding, so the API and the Celery worker share the
+# OS page cache instead of each materializing a private copy. Off by default:
+# the copy is uncompressed and roughly doubles each session's disk usage.
+ARROW_IPC_ENABLED = os.getenv("SADI_ARROW_IPC_ENABLED", "0") == "1"
+
+# Memory budget for the in-process cache of loaded session DataFrames.
+DATAFRAME_CACHE_MAX_BYTES = int(os.getenv("SADI_DATAFRAME_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Deferred (write-behind) writes are committed in one transaction once this
+# many are queued, or after this many milliseconds, whichever comes first.
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("SADI_WRITE_BEHIND_BATCH_SIZE", "500"))
+WRITE_BEHIND_FLUSH_INTERVAL_MS = int(os.getenv("SADI_WRITE_BEHIND_FLUSH_INTERVAL_MS", "200"))
+
+# Threads dedicated to the async facade's SQLite and Parquet work, kept
+# separate from the event loop's default executor.
+STATE_STORE_IO_WORKERS = int(os.getenv("SADI_STATE_STORE_IO_WORKERS", "8"))
+
+# --- Schema Migrations ---
+# Each entry upgrades the schema to `version`. The applied version is tracked
+# in SQLite's `user_version` pragma, so migrations run once per database file.
+SCHEMA_MIGRATIONS = [
+    (1, [
+        "CREATE INDEX IF NOT EXISTS idx_jobs_session_id ON jobs (session_id)",
+        "CREATE INDEX IF NOT EXISTS idx_mcp_steps_job_id ON mcp_steps (job_id)",
+        "CREATE INDEX IF NOT EXISTS idx_execution_steps_session_id ON execution_steps (session_id)",
+        "CREATE INDEX IF NOT EXISTS idx_visualizations_session_name ON visualizations (session_id, name)",
+    ]),
+    # One visualization per (session, name), enforced so writes can upsert.
+    (2, [
+        """DELETE FROM visualizations WHERE viz_id NOT IN (
+            SELECT MAX(viz_id) FROM visualizations GROUP BY session_id, name
+        )""",
+        "DROP INDEX IF EXISTS idx_visualizations_session_name",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_visualizations_session_name ON visualizations (session_id, name)",
+    ]),
+    # Session activity and per-session retention, used by the session janitor.
+    (3, [
+        "ALTER TABLE sessions ADD COLUMN last_accessed_at TIMESTAMP",
+        "ALTER TABLE sessions ADD COLUMN retention_seconds INTEGER",
+    ]),
+    # Resumable ETL jobs: one row per job and one checkpoint per input file.
+    (4, [
+        """CREATE TABLE IF NOT EXISTS etl_jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT DEFAULT 'running',
+            sources_total INTEGER DEFAULT 0,
+            bytes_total INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        """CREATE TABLE IF NOT EXISTS etl_checkpoints (
+            job_id TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            input_hash TEXT NOT NULL,
+            status TEXT NOT NULL,
+            bytes INTEGER DEFAULT 0,
+            outputs TEXT, -- Storing the file's results as JSON string
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (job_id, filename),
+            FOREIGN KEY (job_id) REFERENCES etl_jobs (job_id)
+        )""",
+    ]),
+    # ETL jobs expire by last activity, like sessions.
+    (5, [
+        "CREATE INDEX IF NOT EXISTS idx_etl_jobs_updated_at ON etl_jobs (updated_at)",
+    ]),
+]
+
+# --- Connection Pool ---
+
+class ConnectionPool:
+    """
+    Hands out one SQLite connection per thread.
+
+    Every connection is opened against the same database file and configured
+    with the WAL journal and the pragmas above, so the FastAPI threadpool,
+    Celery threads and background workers no longer serialize on a single
+    shared handle.
+    """
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_file,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._prune_dead_threads()
+                self._connections[threading.get_ident()] = conn
+        return conn
+
+    def _prune_dead_threads(self):
+        """Closes connections owned by threads that have exited."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._connections.pop(ident).close()
+
+    def size(self) -> int:
+        """Number of open connections."""
+        with self._lock:
+            return len(self._connections)
+
+    def close_all(self):
+        """Closes every connection handed out by the pool."""
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
 # --- StateStore Service ---
 
 class StateStore:
@@ -20,13 +174,58 @@ class StateStore:
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
-            cls._instance = super(StateStore, cls).__new__(cls, *args, **kwargs)
+            cls._instance = super(StateStore, cls).__new__(cls)
         return cls._instance
 
     def __init__(self):
-        self.conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        # The singleton is re-initialized on every StateStore() call; keep the
+        # existing pool instead of opening a new one each time.
+        if getattr(self, "_initialized", False):
+            return
+        self.pool = ConnectionPool(DB_FILE)
+        self.dataframe_cache = DataFrameCache(DATAFRAME_CACHE_MAX_BYTES)
+        self.write_behind = WriteBehindQueue(
+            self.pool.connection,
+            max_batch_size=WRITE_BEHIND_BATCH_SIZE,
+            flush_interval_ms=WRITE_BEHIND_FLUSH_INTERVAL_MS,
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
         self._initialize_db()
+        self._initialized = True
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's pooled connection."""
+        return self.pool.connection()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The executor that runs the blocking work behind the async API."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=STATE_STORE_IO_WORKERS,
+                    thread_name_prefix="state-store-io",
+                )
+            return self._executor
+
+    def flush(self):
+        """Commits every deferred write queued so far."""
+        self.write_behind.flush()
+
+    def close(self):
+        """Writes deferred rows, stops the async executor and closes all pooled connections."""
+        self.write_behind.close()
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self.pool.close_all()
+
+    async def _run_in_executor(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
 
     def _initialize_db(self):
         """
@@ -86,6 +285,29 @@ class StateStore:
         )
         """)
         self.conn.commit()
+        self._apply_migrations()
+
+    def _apply_migrations(self):
+        """
+        Brings the schema up to the latest version in SCHEMA_MIGRATIONS.
+        """
+        conn = self.conn
+        current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for version, statements in SCHEMA_MIGRATIONS:
+            if version <= current_version:
+                continue
+            # Take the write lock before re-checking the version so that the
+            # API and the Celery worker never apply the same migration twice.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("PRAGMA user_version").fetchone()[0] < version:
+                    for statement in statements:
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
 
     # --- Methods to replace legacy state management ---
 
@@ -94,39 +316,70 @@ class StateStore:
         cursor = self.conn.cursor()
         cursor.execute("INSERT OR IGNORE INTO sessions (session_id) VALUES (?)", (session_id,))
         self.conn.commit()
-        return self.get_session(session_id)
+        return self.get_session(session_id, touch=False)
 
-    def get_session(self, session_id: str) -> Optional[Dict]:
-        """Retrieves a full session, including its jobs and steps."""
+    def get_session(self, session_id: str, touch: bool = True) -> Optional[Dict]:
+        """
+        Retrieves a full session, including its jobs and steps, in a single
+        query over the session -> jobs -> mcp_steps join. Unless `touch` is
+        False, reading a session counts as activity and postpones its expiry.
+        """
+        self.flush()
+        if touch:
+            self._touch_session_deferred(session_id)
         cursor = self.conn.cursor()
-
-        # Fetch session details
-        cursor.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,))
-        session_row = cursor.fetchone()
-        if not session_row:
+        cursor.execute("""
+            SELECT
+                s.session_id AS session_id,
+                s.created_at AS session_created_at,
+                j.job_id AS job_id,
+                j.job_type AS job_type,
+                j.status AS job_status,
+                j.created_at AS job_created_at,
+                st.step_id AS step_id,
+                st.description AS step_description,
+                st.payload AS step_payload,
+                st.status AS step_status,
+                st.created_at AS step_created_at
+            FROM sessions s
+            LEFT JOIN jobs j ON j.session_id = s.session_id
+            LEFT JOIN mcp_steps st ON st.job_id = j.job_id
+            WHERE s.session_id = ?
+            ORDER BY j.rowid, st.rowid
+        """, (session_id,))
+        rows = cursor.fetchall()
+        if not rows:
             return None
 
-        session = dict(session_row)
-        session['jobs'] = {}
-
-        # Fetch associated jobs
-        cursor.execute("SELECT * FROM jobs WHERE session_id = ?", (session_id,))
-        job_rows = cursor.fetchall()
-
-        for job_row in job_rows:
-            job = dict(job_row)
-            job['steps'] = {}
-
-            # Fetch associated steps for each job
-            cursor.execute("SELECT * FROM mcp_steps WHERE job_id = ?", (job['job_id'],))
-            step_rows = cursor.fetchall()
-            for step_row in step_rows:
-                step = dict(step_row)
-                if step.get('payload'):
-                    step['payload'] = json.loads(step['payload'])
-                job['steps'][step['step_id']] = step
-
-            session['jobs'][job['job_id']] = job
+        session = {
+            'session_id': rows[0]['session_id'],
+            'created_at': rows[0]['session_created_at'],
+            'jobs': {},
+        }
+        for row in rows:
+            if row['job_id'] is None:
+                continue
+            job = session['jobs'].get(row['job_id'])
+            if job is None:
+                job = {
+                    'job_id': row['job_id'],
+                    'session_id': row['session_id'],
+                    'job_type': row['job_type'],
+                    'status': row['job_status'],
+                    'created_at': row['job_created_at'],
+                    'steps': {},
+                }
+                session['jobs'][row['job_id']] = job
+            if row['step_id'] is None:
+                continue
+            job['steps'][row['step_id']] = {
+                'step_id': row['step_id'],
+                'job_id': row['job_id'],
+                'description': row['step_description'],
+                'payload': json.loads(row['step_payload']) if row['step_payload'] else row['step_payload'],
+                'status': row['step_status'],
+                'created_at': row['step_created_at'],
+            }
 
         return session
 
@@ -137,6 +390,7 @@ class StateStore:
             "INSERT INTO jobs (job_id, session_id, job_type) VALUES (?, ?, ?)",
             (job_id, session_id, job_type)
         )
+        self._touch_session(cursor, session_id)
         self.conn.commit()
         return self.get_job(job_id)
 
@@ -147,19 +401,28 @@ class StateStore:
         job_row = cursor.fetchone()
         return dict(job_row) if job_row else None
 
-    def create_mcp_step(self, step_id: str, job_id: str, description: str, payload: Optional[Dict]) -> Optional[Dict]:
-        """Creates a new step for a job in the MCP context."""
+    def create_mcp_step(
+        self, step_id: str, job_id: str, description: str, payload: Optional[Dict], defer: bool = False
+    ) -> Optional[Dict]:
+        """
+        Creates a new step for a job in the MCP context.
+
+        With defer=True the insert is queued on the write-behind queue and
+        None is returned instead of the stored step.
+        """
+        sql = "INSERT INTO mcp_steps (step_id, job_id, description, payload) VALUES (?, ?, ?, ?)"
+        params = (step_id, job_id, description, json.dumps(payload) if payload else None)
+        if defer:
+            self.write_behind.enqueue(sql, params)
+            return None
         cursor = self.conn.cursor()
-        payload_str = json.dumps(payload) if payload else None
-        cursor.execute(
-            "INSERT INTO mcp_steps (step_id, job_id, description, payload) VALUES (?, ?, ?, ?)",
-            (step_id, job_id, description, payload_str)
-        )
+        cursor.execute(sql, params)
         self.conn.commit()
         return self.get_mcp_step(step_id)
 
     def get_mcp_step(self, step_id: str) -> Optional[Dict]:
         """Retrieves an MCP step by its ID."""
+        self.flush()
         cursor = self.conn.cursor()
         cursor.execute("SELECT * FROM mcp_steps WHERE step_id = ?", (step_id,))
         step_row = cursor.fetchone()
@@ -170,56 +433,493 @@ class StateStore:
             step['payload'] = json.loads(step['payload'])
         return step
 
-    def log_step(self, session_id: str, description: str, code: str) -> int:
-        """Logs a new execution step to the persistent store."""
+    def log_step(self, session_id: str, description: str, code: str, defer: bool = False) -> Optional[int]:
+        """
+        Logs a new execution step to the persistent store.
+
+        With defer=True the insert is queued on the write-behind queue and
+        committed with the next batch; no row id is returned.
+        """
+        sql = "INSERT INTO execution_steps (session_id, description, code) VALUES (?, ?, ?)"
+        params = (session_id, description, code)
+        if defer:
+            self.write_behind.enqueue(sql, params)
+            return None
         cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT INTO execution_steps (session_id, description, code) VALUES (?, ?, ?)",
-            (session_id, description, code)
-        )
+        cursor.execute(sql, params)
         self.conn.commit()
         return cursor.lastrowid
 
     def get_steps(self, session_id: str) -> List[Dict]:
         """Retrieves all steps for a given session."""
+        self.flush()
         cursor = self.conn.cursor()
         cursor.execute("SELECT * FROM execution_steps WHERE session_id = ?", (session_id,))
         return [dict(row) for row in cursor.fetchall()]
 
-    def add_visualization(self, session_id: str, name: str, data: Any):
-        """Adds or updates a visualization in the persistent store."""
+    def add_visualization(self, session_id: str, name: str, data: Any, defer: bool = False):
+        """
+        Adds or updates a visualization in the persistent store.
+
+        The payload is stored as a compressed binary blob (see payload_codec).
+        With defer=True the write is queued on the write-behind queue.
+        """
+        sql = """
+            INSERT INTO visualizations (session_id, name, data) VALUES (?, ?, ?)
+            ON CONFLICT (session_id, name) DO UPDATE SET
+                data = excluded.data,
+                created_at = CURRENT_TIMESTAMP
+        """
+        params = (session_id, name, encode_payload(data))
+        if defer:
+            self.write_behind.enqueue(sql, params)
+            return
         cursor = self.conn.cursor()
-        # Simple upsert logic: delete existing entry for the name, then insert new.
-        cursor.execute("DELETE FROM visualizations WHERE session_id = ? AND name = ?", (session_id, name))
-        cursor.execute(
-            "INSERT INTO visualizations (session_id, name, data) VALUES (?, ?, ?)",
-            (session_id, name, json.dumps(data))
-        )
+        cursor.execute(sql, params)
         self.conn.commit()
 
     def get_visualizations(self, session_id: str) -> Dict[str, Any]:
         """Retrieves all visualizations for a given session."""
+        self.flush()
         cursor = self.conn.cursor()
         cursor.execute("SELECT name, data FROM visualizations WHERE session_id = ?", (session_id,))
         viz_data = {}
         for row in cursor.fetchall():
-            viz_data[row['name']] = json.loads(row['data'])
+            viz_data[row['name']] = decode_payload(row['data'])
         return viz_data
 
+    def get_visualization(self, session_id: str, name: str) -> Optional[Any]:
+        """Retrieves and decodes a single named visualization, or None."""
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT data FROM visualizations WHERE session_id = ? AND name = ?", (session_id, name))
+        row = cursor.fetchone()
+        return decode_payload(row['data']) if row else None
+
+    def list_visualizations(self, session_id: str) -> List[str]:
+        """Lists the names of a session's visualizations without decoding them."""
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT name FROM visualizations WHERE session_id = ? ORDER BY name", (session_id,))
+        return [row['name'] for row in cursor.fetchall()]
+
     def save_dataframe(self, session_id: str, df: pd.DataFrame):
-        """Saves a DataFrame to a Parquet file in the session's directory."""
+        """
+        Saves a DataFrame to a Parquet file in the session's directory.
+
+        The file is split into row groups of PARQUET_ROW_GROUP_SIZE rows with
+        column statistics, so load_dataframe can skip row groups and columns
+        that a caller does not need. When ARROW_IPC_ENABLED, an Arrow IPC file
+        is written next to it for load_arrow_table. Files are written to a
+        temporary path and renamed into place, so readers never see a
+        half-written dataset and existing memory maps stay valid.
+        """
         session_dir = DB_STORAGE_PATH / session_id
         session_dir.mkdir(exist_ok=True)
-        df.to_parquet(session_dir / "data.parquet")
+        parquet_file = session_dir / "data.parquet"
+        arrow_file = session_dir / "data.arrow"
+        table = pa.Table.from_pandas(df)
+
+        tmp_file = session_dir / "data.parquet.tmp"
+        pq.write_table(table, tmp_file, row_group_size=PARQUET_ROW_GROUP_SIZE)
+        if ARROW_IPC_ENABLED:
+            tmp_arrow_file = session_dir / "data.arrow.tmp"
+            with pa.OSFile(str(tmp_arrow_file), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_arrow_file, arrow_file)
+        elif arrow_file.exists():
+            arrow_file.unlink()
+        os.replace(tmp_file, parquet_file)
+        self.dataframe_cache.invalidate(session_id)
+        cursor = self.conn.cursor()
+        # Datasets can be saved for sessions nobody created explicitly (e.g.
+        # ingestion uploads); the row makes them subject to retention rather
+        # than to the janitor's orphan sweep.
+        cursor.execute("INSERT OR IGNORE INTO sessions (session_id) VALUES (?)", (session_id,))
+        self._touch_session(cursor, session_id)
+        self.conn.commit()
 
-    def load_dataframe(self, session_id: str) -> Optional[pd.DataFrame]:
-        """Loads a DataFrame from a Parquet file in the session's directory."""
+    def load_arrow_table(self, session_id: str, columns: Optional[List[str]] = None) -> Optional[pa.Table]:
+        """
+        Returns the session dataset as a pyarrow Table backed by a memory map.
+
+        Reading the Arrow IPC file is zero-copy: the table's buffers point
+        into the mapped file. Sessions saved without an IPC file fall back to
+        a memory-mapped Parquet read, which still has to decode the data.
+        Like load_dataframe, a read postpones the session's expiry.
+        """
         session_dir = DB_STORAGE_PATH / session_id
         parquet_file = session_dir / "data.parquet"
+        arrow_file = session_dir / "data.arrow"
+        if arrow_file.exists() or parquet_file.exists():
+            self._touch_session_deferred(session_id)
+        if arrow_file.exists():
+            table = pa.ipc.open_file(pa.memory_map(str(arrow_file), "r")).read_all()
+            return table.select(columns) if columns is not None else table
         if parquet_file.exists():
-            return pd.read_parquet(parquet_file)
+            return pq.read_table(parquet_file, columns=columns, memory_map=True)
         return None
 
+    def load_arrow_dataframe(self, session_id: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Returns the session dataset as an Arrow-backed pandas DataFrame.
+
+        Columns use pd.ArrowDtype and wrap the memory-mapped buffers from
+        load_arrow_table, so no copy of the data is made.
+        """
+        table = self.load_arrow_table(session_id, columns=columns)
+        if table is None:
+            return None
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    def load_dataframe(
+        self,
+        session_id: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Loads a DataFrame from a Parquet file in the session's directory.
+
+        :param columns: Only read these columns from disk.
+        :param filters: Row filters in pyarrow/pandas DNF form, e.g.
+                        [('age', '>', 30)]. Row groups whose statistics
+                        cannot match are skipped without being read.
+        :param limit: Stop reading once this many rows have been produced.
+
+        Full loads are served from the in-process DataFrame cache when the
+        file has not changed since it was cached; the returned frame shares
+        memory with the cache and must be treated as read-only. Every load,
+        cached or not, postpones the session's expiry.
+        """
+        session_dir = DB_STORAGE_PATH / session_id
+        parquet_file = session_dir / "data.parquet"
+        try:
+            stat = parquet_file.stat()
+        except FileNotFoundError:
+            return None
+        self._touch_session_deferred(session_id)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        if filters is None:
+            cached = self.dataframe_cache.get(session_id, version)
+            if cached is not None:
+                if columns is not None:
+                    cached = cached[list(columns)]
+                if limit is not None:
+                    return cached.head(limit).copy()
+                return cached.copy(deep=False)
+
+        if columns is None and filters is None and limit is None:
+            df = pd.read_parquet(parquet_file)
+            self.dataframe_cache.put(session_id, version, df)
+            return df.copy(deep=False)
+        if limit is None:
+            return pd.read_parquet(parquet_file, columns=columns, filters=filters)
+
+        dataset = ds.dataset(parquet_file, format="parquet")
+        if columns is not None:
+            # Keep any stored index columns so the frame round-trips like read_parquet.
+            pandas_metadata = dataset.schema.pandas_metadata or {}
+            index_columns = [c for c in pandas_metadata.get('index_columns', []) if isinstance(c, str)]
+            columns = list(columns) + [c for c in index_columns if c not in columns]
+        scanner = dataset.scanner(
+            columns=columns,
+            filter=pq.filters_to_expression(filters) if filters else None,
+        )
+        return scanner.head(limit).to_pandas()
+
+    # --- ETL job checkpoints ---
+
+    def start_etl_job(self, job_id: str, sources_total: int, bytes_total: int) -> Dict:
+        """
+        Registers an ETL job, or marks an existing one as running again when a
+        retried or resumed task picks it up. Completed checkpoints are kept;
+        failed ones are dropped because those files will be processed again.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM etl_checkpoints WHERE job_id = ? AND status != 'completed'", (job_id,))
+        cursor.execute("""
+            INSERT INTO etl_jobs (job_id, sources_total, bytes_total) VALUES (?, ?, ?)
+            ON CONFLICT (job_id) DO UPDATE SET
+                status = 'running',
+                sources_total = excluded.sources_total,
+                bytes_total = excluded.bytes_total,
+                updated_at = CURRENT_TIMESTAMP
+        """, (job_id, sources_total, bytes_total))
+        self.conn.commit()
+        return self.get_etl_job_progress(job_id)
+
+    def finish_etl_job(self, job_id: str, status: str):
+        """Records the final status of an ETL job ('completed' or 'failed')."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "UPDATE etl_jobs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE job_id = ?",
+            (status, job_id)
+        )
+        self.conn.commit()
+
+    def record_etl_checkpoint(
+        self, job_id: str, filename: str, input_hash: str, status: str, size: int, outputs: Any
+    ):
+        """
+        Stores the outcome of one input file of an ETL job. A later checkpoint
+        for the same file replaces the earlier one.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO etl_checkpoints (job_id, filename, input_hash, status, bytes, outputs)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (job_id, filename) DO UPDATE SET
+                input_hash = excluded.input_hash,
+                status = excluded.status,
+                bytes = excluded.bytes,
+                outputs = excluded.outputs,
+                updated_at = CURRENT_TIMESTAMP
+        """, (job_id, filename, input_hash, status, size, json.dumps(outputs)))
+        cursor.execute("UPDATE etl_jobs SET updated_at = CURRENT_TIMESTAMP WHERE job_id = ?", (job_id,))
+        self.conn.commit()
+
+    def get_etl_checkpoints(self, job_id: str) -> Dict[str, Dict]:
+        """Retrieves the checkpoints of an ETL job, keyed by input file name."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM etl_checkpoints WHERE job_id = ? ORDER BY rowid", (job_id,))
+        checkpoints = {}
+        for row in cursor.fetchall():
+            checkpoint = dict(row)
+            checkpoint['outputs'] = json.loads(checkpoint['outputs']) if checkpoint['outputs'] else None
+            checkpoints[checkpoint['filename']] = checkpoint
+        return checkpoints
+
+    def get_etl_job_progress(self, job_id: str) -> Optional[Dict]:
+        """
+        Returns the status of an ETL job with the number of input files and
+        bytes already processed (whether they succeeded or failed), or None if
+        the job is unknown. Safe to call from another process while it runs.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT
+                j.job_id, j.status, j.sources_total, j.bytes_total, j.created_at, j.updated_at,
+                COUNT(c.filename) AS sources_done,
+                COALESCE(SUM(c.bytes), 0) AS bytes_processed,
+                COALESCE(SUM(c.status = 'failed'), 0) AS sources_failed
+            FROM etl_jobs j
+            LEFT JOIN etl_checkpoints c ON c.job_id = j.job_id
+            WHERE j.job_id = ?
+            GROUP BY j.job_id
+        """, (job_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    # --- Retention and garbage collection ---
+
+    def find_expired_etl_jobs(self, ttl_seconds: int, limit: int) -> List[str]:
+        """
+        Returns up to `limit` ETL jobs whose last activity (start, checkpoint
+        or finish) is older than `ttl_seconds`, whatever their status.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT job_id FROM etl_jobs
+            WHERE (julianday('now') - julianday(updated_at)) * 86400 > ?
+            ORDER BY updated_at
+            LIMIT ?
+        """, (ttl_seconds, limit))
+        return [row['job_id'] for row in cursor.fetchall()]
+
+    def etl_job_output_files(self, job_ids: List[str]) -> Dict[str, List]:
+        """
+        Returns the output files recorded in the checkpoints of the given ETL
+        jobs, mapped to the [size, hash] they had when recorded. Files that a
+        checkpoint of another job also records are left out: per-source
+        outputs have stable names, so a later job may own the same path.
+        """
+        if not job_ids:
+            return {}
+        placeholders = ",".join("?" * len(job_ids))
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"SELECT outputs FROM etl_checkpoints WHERE job_id IN ({placeholders}) AND outputs IS NOT NULL", job_ids
+        )
+        files = {}
+        for row in cursor.fetchall():
+            files.update(json.loads(row['outputs']).get('files', {}))
+        shared = set()
+        for path in files:
+            cursor.execute(
+                f"SELECT 1 FROM etl_checkpoints WHERE job_id NOT IN ({placeholders}) AND instr(outputs, ?) > 0 LIMIT 1",
+                (*job_ids, json.dumps(path))
+            )
+            if cursor.fetchone():
+                shared.add(path)
+        return {path: fingerprint for path, fingerprint in files.items() if path not in shared}
+
+    def delete_etl_jobs(self, job_ids: List[str]):
+        """Deletes ETL jobs and their checkpoints in one transaction."""
+        if not job_ids:
+            return
+        placeholders = ",".join("?" * len(job_ids))
+        conn = self.conn
+        with conn:
+            conn.execute(f"DELETE FROM etl_checkpoints WHERE job_id IN ({placeholders})", job_ids)
+            conn.execute(f"DELETE FROM etl_jobs WHERE job_id IN ({placeholders})", job_ids)
+
+    @staticmethod
+    def _touch_session(cursor: sqlite3.Cursor, session_id: str):
+        """Records activity on a session, postponing its expiry."""
+        cursor.execute(
+            "UPDATE sessions SET last_accessed_at = CURRENT_TIMESTAMP WHERE session_id = ?",
+            (session_id,)
+        )
+
+    def _touch_session_deferred(self, session_id: str):
+        """
+        Records a read of a session on the write-behind queue, so that reads
+        do not each pay for a commit.
+        """
+        self.write_behind.enqueue(
+            "UPDATE sessions SET last_accessed_at = CURRENT_TIMESTAMP WHERE session_id = ?",
+            (session_id,)
+        )
+
+    def set_session_retention(self, session_id: str, retention_seconds: Optional[int]):
+        """Overrides the default TTL for one session; None restores the default."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "UPDATE sessions SET retention_seconds = ? WHERE session_id = ?",
+            (retention_seconds, session_id)
+        )
+        self.conn.commit()
+
+    def find_expired_sessions(self, default_ttl_seconds: int, limit: int) -> List[str]:
+        """
+        Returns up to `limit` sessions whose last activity (dataset save or
+        read, session read, job creation or creation time) is older than
+        their retention period.
+        """
+        # Reads are recorded on the write-behind queue; commit them first.
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT session_id FROM sessions
+            WHERE (julianday('now') - julianday(COALESCE(last_accessed_at, created_at))) * 86400
+                  > COALESCE(retention_seconds, ?)
+            ORDER BY COALESCE(last_accessed_at, created_at)
+            LIMIT ?
+        """, (default_ttl_seconds, limit))
+        return [row['session_id'] for row in cursor.fetchall()]
+
+    def existing_sessions(self, session_ids: List[str]) -> set:
+        """Returns which of the given session ids have a row in the store."""
+        if not session_ids:
+            return set()
+        placeholders = ",".join("?" * len(session_ids))
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT session_id FROM sessions WHERE session_id IN ({placeholders})", session_ids)
+        return {row['session_id'] for row in cursor.fetchall()}
+
+    def delete_sessions(self, session_ids: List[str]) -> List[str]:
+        """
+        Deletes sessions and every row that belongs to them in one
+        transaction. Returns the ids of the deleted jobs, whose artifacts
+        the caller may want to remove as well.
+        """
+        if not session_ids:
+            return []
+        self.flush()
+        placeholders = ",".join("?" * len(session_ids))
+        conn = self.conn
+        with conn:
+            job_ids = [
+                row['job_id'] for row in conn.execute(
+                    f"SELECT job_id FROM jobs WHERE session_id IN ({placeholders})", session_ids
+                )
+            ]
+            conn.execute(
+                f"DELETE FROM mcp_steps WHERE job_id IN (SELECT job_id FROM jobs WHERE session_id IN ({placeholders}))",
+                session_ids
+            )
+            for table in ("jobs", "execution_steps", "visualizations", "sessions"):
+                conn.execute(f"DELETE FROM {table} WHERE session_id IN ({placeholders})", session_ids)
+        for session_id in session_ids:
+            self.dataframe_cache.invalidate(session_id)
+        return job_ids
+
+    def database_size(self) -> int:
+        """Size in bytes of the database file and its WAL."""
+        return sum(
+            path.stat().st_size
+            for path in (Path(self.pool.db_file), Path(f"{self.pool.db_file}-wal"))
+            if path.exists()
+        )
+
+    def compact(self, vacuum: bool = False) -> int:
+        """
+        Checkpoints and truncates the WAL and, if requested, rebuilds the
+        database file with VACUUM. Returns the number of bytes freed.
+        """
+        size_before = self.database_size()
+        self.flush()
+        conn = self.conn
+        if vacuum:
+            conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return max(0, size_before - self.database_size())
+
+    # --- Async facade for async endpoints ---
+    # Each method runs its synchronous counterpart on the store's executor so
+    # that SQLite and Parquet I/O never block the event loop.
+
+    async def acreate_session(self, session_id: str) -> Dict:
+        return await self._run_in_executor(self.create_session, session_id)
+
+    async def aget_session(self, session_id: str) -> Optional[Dict]:
+        return await self._run_in_executor(self.get_session, session_id)
+
+    async def acreate_job(self, session_id: str, job_id: str, job_type: str) -> Optional[Dict]:
+        return await self._run_in_executor(self.create_job, session_id, job_id, job_type)
+
+    async def aget_job(self, job_id: str) -> Optional[Dict]:
+        return await self._run_in_executor(self.get_job, job_id)
+
+    async def acreate_mcp_step(self, step_id: str, job_id: str, description: str, payload: Optional[Dict]) -> Optional[Dict]:
+        return await self._run_in_executor(self.create_mcp_step, step_id, job_id, description, payload)
+
+    async def alog_step(self, session_id: str, description: str, code: str, defer: bool = False) -> Optional[int]:
+        return await self._run_in_executor(self.log_step, session_id, description, code, defer=defer)
+
+    async def aget_steps(self, session_id: str) -> List[Dict]:
+        return await self._run_in_executor(self.get_steps, session_id)
+
+    async def aadd_visualization(self, session_id: str, name: str, data: Any):
+        return await self._run_in_executor(self.add_visualization, session_id, name, data)
+
+    async def aget_visualizations(self, session_id: str) -> Dict[str, Any]:
+        return await self._run_in_executor(self.get_visualizations, session_id)
+
+    async def aget_visualization(self, session_id: str, name: str) -> Optional[Any]:
+        return await self._run_in_executor(self.get_visualization, session_id, name)
+
+    async def asave_dataframe(self, session_id: str, df: pd.DataFrame):
+        return await self._run_in_executor(self.save_dataframe, session_id, df)
+
+    async def aload_arrow_table(self, session_id: str, columns: Optional[List[str]] = None) -> Optional[pa.Table]:
+        return await self._run_in_executor(self.load_arrow_table, session_id, columns=columns)
+
+    async def aload_dataframe(
+        self,
+        session_id: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[pd.DataFrame]:
+        return await self._run_in_executor(
+            self.load_dataframe, session_id, columns=columns, filters=filters, limit=limit
+        )
+
 # --- Dependency Injector ---
 
 def get_state_store() -> StateStore:
@@ -0,0 +1,116 @@
+import atexit
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- Write-Behind Queue ---
+
+class WriteBehindQueue:
+    """
+    Buffers SQLite writes and commits them in grouped transactions.
+
+    Statements are queued by `enqueue` and written by a background thread
+    once `max_batch_size` statements are pending or every `flush_interval_ms`,
+    whichever comes first. `flush` writes everything queued so far before
+    returning and is the consistency point for readers; it is also run at
+    interpreter exit.
+    """
+    def __init__(
+        self,
+        connection_factory: Callable[[], sqlite3.Connection],
+        max_batch_size: int = 500,
+        flush_interval_ms: int = 200,
+    ):
+        self._connection_factory = connection_factory
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._pending: List[Tuple[str, Sequence[Any]]] = []
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        # Held while a batch is being written, so flush() also waits for a
+        # batch the background thread has already taken off the queue.
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        self.batches_written = 0
+        self.statements_written = 0
+        atexit.register(self.close)
+
+    def enqueue(self, sql: str, params: Sequence[Any]):
+        """Queues a statement to be written with the next batch."""
+        self.enqueue_many([(sql, params)])
+
+    def enqueue_many(self, statements: List[Tuple[str, Sequence[Any]]]):
+        """Queues statements that must be committed in the same batch."""
+        with self._condition:
+            self._pending.extend(statements)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="state-store-write-behind", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.max_batch_size:
+                self._condition.notify_all()
+
+    def pending(self) -> int:
+        """Statements queued or being written but not yet committed."""
+        with self._condition:
+            return len(self._pending) + self._in_flight
+
+    def flush(self):
+        """Writes every statement queued so far and waits for the commit."""
+        if not self.pending():
+            return
+        self._write_batch()
+
+    def close(self):
+        """Stops the background thread after writing any pending statements."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopped or len(self._pending) >= self.max_batch_size,
+                    timeout=self.flush_interval,
+                )
+                stopped = self._stopped
+            self._write_batch()
+            if stopped:
+                return
+
+    def _write_batch(self):
+        with self._write_lock:
+            with self._condition:
+                batch, self._pending = self._pending, []
+                self._in_flight = len(batch)
+            if not batch:
+                return
+            try:
+                conn = self._connection_factory()
+                try:
+                    with conn:
+                        for sql, params in batch:
+                            conn.execute(sql, params)
+                except sqlite3.Error:
+                    # Isolate the failing statement instead of losing the batch.
+                    logger.exception("Batched write failed; retrying statements individually.")
+                    for sql, params in batch:
+                        try:
+                            with conn:
+                                conn.execute(sql, params)
+                        except sqlite3.Error:
+                            logger.exception("Dropping statement that could not be written: %s", sql)
+                self.batches_written += 1
+                self.statements_written += len(batch)
+            finally:
+                with self._condition:
+                    self._in_flight = 0
@@ -49,4 +49,21 @@ def create_app():
         print("-------------------------")
 
 
+    # Background garbage collection of expired sessions.
+    from backend.app.services import session_janitor
+    from backend.app.services.state_store import get_state_store
+    janitor = session_janitor.SessionJanitor(get_state_store())
+
+    @app.on_event("startup")
+    def start_session_janitor():
+        if session_janitor.JANITOR_ENABLED:
+            janitor.start()
+
+    # Commit any writes still queued in the StateStore's write-behind buffer.
+    @app.on_event("shutdown")
+    def flush_state_store():
+        janitor.stop()
+        get_state_store().flush()
+
+
     return app
@@ -0,0 +1,91 @@
+"""
+Benchmark de rendimiento de la lectura de CSV.
+
+Genera un CSV sintético del tamaño indicado (por defecto 100 MB; admite
+tamaños de varios GB, p. ej. --mb 2048) y compara el throughput (MB/s y
+filas/s) y el pico de memoria de pd.read_csv con el lector de csv_loader, que
+detecta el formato y usa pyarrow.csv multihilo. Con --latin1 y --sep ';' el
+archivo imita las exportaciones de Excel en español.
+
+Uso:
+    python -m backend.benchmarks.bench_csv_loader [--mb 100] [--repeat 3] [--latin1] [--sep ';']
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.app.etl_providers import csv_loader
+from backend.app.etl_providers.csv_loader import iter_delimited_chunks, read_delimited
+from backend.app.etl_audit import peak_rss_bytes
+
+BATCH_ROWS = 200_000
+
+
+def _write_synthetic_csv(path: str, target_mb: int, sep: str, encoding: str) -> int:
+    """Escribe lotes de filas hasta alcanzar `target_mb` y devuelve el número de filas."""
+    rng = np.random.default_rng(42)
+    cities = ["Málaga", "León", "Cádiz", "A Coruña", "Logroño", "Ávila"]
+    rows = 0
+    with open(path, "w", encoding=encoding, newline="") as f:
+        f.write(sep.join(["id", "importe", "cantidad", "ciudad", "activo", "descripcion"]) + "\n")
+        while f.tell() < target_mb * 1024 ** 2:
+            batch = pd.DataFrame({
+                "id": np.arange(rows, rows + BATCH_ROWS),
+                "importe": rng.normal(100, 15, BATCH_ROWS).round(2),
+                "cantidad": rng.integers(0, 1000, BATCH_ROWS),
+                "ciudad": rng.choice(cities, BATCH_ROWS),
+                "activo": rng.choice([True, False], BATCH_ROWS),
+                "descripcion": [f"señal {i}" for i in range(rows, rows + BATCH_ROWS)],
+            })
+            batch.to_csv(f, sep=sep, header=False, index=False)
+            rows += BATCH_ROWS
+    return rows
+
+
+def _pandas_read(path: str, sep: str, encoding: str) -> int:
+    return len(pd.read_csv(path, sep=sep, encoding=encoding))
+
+
+def _pandas_chunks(path: str, sep: str, encoding: str) -> int:
+    with pd.read_csv(path, sep=sep, encoding=encoding, chunksize=csv_loader.DEFAULT_CHUNK_ROWS) as reader:
+        return sum(len(chunk) for chunk in reader)
+
+
+def run(target_mb: int, repeat: int, sep: str, latin1: bool):
+    encoding = "latin-1" if latin1 else "utf-8"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "datos.csv")
+        rows = _write_synthetic_csv(path, target_mb, sep, encoding)
+        size_mb = os.path.getsize(path) / 1024 ** 2
+        print(f"CSV de {size_mb:.0f} MB, {rows} filas, separador {sep!r}, {encoding}")
+
+        cases = [
+            ("pandas read_csv", lambda: _pandas_read(path, sep, encoding)),
+            ("read_delimited", lambda: len(read_delimited(path))),
+            ("pandas por trozos", lambda: _pandas_chunks(path, sep, encoding)),
+            ("iter_delimited_chunks", lambda: sum(len(chunk) for chunk in iter_delimited_chunks(path))),
+        ]
+        print(f"{'lector':>24} {'MB/s':>8} {'filas/s':>12} {'RSS pico MB':>12}")
+        for name, read in cases:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                assert read() == rows
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            # El pico de RSS es acumulado en el proceso: solo crece entre casos.
+            print(f"{name:>24} {size_mb / best:>8.1f} {rows / best:>12.0f} {peak_rss_bytes() / 1024 ** 2:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=100, help="Tamaño aproximado del CSV sintético en MB (100-2048).")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por caso (se toma la más rápida).")
+    parser.add_argument("--sep", default=",", help="Separador del CSV sintético.")
+    parser.add_argument("--latin1", action="store_true", help="Escribe el CSV en latin-1 en lugar de UTF-8.")
+    args = parser.parse_args()
+    run(args.mb, args.repeat, args.sep, args.latin1)
@@ -0,0 +1,113 @@
+"""
+Benchmark del pipeline de normalización.
+
+Compara el plan compilado de run_normalization_pipeline con la ejecución
+anterior (copia completa de la entrada, pasos in-place y relleno de nulos
+columna a columna) sobre DataFrames anchos con nulos y duplicados. Mide el
+tiempo y el pico de memoria asignada (tracemalloc) de cada variante.
+
+Uso:
+    python -m backend.benchmarks.bench_normalization [--rows 200000] [--columns 200] [--repeat 3]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from backend.app.services.normalization_pipeline import PIPELINE_STEPS, _to_snake_case, run_normalization_pipeline
+
+CONFIG = [
+    {"step": "rename_columns", "params": {"rename_mapping": {"Col0": "Identificador"}}},
+    {"step": "to_snake_case"},
+    {"step": "handle_nulls", "params": {"strategy": "mean"}},
+    {"step": "remove_duplicates"},
+]
+
+
+def _legacy_handle_nulls(df, strategy='mean', subset=None):
+    if strategy == 'drop':
+        return df.dropna(subset=subset)
+    for col in subset or df.columns:
+        if df[col].isnull().any() and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].fillna(getattr(df[col], strategy)())
+    return df
+
+
+def _legacy_rename(df, rename_mapping):
+    df.rename(columns=rename_mapping, inplace=True)
+    return df
+
+
+def _legacy_snake_case(df):
+    df.columns = [_to_snake_case(col) for col in df.columns]
+    return df
+
+
+def _legacy_remove_duplicates(df, subset=None):
+    df.drop_duplicates(subset=subset, inplace=True)
+    return df
+
+
+LEGACY_STEPS = {
+    **PIPELINE_STEPS,
+    'handle_nulls': _legacy_handle_nulls,
+    'rename_columns': _legacy_rename,
+    'to_snake_case': _legacy_snake_case,
+    'remove_duplicates': _legacy_remove_duplicates,
+}
+
+
+def legacy_pipeline(df: pd.DataFrame, config) -> pd.DataFrame:
+    """Reproduce la ejecución anterior: copia defensiva y un paso tras otro."""
+    processed_df = df.copy()
+    for step_config in config:
+        params = step_config.get('params', {})
+        processed_df = LEGACY_STEPS[step_config['step']](processed_df, **params)
+    return processed_df
+
+
+def _synthetic_frame(rows: int, columns: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    data = {}
+    for i in range(columns):
+        values = rng.normal(100, 15, rows)
+        if i % 4 == 0:
+            values[rng.random(rows) < 0.05] = np.nan
+        data[f"Col{i}"] = values
+    df = pd.DataFrame(data)
+    # Un 1% de filas duplicadas.
+    return pd.concat([df, df.sample(frac=0.01, random_state=1)], ignore_index=True)
+
+
+def _measure(function, df: pd.DataFrame, repeat: int):
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        function(df, CONFIG)
+        timings.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return min(timings), peak
+
+
+def run(rows: int, columns: int, repeat: int):
+    df = _synthetic_frame(rows, columns)
+    frame_mb = df.memory_usage(index=True, deep=True).sum() / 1024 ** 2
+    print(f"DataFrame: {len(df)} filas x {columns} columnas ({frame_mb:.1f} MB)")
+    print(f"{'variante':>10} {'segundos':>10} {'pico MB':>10}")
+    for name, function in [("anterior", legacy_pipeline), ("plan", run_normalization_pipeline)]:
+        seconds, peak = _measure(function, df, repeat)
+        print(f"{name:>10} {seconds:>10.3f} {peak / 1024 ** 2:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="Filas del DataFrame sintético.")
+    parser.add_argument("--columns", type=int, default=200, help="Columnas del DataFrame sintético.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por variante (se toma la más rápida).")
+    args = parser.parse_args()
+    run(args.rows, args.columns, args.repeat)
@@ -0,0 +1,60 @@
+"""
+Benchmark de rendimiento del StateStore.
+
+Mide el throughput de escritura (log_step) y de lectura (get_session) con
+1 a 32 llamadores concurrentes sobre una base de datos temporal.
+
+Uso:
+    python -m backend.benchmarks.bench_state_store [--ops 2000] [--threads 1,2,4,8,16,32]
+"""
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from backend.app.services import state_store as state_store_module
+from backend.app.services.state_store import StateStore
+
+
+def _fresh_store(directory: Path) -> StateStore:
+    state_store_module.DB_STORAGE_PATH = directory
+    state_store_module.DB_FILE = directory / "bench_state.db"
+    StateStore._instance = None
+    return StateStore()
+
+
+def _throughput(threads: int, ops: int, func) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(func, range(ops)))
+    return ops / (time.perf_counter() - start)
+
+
+def run(ops: int, thread_counts):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _fresh_store(Path(tmp))
+        session_id = "bench-session"
+        store.create_session(session_id)
+        store.create_job(session_id, "bench-job", "benchmark")
+
+        print(f"{'threads':>8} {'writes/s':>12} {'reads/s':>12}")
+        for threads in thread_counts:
+            writes = _throughput(
+                threads, ops,
+                lambda i: store.log_step(session_id, f"step {i}", "pass"),
+            )
+            reads = _throughput(
+                threads, ops,
+                lambda i: store.get_session(session_id),
+            )
+            print(f"{threads:>8} {writes:>12.0f} {reads:>12.0f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=2000, help="Operaciones por medición.")
+    parser.add_argument("--threads", default="1,2,4,8,16,32", help="Niveles de concurrencia separados por comas.")
+    args = parser.parse_args()
+    run(args.ops, [int(t) for t in args.threads.split(",")])
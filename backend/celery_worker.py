@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_shutdown
 import os
 
 # Get Redis connection details from environment variables, with defaults for local dev
@@ -19,5 +20,11 @@ celery_app.conf.update(
     task_track_started=True,
 )
 
+@worker_process_shutdown.connect
+def flush_state_store(**kwargs):
+    """Commits any StateStore writes still queued when a worker process exits."""
+    from backend.app.services.state_store import get_state_store
+    get_state_store().flush()
+
 if __name__ == "__main__":
     celery_app.start()
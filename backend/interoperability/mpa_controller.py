@@ -48,7 +48,8 @@ class MpaController:
             self.state_store.log_step(
                 session_id=self.session_id,
                 description="Generated Data Quality Report",
-                code=f"data_quality_service.get_quality_report(dataframe)"
+                code=f"data_quality_service.get_quality_report(dataframe)",
+                defer=True
             )
 
             return report
@@ -59,6 +60,7 @@ class MpaController:
             self.state_store.log_step(
                 session_id=self.session_id,
                 description=f"Failed to generate Data Quality Report: {e}",
-                code=""
+                code="",
+                defer=True
             )
             return {"error": "An unexpected error occurred while generating the quality report."}
@@ -61,11 +61,14 @@ def log_step(
     }})
 
     # Persist the step in the StateStore instead of the in-memory list.
+    # The write is batched by the store's write-behind queue; reads through
+    # the store flush it first, so get_logged_steps still sees this step.
     state_store = get_state_store()
     state_store.log_step(
         session_id=session_id,
         description=description,
-        code=code
+        code=code,
+        defer=True
     )
 
 def get_logged_steps(session_id: str) -> List[Dict[str, Any]]:
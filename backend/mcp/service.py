@@ -51,7 +51,8 @@ class McpService:
             step_id=str(new_step_schema.step_id),
             job_id=str(job_id),
             description=description,
-            payload=payload
+            payload=payload,
+            defer=True
         )
         return new_step_schema
 
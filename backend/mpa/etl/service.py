@@ -1,18 +1,24 @@
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from backend.app.services.normalization_pipeline import PIPELINE_STEPS, run_normalization_pipeline
 
 class EtlService:
     """
     Modular Process Architecture (MPA) service for ETL (Extract, Transform, Load).
     Applies a series of transformation steps to a DataFrame.
     """
-    def process_pipeline(self, df: pd.DataFrame, steps: List[Dict[str, Any]]) -> pd.DataFrame:
-        """
-        Processes a DataFrame through a series of transformation steps.
+    @staticmethod
+    def to_pipeline_config(steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        if not isinstance(df, pd.DataFrame):
-            raise TypeError("Input 'df' must be a pandas DataFrame.")
+        Translates MPA actions into normalization pipeline steps.
 
+        Besides its own actions ('rename', 'drop_nulls', 'fill_nulls'), a step may
+        name any normalization step directly, e.g. {"action": "to_snake_case"} or
+        {"action": "handle_nulls", "params": {"strategy": "median"}}. Malformed
+        actions are skipped.
+        """
+        config = []
         for step in steps:
             action = step.get("action")
             if not action:
@@ -21,22 +27,38 @@ class EtlService:
             if action == "rename":
                 columns = step.get("columns")
                 if isinstance(columns, dict):
-                    df = df.rename(columns=columns)
+                    config.append({"step": "rename_columns", "params": {"rename_mapping": columns}})
 
             elif action == "drop_nulls":
                 column = step.get("column")
                 if isinstance(column, str):
-                    df = df.dropna(subset=[column])
+                    config.append({"step": "handle_nulls", "params": {"strategy": "drop", "subset": [column]}})
 
             elif action == "fill_nulls":
                 column = step.get("column")
                 value = step.get("value")
                 if isinstance(column, str) and value is not None:
-                    df[column] = df[column].fillna(value)
+                    config.append({"step": "fill_nulls", "params": {"value": value, "subset": [column]}})
+
+            elif action in PIPELINE_STEPS:
+                config.append({"step": action, "params": step.get("params", {})})
 
-            # Future ETL actions can be added here as new elif blocks.
+        return config
+
+    def process_pipeline(
+        self, df: pd.DataFrame, steps: List[Dict[str, Any]], engine: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Processes a DataFrame through a series of transformation steps.
+
+        The steps run on the selected normalization engine ('pandas', 'arrow' or
+        'polars'; SADI_NORMALIZATION_ENGINE by default) and the result is returned
+        as pandas. The input DataFrame is not modified.
+        """
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError("Input 'df' must be a pandas DataFrame.")
 
-        return df
+        return run_normalization_pipeline(df, self.to_pipeline_config(steps), engine=engine)
 
 # Instantiate the service to be used by the API
 etl_service = EtlService()
@@ -1,4 +1,5 @@
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 import pandas as pd
 import io
 from sqlalchemy import create_engine, text
@@ -48,27 +49,32 @@ class IngestionService:
             raise HTTPException(status_code=415, detail=f"Unsupported file type: {actual_mime_type}.")
 
         try:
-            if actual_mime_type == "text/csv":
-                df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
-            elif actual_mime_type in [
-                "application/vnd.ms-excel",
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            ]:
-                df = pd.read_excel(io.BytesIO(contents))
-            elif actual_mime_type == "application/json":
-                df = pd.read_json(io.StringIO(contents.decode("utf-8")))
-            elif actual_mime_type == "application/parquet":
-                df = pd.read_parquet(io.BytesIO(contents))
-            else:
-                raise HTTPException(status_code=415, detail="Unsupported file type.")
+            # Parsing and the Parquet write are CPU/disk bound; run them off
+            # the event loop so other requests keep being served.
+            df = await run_in_threadpool(self._parse_contents, contents, actual_mime_type)
 
             # --- CRITICAL: PERSIST DATA TO SESSION STATE ---
-            self.state_store.save_dataframe(session_id, df)
+            await self.state_store.asave_dataframe(session_id, df)
 
             return df
         except Exception as e:
             raise HTTPException(status_code=422, detail=f"Error processing file: {e}")
 
+    def _parse_contents(self, contents: bytes, mime_type: str) -> pd.DataFrame:
+        """Parses the raw upload into a DataFrame according to its MIME type."""
+        if mime_type == "text/csv":
+            return pd.read_csv(io.StringIO(contents.decode("utf-8")))
+        elif mime_type in [
+            "application/vnd.ms-excel",
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        ]:
+            return pd.read_excel(io.BytesIO(contents))
+        elif mime_type == "application/json":
+            return pd.read_json(io.StringIO(contents.decode("utf-8")))
+        elif mime_type == "application/parquet":
+            return pd.read_parquet(io.BytesIO(contents))
+        raise HTTPException(status_code=415, detail="Unsupported file type.")
+
     def load_from_db(self, conn_request: DbConnectionRequest) -> pd.DataFrame:
         """
         Loads data from a SQL database based on a connection request using parameterized queries
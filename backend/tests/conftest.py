@@ -1,8 +1,14 @@
 import pytest
 import os
 os.environ['TESTING'] = 'True'
+# Use the in-process WPA job store instead of Redis.
+os.environ.setdefault('WPA_JOB_STORE', 'memory')
+# Never garbage-collect the developer's data directory during tests.
+os.environ.setdefault('SADI_JANITOR_ENABLED', '0')
 from fastapi.testclient import TestClient
 from backend.main import app
+from backend.app.services import state_store as state_store_module
+from backend.app.services.state_store import StateStore
 
 class DummyAgent:
     async def ainvoke(self, data, config=None):
@@ -24,3 +30,13 @@ def client(test_app):
     """
     with TestClient(test_app) as c:
         yield c
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Provides a fresh StateStore backed by a temporary database."""
+    monkeypatch.setattr(state_store_module, "DB_STORAGE_PATH", tmp_path)
+    monkeypatch.setattr(state_store_module, "DB_FILE", tmp_path / "sadi_state.db")
+    monkeypatch.setattr(StateStore, "_instance", None)
+    instance = StateStore()
+    yield instance
+    instance.close()
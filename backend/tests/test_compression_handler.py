@@ -0,0 +1,145 @@
+import bz2
+import gzip
+import io
+import lzma
+import tarfile
+import zipfile
+
+import pytest
+
+from backend.app.services import compression_handler
+from backend.app.services.compression_handler import (
+    ArchiveLimitError, decompress_files, detect_compression, iter_archive_members, open_compressed,
+    strip_compression_extension
+)
+
+
+def _zip(members: dict, compression=zipfile.ZIP_DEFLATED) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+    return buffer.getvalue()
+
+
+def _tar_gz(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tf:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tf.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def test_members_are_yielded_lazily_including_nested_archives(tmp_path):
+    """Nested archives are walked in order and members arrive as file handles."""
+    inner = _zip({"inner.csv": b"a\n1\n"})
+    archive = tmp_path / "bundle.tar.gz"
+    archive.write_bytes(_tar_gz({"top.csv": b"a\n2\n", "nested.zip": inner, "dir/last.json": b"[]"}))
+
+    seen = [(name, handle.read()) for name, handle in iter_archive_members("bundle.tar.gz", str(archive))]
+
+    assert seen == [("top.csv", b"a\n2\n"), ("nested.zip/inner.csv", b"a\n1\n"), ("dir/last.json", b"[]")]
+
+
+def test_handles_are_closed_when_the_iterator_advances():
+    members = iter_archive_members("data.zip", _zip({"a.csv": b"1", "b.csv": b"2"}))
+    _, first = next(members)
+    next(members)
+    assert first.closed
+
+
+def test_member_and_total_size_limits():
+    archive = _zip({"a.csv": b"x" * 100, "b.csv": b"y" * 100})
+
+    with pytest.raises(ArchiveLimitError):
+        list(iter_archive_members("data.zip", archive, max_member_bytes=50))
+    with pytest.raises(ArchiveLimitError):
+        list(iter_archive_members("data.zip", archive, max_total_bytes=150))
+
+
+def test_compression_ratio_limit_stops_zip_bombs(monkeypatch):
+    """Highly compressible payloads are rejected once past the ratio threshold."""
+    monkeypatch.setattr(compression_handler, "ARCHIVE_RATIO_MIN_BYTES", 1024)
+    bomb = _zip({"zeros.csv": b"0" * 5_000_000})
+
+    with pytest.raises(ArchiveLimitError, match="relación de compresión"):
+        list(iter_archive_members("bomb.zip", bomb, max_compression_ratio=50))
+
+
+def test_nesting_depth_limit():
+    archive = _zip({"level1.zip": _zip({"level2.zip": _zip({"deep.csv": b"1"})})})
+
+    with pytest.raises(ArchiveLimitError, match="anidamiento"):
+        list(iter_archive_members("level0.zip", archive, max_depth=1))
+    assert [name for name, _ in iter_archive_members("level0.zip", archive, max_depth=2)] == [
+        "level1.zip/level2.zip/deep.csv"
+    ]
+
+
+def test_decompress_files_keeps_its_contract():
+    assert decompress_files("data.zip", _zip({"a.csv": b"1", "__MACOSX/._a.csv": b"junk"})) == {"a.csv": b"1"}
+    with pytest.raises(ValueError):
+        decompress_files("data.rar", b"")
+
+
+@pytest.mark.parametrize("codec, compress", [("gzip", gzip.compress), ("bz2", bz2.compress), ("xz", lzma.compress)])
+def test_single_file_codecs_are_detected_and_streamed(codec, compress):
+    data = b"".join(b"%d,fila\n" % i for i in range(50_000))
+    compressed = compress(data)
+
+    # Los bytes mágicos prevalecen sobre un nombre sin extensión de compresión.
+    assert detect_compression("ventas.csv", compressed) == codec
+    with open_compressed(compressed, codec) as stream:
+        head = stream.read(100)
+        stream.seek(0)
+        assert stream.read(100) == head
+        assert head + stream.read() == data
+
+
+def test_multi_frame_zstd_streams_are_read_to_the_end(monkeypatch):
+    """pzstd, zstd --long or concatenated files hold several frames; all of them are read."""
+    zstandard = pytest.importorskip("zstandard")
+    first, second = b"id,valor\n" + b"1,a\n" * 1000, b"2,b\n" * 1000
+    compressed = zstandard.ZstdCompressor().compress(first) + zstandard.ZstdCompressor().compress(second)
+    reader_options, decompressor_class = [], zstandard.ZstdDecompressor
+
+    class RecordingDecompressor:
+        # Algunas versiones y backends de zstandard se detienen al final del
+        # primer frame salvo que se pida lo contrario.
+        def __init__(self, *args, **kwargs):
+            self._decompressor = decompressor_class(*args, **kwargs)
+
+        def stream_reader(self, source, **kwargs):
+            reader_options.append(kwargs)
+            return self._decompressor.stream_reader(source, **kwargs)
+
+    monkeypatch.setattr(compression_handler.zstandard, "ZstdDecompressor", RecordingDecompressor)
+
+    assert detect_compression("eventos.csv.zst", compressed) == "zstd"
+    with open_compressed(compressed, "zstd") as stream:
+        # Una lectura que cruza el final del primer frame sigue en el segundo.
+        assert stream.read(len(first) + 100) == (first + second)[:len(first) + 100]
+        assert stream.read() == second[100:]
+        stream.seek(0)
+        assert stream.read() == first + second
+    assert reader_options and all(options.get("read_across_frames") for options in reader_options)
+
+
+def test_compound_extensions_and_archives():
+    assert detect_compression("eventos.jsonl.zst") == "zstd"
+    assert detect_compression("datos.tsv.bz2") == "bz2"
+    assert detect_compression("bundle.tar.gz", _tar_gz({"a.csv": b"1"})) is None
+    assert detect_compression("ventas.csv", b"id,valor\n") is None
+    assert strip_compression_extension("Ventas.CSV.GZ") == "Ventas.CSV"
+
+
+def test_decompressed_streams_respect_the_limits(monkeypatch):
+    monkeypatch.setattr(compression_handler, "ARCHIVE_RATIO_MIN_BYTES", 1024)
+    bomb = gzip.compress(b"0" * 5_000_000)
+
+    with pytest.raises(ArchiveLimitError, match="relación de compresión"):
+        open_compressed(bomb, "gzip", max_compression_ratio=50).read()
+    with pytest.raises(ArchiveLimitError, match="límite"):
+        open_compressed(gzip.compress(b"1" * 1000), "gzip", max_bytes=100).read()
@@ -0,0 +1,61 @@
+import pandas as pd
+
+from backend.app.etl_providers import csv_loader
+from backend.app.etl_providers.csv_loader import iter_csv_chunks, load_csv, sniff_csv_dialect
+from backend.app.etl_providers.tsv_loader import load_tsv
+
+
+def test_latin1_semicolon_files_are_sniffed():
+    content = "nombre;ciudad;importe\nJosé;Málaga;10\nNúñez;León;\n".encode("latin-1")
+
+    dialect = sniff_csv_dialect(content)
+    df = load_csv(content)
+
+    assert (dialect.encoding, dialect.delimiter, dialect.has_header) == ("cp1252", ";", True)
+    assert df["nombre"].tolist() == ["José", "Núñez"]
+    assert df["importe"].iloc[0] == 10 and pd.isna(df["importe"].iloc[1])
+
+
+def test_headerless_files_get_generated_column_names():
+    df = load_tsv(b"1\t2.5\n3\t4.5\n")
+
+    assert list(df.columns) == ["columna_1", "columna_2"]
+    assert len(df) == 2
+
+
+def test_numeric_header_rows_stay_headers():
+    """Integer-only first rows (years, codes) are read as a header, like pd.read_csv."""
+    df = load_csv(b"2019,2020,2021\n10,20,30\n40,50,60\n")
+
+    assert list(df.columns) == ["2019", "2020", "2021"]
+    assert df["2020"].tolist() == [20, 50]
+
+
+def test_arrow_and_pandas_readers_agree(monkeypatch):
+    content = (
+        b"id,valor,activo,fecha,texto\n"
+        b"1,2.5,True,2024-01-02,hola\n"
+        b"2,,false,2024-02-03,NA\n"
+        b'3,4,,,"con, coma"\n'
+    )
+    arrow = load_csv(content)
+    monkeypatch.setattr(csv_loader, "CSV_ARROW_ENABLED", False)
+    expected = load_csv(content)
+
+    pd.testing.assert_frame_equal(arrow.fillna(pd.NA), expected.fillna(pd.NA))
+    assert arrow["fecha"].iloc[0] == "2024-01-02"
+
+
+def test_chunks_keep_their_size_and_fall_back_to_pandas_mid_stream(monkeypatch, tmp_path):
+    monkeypatch.setattr(csv_loader, "CSV_BLOCK_BYTES", 4096)
+    rows = [f"{i},{i}" for i in range(3000)] + ["3000,no es un número", "3001,7"]
+    path = tmp_path / "datos.csv"
+    path.write_text("id,valor\n" + "\n".join(rows) + "\n")
+
+    chunks = list(iter_csv_chunks(str(path), chunksize=1000))
+    df = pd.concat(chunks)
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 1000, 2]
+    assert df.index.tolist() == list(range(3002))
+    assert df["id"].tolist() == list(range(3002))
+    assert df["valor"].iloc[-2] == "no es un número"
@@ -0,0 +1,204 @@
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from backend.app.services import data_exporter
+from backend.app.services.data_exporter import promote_types, unify_to_parquet
+
+
+@pytest.mark.parametrize("left, right, expected", [
+    (pa.int32(), pa.int64(), pa.int64()),
+    (pa.bool_(), pa.int16(), pa.int16()),
+    (pa.uint32(), pa.int8(), pa.int64()),
+    (pa.int64(), pa.float32(), pa.float64()),
+    (pa.null(), pa.string(), pa.string()),
+    (pa.dictionary(pa.int8(), pa.string()), pa.string(), pa.string()),
+    (pa.timestamp("ms"), pa.timestamp("ns"), pa.timestamp("ns")),
+    (pa.date32(), pa.timestamp("us", tz="UTC"), pa.timestamp("us", tz="UTC")),
+    (pa.float64(), pa.string(), pa.string()),
+])
+def test_type_promotion_rules(left, right, expected):
+    assert promote_types(left, right) == expected
+    assert promote_types(right, left) == expected
+
+
+def test_nested_types_cannot_be_unified():
+    with pytest.raises(ValueError):
+        promote_types(pa.list_(pa.int64()), pa.string())
+    with pytest.raises(ValueError):
+        promote_types(pa.uint64(), pa.int64())
+
+
+def test_unify_streams_sources_in_batches(tmp_path, monkeypatch):
+    """Each source is written in bounded batches and provenance lands in the file metadata."""
+    parquet_source = tmp_path / "b.parquet"
+    pd.DataFrame({"id": [3, 4, 5], "extra": pd.Categorical(["x", "y", "x"])}).to_parquet(parquet_source)
+    written = []
+    original_conform = data_exporter._conform_table
+
+    def recording_conform(table, schema):
+        written.append(table.num_rows)
+        return original_conform(table, schema)
+
+    monkeypatch.setattr(data_exporter, "_conform_table", recording_conform)
+
+    report = unify_to_parquet(
+        [("a", pd.DataFrame({"id": [1, 2], "score": [0.5, 1.5]})), ("b", str(parquet_source))],
+        str(tmp_path / "out" / "master.parquet"),
+        batch_rows=2,
+    )
+
+    assert written == [2, 2, 1]
+    assert report["rows_per_source"] == {"a": 2, "b": 3}
+    table = pq.read_table(tmp_path / "out" / "master.parquet")
+    assert table.schema.field("extra").type == pa.string()
+    assert table.column("score").to_pylist() == [0.5, 1.5, None, None, None]
+    provenance = json.loads(table.schema.metadata[data_exporter.PROVENANCE_METADATA_KEY])
+    assert provenance["extra"]["sources"]["b"].startswith("dictionary<values=string")
+    assert provenance["extra"]["unified_type"] == "string"
+
+
+def test_unify_falls_back_to_text_for_irreconcilable_columns(tmp_path):
+    """Columns whose types cannot be unified are written as text instead of failing the run."""
+    first = pa.table({
+        "etiquetas": pa.array([[1, 2], None], type=pa.list_(pa.int64())),
+        "detalle": pa.array([{"a": 1}, {"a": 2}]),
+        "contador": pa.array([2 ** 63, 1], type=pa.uint64()),
+    })
+    second = pa.table({
+        "etiquetas": pa.array([["x"]], type=pa.list_(pa.string())),
+        "detalle": pa.array(["texto"]),
+        "contador": pa.array([-1], type=pa.int64()),
+    })
+    pq.write_table(first, tmp_path / "a.parquet")
+    pq.write_table(second, tmp_path / "b.parquet")
+
+    report = unify_to_parquet(
+        [("a", str(tmp_path / "a.parquet")), ("b", str(tmp_path / "b.parquet"))],
+        str(tmp_path / "master.parquet"),
+    )
+
+    table = pq.read_table(tmp_path / "master.parquet")
+    assert all(field.type == data_exporter.FALLBACK_TYPE for field in table.schema)
+    assert table.column("etiquetas").to_pylist() == ["[1, 2]", None, '["x"]']
+    assert table.column("detalle").to_pylist() == ['{"a": 1}', '{"a": 2}', "texto"]
+    assert table.column("contador").to_pylist() == [str(2 ** 63), "1", "-1"]
+    assert "'etiquetas' de 'b'" in report["provenance"]["etiquetas"]["fallback"]
+    assert "int64" in report["provenance"]["contador"]["fallback"]
+
+
+@pytest.fixture
+def export_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "region": ["norte", "sur", "norte", "sur"] * 25,
+        "id": range(100),
+        "valor": [float(i) for i in range(100)],
+    })
+
+
+def test_export_formats_round_trip(tmp_path, monkeypatch, export_df):
+    """Bare names go to OUTPUT_DIRECTORY, paths with a directory are respected."""
+    monkeypatch.setattr(data_exporter, "OUTPUT_DIRECTORY", str(tmp_path / "processed"))
+
+    parquet_path = data_exporter.export_data(export_df, "datos", "parquet", {"row_group_size": 30})
+    feather_path = data_exporter.export_data(export_df, str(tmp_path / "out" / "datos"), "ipc")
+    csv_path = data_exporter.export_data(export_df, "datos", "csv", {"compression": "gzip"})
+
+    assert parquet_path == str(tmp_path / "processed" / "datos.parquet")
+    assert feather_path == str(tmp_path / "out" / "datos.feather")
+    assert csv_path.endswith("datos.csv.gz")
+    metadata = pq.ParquetFile(parquet_path).metadata
+    assert metadata.num_row_groups == 4
+    assert metadata.row_group(0).column(0).compression == "ZSTD"
+    # Solo la columna de baja cardinalidad usa diccionario.
+    assert "RLE_DICTIONARY" in metadata.row_group(0).column(0).encodings
+    assert "RLE_DICTIONARY" not in metadata.row_group(0).column(1).encodings
+    pd.testing.assert_frame_equal(pd.read_parquet(parquet_path), export_df)
+    pd.testing.assert_frame_equal(pd.read_feather(feather_path).astype({"region": object}), export_df)
+    pd.testing.assert_frame_equal(pd.read_csv(csv_path), export_df)
+
+
+def test_export_partitioned_parquet(tmp_path, export_df):
+    base_dir = data_exporter.export_data(export_df, str(tmp_path / "particionado"), "parquet", {"partition_cols": "region"})
+
+    assert sorted(p.name for p in (tmp_path / "particionado").iterdir()) == ["region=norte", "region=sur"]
+    assert len(pd.read_parquet(base_dir)) == 100
+
+
+def test_export_keeps_legacy_csv_config(tmp_path, monkeypatch, export_df):
+    monkeypatch.setattr(data_exporter, "OUTPUT_DIRECTORY", str(tmp_path))
+
+    path = data_exporter.export_data(export_df, "legacy", {"sep": ";"})
+
+    assert path == str(tmp_path / "legacy.csv")
+    assert (tmp_path / "legacy.csv").read_text().startswith("region;id;valor")
+    with pytest.raises(ValueError):
+        data_exporter.export_data(export_df, "x", "xlsx")
+
+
+def test_chunk_writer_publishes_empty_sources(tmp_path):
+    """A source without rows still produces a Parquet file, keeping any known columns."""
+    with data_exporter.ParquetChunkWriter(str(tmp_path / "nada.parquet")):
+        pass
+    assert pq.read_table(tmp_path / "nada.parquet").num_columns == 0
+
+    with data_exporter.ParquetChunkWriter(str(tmp_path / "cabecera.parquet")) as writer:
+        writer.write(pd.DataFrame({"id": pd.Series([], dtype=object)}))
+    table = pq.read_table(tmp_path / "cabecera.parquet")
+    assert table.column_names == ["id"] and table.num_rows == 0
+
+    # Empty chunks before the first rows do not fix the column types.
+    with data_exporter.ParquetChunkWriter(str(tmp_path / "tarde.parquet")) as writer:
+        writer.write(pd.DataFrame({"id": pd.Series([], dtype=object)}))
+        writer.write(pd.DataFrame({"id": [1, 2]}))
+    assert pq.read_table(tmp_path / "tarde.parquet").schema.field("id").type == pa.int64()
+
+
+def test_chunk_writer_adds_columns_that_appear_in_later_chunks(tmp_path):
+    """A key first seen in a later chunk becomes a nullable column, backfilled for earlier rows."""
+    path = tmp_path / "evoluciona.parquet"
+    with data_exporter.ParquetChunkWriter(str(path)) as writer:
+        writer.write(pd.DataFrame({"id": [1, 2]}))
+        writer.write(pd.DataFrame({"id": [3], "extra": ["a"]}))
+        writer.write(pd.DataFrame({"nota": [1.5], "id": [4]}))
+
+    table = pq.read_table(path)
+    assert table.column_names == ["id", "extra", "nota"]
+    assert table.column("id").to_pylist() == [1, 2, 3, 4]
+    assert table.column("extra").to_pylist() == [None, None, "a", None]
+    assert table.column("nota").to_pylist() == [None, None, None, 1.5]
+    assert writer.schema_changes == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["evoluciona.parquet"]
+
+
+def test_chunk_writer_widens_columns_whose_type_changes(tmp_path):
+    """A later chunk with another type widens the column and rewrites the rows already written."""
+    path = tmp_path / "tipos.parquet"
+    with data_exporter.ParquetChunkWriter(str(path)) as writer:
+        writer.write(pd.DataFrame({"codigo": [1, 2], "importe": [10, 20], "nota": [None, None], "ids": [1, 2]}))
+        writer.write(pd.DataFrame({"codigo": ["N/A"], "importe": [2.5], "nota": ["ok"], "ids": [[3, 4]]}))
+
+    table = pq.read_table(path)
+    assert table.schema.field("codigo").type == pa.string()
+    assert table.column("codigo").to_pylist() == ["1", "2", "N/A"]
+    assert table.schema.field("importe").type == pa.float64()
+    assert table.column("importe").to_pylist() == [10.0, 20.0, 2.5]
+    assert table.column("nota").to_pylist() == [None, None, "ok"]
+    assert table.schema.field("ids").type == data_exporter.FALLBACK_TYPE
+    assert table.column("ids").to_pylist() == ["1", "2", "[3, 4]"]
+
+
+def test_nested_values_are_exported_without_dictionary_encoding(tmp_path):
+    """Columns holding lists or dicts cannot be counted, so they are left out of dictionary encoding."""
+    df = pd.DataFrame({
+        "etiquetas": [["a", "b"], ["a"], ["a", "b"], None],
+        "cliente": [{"id": 1}, {"id": 2}, {"id": 1}, {"id": 3}],
+        "pais": ["ES", "ES", "MX", "ES"],
+    })
+    assert data_exporter.low_cardinality_columns(df) == ["pais"]
+
+    path = data_exporter.export_data(df, str(tmp_path / "anidado.parquet"), "parquet")
+    assert pq.read_table(path).column("etiquetas").to_pylist() == [["a", "b"], ["a"], ["a", "b"], None]
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from backend.app.services.dataframe_cache import DataFrameCache
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"value": range(rows)})
+
+
+def _size(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def test_hit_and_miss_counters():
+    """Lookups are only hits for the exact cached version."""
+    cache = DataFrameCache(max_bytes=10 * 1024 * 1024)
+    df = _frame(10)
+    assert cache.get("s1", (1, 10)) is None
+    cache.put("s1", (1, 10), df)
+    assert cache.get("s1", (1, 10)) is df
+    assert cache.get("s1", (2, 10)) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["current_bytes"] == _size(df)
+
+
+def test_evicts_least_recently_used_within_budget():
+    """Entries are evicted by recency once the byte budget is exceeded."""
+    frames = {name: _frame(1000) for name in ("a", "b", "c")}
+    cache = DataFrameCache(max_bytes=2 * _size(frames["a"]))
+    cache.put("a", 1, frames["a"])
+    cache.put("b", 1, frames["b"])
+    cache.get("a", 1)
+    cache.put("c", 1, frames["c"])
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) is frames["a"]
+    assert cache.get("c", 1) is frames["c"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_oversized_frames_and_invalidation():
+    """Frames larger than the budget are not cached; invalidation frees memory."""
+    cache = DataFrameCache(max_bytes=_size(_frame(10)))
+    cache.put("big", 1, _frame(10_000))
+    assert cache.get("big", 1) is None
+
+    cache.put("small", 1, _frame(10))
+    cache.invalidate("small")
+    assert cache.get("small", 1) is None
+    assert cache.stats()["current_bytes"] == 0
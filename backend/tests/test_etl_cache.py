@@ -0,0 +1,59 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from backend.app.services.etl_cache import EtlResultCache
+
+
+def _output(tmp_path: Path, name: str, size: int) -> str:
+    path = tmp_path / "output" / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(b"p" * size)
+    return str(path)
+
+
+def test_key_depends_on_content_loader_and_config(tmp_path: Path):
+    source = tmp_path / "data.csv"
+    source.write_bytes(b"a,b\n1,2\n")
+
+    key = EtlResultCache.key(b"a,b\n1,2\n", "load_csv", [{"step": "to_snake_case"}])
+
+    assert EtlResultCache.key(str(source), "load_csv", [{"step": "to_snake_case"}]) == key
+    assert EtlResultCache.key(b"a,b\n1,3\n", "load_csv", [{"step": "to_snake_case"}]) != key
+    assert EtlResultCache.key(b"a,b\n1,2\n", "iter_csv_chunks", [{"step": "to_snake_case"}]) != key
+    assert EtlResultCache.key(b"a,b\n1,2\n", "load_csv", []) != key
+    settings = {"json_flatten_max_level": 1}
+    assert EtlResultCache.key(b"a,b\n1,2\n", "load_csv", [{"step": "to_snake_case"}], settings) != key
+
+
+def test_store_and_lookup_survive_output_replacement(tmp_path: Path):
+    """Entries are hard links, so replacing the original output leaves them intact."""
+    cache = EtlResultCache(tmp_path / "cache", max_bytes=10_000)
+    output = _output(tmp_path, "processed_libro_Hoja1.parquet", 10)
+
+    cache.store("k1", [("Hoja1", output)])
+    os.replace(_output(tmp_path, "new.parquet", 3), output)
+
+    entries = cache.lookup("k1")
+    assert [entry["sheet"] for entry in entries] == ["Hoja1"]
+    assert Path(entries[0]["path"]).read_bytes() == b"p" * 10
+    assert cache.lookup("missing") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path):
+    cache = EtlResultCache(tmp_path / "cache", max_bytes=400)
+    for key in ("old", "used", "newer"):
+        cache.store(key, [(None, _output(tmp_path, f"{key}.parquet", 100))])
+        time.sleep(0.02)
+    # Each entry is ~170 bytes: the third store evicts the oldest one.
+    assert cache.lookup("old") is None
+    cache.lookup("used")
+    time.sleep(0.02)
+
+    cache.store("latest", [(None, _output(tmp_path, "latest.parquet", 100))])
+
+    assert cache.lookup("newer") is None
+    assert cache.lookup("used") is not None and cache.lookup("latest") is not None
+    assert cache.size() <= 400
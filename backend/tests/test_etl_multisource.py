@@ -0,0 +1,440 @@
+import bz2
+import gzip
+import io
+import json
+import lzma
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from backend.app.services import etl_multisource_service as etl
+
+
+def _csv(rows: int, offset: int = 0) -> bytes:
+    df = pd.DataFrame({"Id": range(offset, offset + rows), "Valor Total": [1.5] * rows})
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def _zip(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def etl_workspace(tmp_path: Path, monkeypatch) -> Path:
+    """Runs the ETL with a temporary directory as working directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _files() -> dict:
+    return {
+        "b.csv": _csv(3, offset=10),
+        "bundle.zip": _zip({"z1.csv": _csv(2, offset=20), "notes.txt": b"ignored"}),
+        "a.csv": _csv(4),
+    }
+
+
+def test_parallel_results_follow_input_order(etl_workspace, monkeypatch):
+    """Workers finishing out of order still produce the serial result and unified order."""
+    original_loader = etl.DATA_LOADERS["csv"]
+
+    def slow_first_file(content):
+        if content == _csv(3, offset=10):
+            time.sleep(0.2)
+        return original_loader(content)
+
+    monkeypatch.setitem(etl.DATA_LOADERS, "csv", slow_first_file)
+    monkeypatch.setattr(etl, "_create_executor", lambda workers: ThreadPoolExecutor(max_workers=workers))
+
+    serial = etl.run_full_etl_process(_files(), max_workers=1)
+    serial_master = pd.read_parquet(etl_workspace / serial["master_dataset"])
+    parallel = etl.run_full_etl_process(_files(), max_workers=4)
+    parallel_master = pd.read_parquet(etl_workspace / parallel["master_dataset"])
+
+    assert list(parallel["individual_files"]) == ["b.csv", "z1.csv", "a.csv"]
+    assert parallel == serial
+    assert parallel_master["id"].tolist() == [10, 11, 12, 20, 21, 0, 1, 2, 3]
+    pd.testing.assert_frame_equal(parallel_master, serial_master)
+
+
+def test_slow_file_times_out_without_failing_the_batch(etl_workspace, monkeypatch):
+    """A file exceeding the per-file timeout is reported as an error."""
+    original_loader = etl.DATA_LOADERS["csv"]
+
+    def hanging_loader(content):
+        if content == b"hang":
+            time.sleep(5)
+        return original_loader(content)
+
+    monkeypatch.setitem(etl.DATA_LOADERS, "csv", hanging_loader)
+
+    result = etl.run_full_etl_process({"hang.csv": b"hang", "ok.csv": _csv(2)}, max_workers=1, timeout_seconds=0.2)
+
+    assert "tiempo máximo" in result["individual_files"]["hang.csv"]["error"]
+    assert isinstance(result["individual_files"]["ok.csv"], str)
+    assert len(pd.read_parquet(etl_workspace / result["master_dataset"])) == 2
+
+
+def test_process_pool_handles_archives(etl_workspace):
+    """The real process pool expands archives and keeps results in input order."""
+    result = etl.run_full_etl_process(_files(), max_workers=2)
+
+    assert list(result["individual_files"]) == ["b.csv", "z1.csv", "a.csv"]
+    assert result["individual_files"]["z1.csv"] == etl._individual_output_path("bundle.zip/z1.csv")
+    assert result["individual_files"]["z1.csv"].startswith("data/output/processed_z1_")
+    master = pd.read_parquet(etl_workspace / result["master_dataset"])
+    assert master["id"].tolist() == [10, 11, 12, 20, 21, 0, 1, 2, 3]
+
+
+def test_sources_with_the_same_name_get_their_own_outputs(etl_workspace):
+    """Same-named members of different folders or archives never share an output file."""
+    files = {
+        "data.csv": _csv(2),
+        "regiones.zip": _zip({"norte/data.csv": _csv(3, offset=10), "sur/data.csv": _csv(4, offset=20)}),
+        "copia.zip": _zip({"data.csv": _csv(1, offset=30)}),
+    }
+
+    result = etl.run_full_etl_process(files, max_workers=2)
+
+    outputs = [result["individual_files"][name] for name in ("data.csv", "norte/data.csv", "sur/data.csv")]
+    assert len(set(outputs)) == 3
+    master = pd.read_parquet(etl_workspace / result["master_dataset"])
+    assert sorted(master["id"]) == [0, 1, 10, 11, 12, 20, 21, 22, 23, 30]
+    assert result["deduplication"]["duplicates_removed"] == 0
+
+
+def test_master_dataset_unifies_mismatched_schemas(etl_workspace):
+    """Sources with different columns and types are promoted, not turned into objects."""
+    files = {
+        "ints.csv": b"Id,Valor,Solo A\n1,10,x\n2,20,y\n",
+        "floats.csv": b"Id,Valor\n3,1.5\n",
+        "text.csv": b"Id,Valor\n4,n/d\n",
+    }
+
+    result = etl.run_full_etl_process(files, max_workers=1)
+
+    master = pd.read_parquet(etl_workspace / result["master_dataset"])
+    assert master.columns.tolist() == ["id", "valor", "solo_a"]
+    # optimize_dtypes reduce cada fuente; la unificación promueve a un tipo común.
+    assert master["id"].dtype == "int8"
+    assert master["valor"].tolist() == ["10", "20", "1.5", "n/d"]
+    assert master["solo_a"].tolist()[2:] == [None, None]
+    assert result["provenance"]["valor"] == {
+        "sources": {"ints.csv": "int8", "floats.csv": "float", "text.csv": "string"},
+        "unified_type": "string",
+    }
+
+
+def test_sources_are_exported_with_compact_dtypes(etl_workspace):
+    """optimize_dtypes runs on every source and its savings reach the audit log."""
+    rows = ["Id,Region,Activo,Importe"] + [f"{i},{'norte' if i % 2 else 'sur'},{'sí' if i % 3 else 'no'},{i}.5" for i in range(200)]
+
+    result = etl.run_full_etl_process({"ventas.csv": "\n".join(rows).encode("utf-8")}, max_workers=1)
+
+    exported = pd.read_parquet(etl_workspace / result["individual_files"]["ventas.csv"])
+    assert exported.dtypes.astype(str).tolist() == ["int16", "category", "bool", "float32"]
+    assert exported["activo"].tolist()[:3] == [False, True, True]
+    log = (etl_workspace / "data/logs/etl_log.json").read_text()
+    assert '"bytes_saved_by_column": {"id": ' in log
+
+
+def test_workbook_sheets_are_filtered_and_exported_in_order(etl_workspace, monkeypatch):
+    """Each selected sheet becomes its own source; the others are never read."""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for name, offset in [("Enero", 0), ("Resumen", 100), ("Febrero", 10)]:
+            pd.DataFrame({"Id": range(offset, offset + 3), "Valor Total": [1.5] * 3}).to_excel(writer, sheet_name=name, index=False)
+    monkeypatch.setattr(etl, "EXCEL_SHEETS", ["Enero", "Feb*"])
+
+    result = etl.run_full_etl_process({"libro.xlsx": buffer.getvalue()}, max_workers=1)
+
+    assert list(result["individual_files"]) == ["libro_Enero", "libro_Febrero"]
+    master = pd.read_parquet(etl_workspace / result["master_dataset"])
+    assert master["id"].tolist() == [0, 1, 2, 10, 11, 12]
+
+
+def test_rows_repeated_across_sources_appear_once_in_the_master(etl_workspace):
+    files = {"enero.csv": _csv(3), "febrero.csv": _csv(3, offset=2), "copia.csv": _csv(2)}
+
+    result = etl.run_full_etl_process(files, max_workers=1)
+
+    master = pd.read_parquet(etl_workspace / result["master_dataset"])
+    assert master["id"].tolist() == [0, 1, 2, 3, 4]
+    assert result["deduplication"] == {
+        "duplicates_removed": 3,
+        "duplicates_per_source": {"enero.csv": 0, "febrero.csv": 1, "copia.csv": 2},
+    }
+
+
+def test_large_csv_is_streamed_in_chunks(etl_workspace, tmp_path: Path, monkeypatch):
+    """Files above the streaming threshold are normalized chunk by chunk into Parquet."""
+    monkeypatch.setattr(etl, "ETL_STREAMING_THRESHOLD_BYTES", 1024)
+    big = tmp_path / "big.csv"
+    rows = ["Id,Valor,Nota"] + [f"{i},{i}.5," for i in range(2500)] + ["2500,,texto"]
+    big.write_text("\n".join(rows) + "\n")
+    chunk_sizes = []
+    original_iter = etl.STREAMING_LOADERS["csv"]
+
+    def small_chunks(source):
+        for chunk in original_iter(source, chunksize=1000):
+            chunk_sizes.append(len(chunk))
+            yield chunk
+
+    monkeypatch.setitem(etl.STREAMING_LOADERS, "csv", small_chunks)
+
+    result = etl.run_full_etl_process({"big.csv": str(big), "small.csv": b"Id,Valor,Nota\n9,1.5,x\n7,2.5,y\n"}, max_workers=1)
+
+    assert chunk_sizes == [1000, 1000, 501]
+    assert result["individual_files"]["big.csv"] == etl._individual_output_path("big.csv")
+    streamed = pd.read_parquet(tmp_path / result["individual_files"]["big.csv"])
+    assert list(streamed.columns) == ["id", "valor", "nota"]
+    assert len(streamed) == 2501 and streamed["nota"].iloc[-1] == "texto"
+    master = pd.read_parquet(tmp_path / result["master_dataset"])
+    assert len(master) == 2503
+    log = (tmp_path / "data/logs/etl_log.json").read_text()
+    assert '"peak_rss_bytes"' in log
+
+
+def test_streamed_csv_columns_can_change_type_between_chunks(etl_workspace, monkeypatch):
+    """A column read as integers in the first chunk and as text later is widened, as the in-memory path does."""
+    rows = ["Id,Codigo"] + [f"{i},{i}" for i in range(5)] + ["5,pendiente"]
+    content = ("\n".join(rows) + "\n").encode("utf-8")
+    original_iter = etl.STREAMING_LOADERS["csv"]
+    monkeypatch.setitem(etl.STREAMING_LOADERS, "csv", lambda source: original_iter(source, chunksize=2))
+
+    result = etl.run_full_etl_process({"codigos.csv.gz": gzip.compress(content), "codigos.csv": content}, max_workers=1)
+
+    streamed = pd.read_parquet(result["individual_files"]["codigos.csv.gz"])
+    in_memory = pd.read_parquet(result["individual_files"]["codigos.csv"])
+    assert streamed["codigo"].tolist() == ["0", "1", "2", "3", "4", "pendiente"]
+    assert streamed["codigo"].tolist() == in_memory["codigo"].astype(str).tolist()
+
+
+def test_large_json_sources_are_streamed_and_flattened(etl_workspace, monkeypatch):
+    """JSON arrays and JSON Lines above the threshold go through the chunked path."""
+    monkeypatch.setattr(etl, "ETL_STREAMING_THRESHOLD_BYTES", 1024)
+    records = [{"id": i, "cliente": {"nombre": f"c{i}", "region": "norte"}} for i in range(300)]
+
+    result = etl.run_full_etl_process({
+        "clientes.json": json.dumps(records).encode("utf-8"),
+        "altas.jsonl": "\n".join(json.dumps(r) for r in records[:100]).encode("utf-8"),
+    }, max_workers=1)
+
+    streamed = pd.read_parquet(etl_workspace / result["individual_files"]["clientes.json"])
+    assert list(streamed.columns) == ["id", "cliente_nombre", "cliente_region"]
+    assert len(streamed) == 300
+    assert len(pd.read_parquet(etl_workspace / result["master_dataset"])) == 300
+    assert '"streaming": true' in (etl_workspace / "data/logs/etl_log.json").read_text()
+
+
+def test_only_flattened_json_keys_are_joined_with_underscores(etl_workspace):
+    """'cliente.nombre' from a JSON object becomes 'cliente_nombre'; a dotted CSV header is kept."""
+    result = etl.run_full_etl_process({
+        "clientes.json": json.dumps([{"id": 1, "cliente": {"nombre": "c1"}}]).encode("utf-8"),
+        "medidas.csv": b"id,col.a\n1,2\n",
+    }, max_workers=1)
+
+    assert list(pd.read_parquet(result["individual_files"]["clientes.json"]).columns) == ["id", "cliente_nombre"]
+    assert list(pd.read_parquet(result["individual_files"]["medidas.csv"]).columns) == ["id", "col.a"]
+
+
+def test_streamed_json_records_can_add_keys_in_later_chunks(etl_workspace, monkeypatch):
+    """Compressed JSON Lines are always streamed; a key that first appears in a later chunk is kept."""
+    records = [{"id": i} for i in range(4)] + [{"id": 4, "extra": "x"}, {"id": 5}]
+    original_iter = etl.STREAMING_LOADERS["jsonl"]
+    monkeypatch.setitem(etl.STREAMING_LOADERS, "jsonl", lambda source: original_iter(source, chunksize=2))
+
+    result = etl.run_full_etl_process({
+        "altas.jsonl.gz": gzip.compress("\n".join(json.dumps(r) for r in records).encode("utf-8")),
+    }, max_workers=1)
+
+    streamed = pd.read_parquet(result["individual_files"]["altas.jsonl.gz"])
+    assert streamed["id"].tolist() == list(range(6))
+    assert streamed["extra"].tolist() == [None, None, None, None, "x", None]
+
+
+def test_single_file_compressed_sources_are_streamed(etl_workspace, monkeypatch):
+    """Compressed CSV/TSV/JSONL files are decompressed on the fly into the chunked readers."""
+    zstandard = pytest.importorskip("zstandard")
+    jsonl = "\n".join(json.dumps({"Id": i, "Valor Total": 2.5}) for i in range(50, 60)).encode("utf-8")
+
+    result = etl.run_full_etl_process({
+        "enero.csv.gz": gzip.compress(_csv(30)),
+        "febrero.tsv.bz2": bz2.compress(_csv(20, offset=30).replace(b",", b"\t")),
+        "marzo.jsonl.zst": zstandard.ZstdCompressor().compress(jsonl),
+        "abril.xz": lzma.compress(_csv(5)),
+    }, max_workers=1)
+
+    assert result["individual_files"]["enero.csv.gz"] == etl._individual_output_path("enero.csv.gz")
+    assert "abril.xz" not in result["individual_files"]
+    master = pd.read_parquet(etl_workspace / result["master_dataset"])
+    assert sorted(master["id"]) == list(range(60))
+    assert '"streaming": true' in (etl_workspace / "data/logs/etl_log.json").read_text()
+
+
+def test_compressed_sources_without_rows_do_not_break_the_run(etl_workspace):
+    """A header-only .csv.gz and an empty .json.gz array yield empty sources, not a crash."""
+    result = etl.run_full_etl_process({
+        "vacio.csv.gz": gzip.compress(b"Id,Valor Total\n"),
+        "nada.json.gz": gzip.compress(b"[]"),
+        "a.csv": _csv(2),
+    }, max_workers=1)
+
+    assert len(pd.read_parquet(result["individual_files"]["vacio.csv.gz"])) == 0
+    assert len(pd.read_parquet(result["individual_files"]["nada.json.gz"])) == 0
+    master = pd.read_parquet(etl_workspace / result["master_dataset"])
+    assert master["id"].tolist() == [0, 1]
+    assert pd.api.types.is_integer_dtype(master["id"])
+
+
+def test_rejected_archive_is_reported(etl_workspace, monkeypatch):
+    """An archive breaching the extraction limits fails alone, with its reason."""
+    def over_limit(filename, content):
+        raise etl.ArchiveLimitError("demasiado grande")
+        yield
+
+    monkeypatch.setattr(etl, "iter_archive_members", over_limit)
+
+    result = etl.run_full_etl_process({"bomb.zip": _zip({"a.csv": b"1"}), "a.csv": _csv(2)}, max_workers=1)
+
+    assert "rechazado" in result["individual_files"]["bomb.zip"]["error"]
+    assert isinstance(result["individual_files"]["a.csv"], str)
+
+
+def test_identical_uploads_are_served_from_the_cache(etl_workspace, monkeypatch):
+    """A re-uploaded file, even renamed, skips loading and normalization."""
+    calls = []
+    original_loader = etl.DATA_LOADERS["csv"]
+
+    def counting_loader(content):
+        calls.append(content)
+        return original_loader(content)
+
+    monkeypatch.setitem(etl.DATA_LOADERS, "csv", counting_loader)
+    monkeypatch.setattr(etl, "etl_cache", etl.EtlResultCache(etl_workspace / "cache"))
+
+    first = etl.run_full_etl_process({"ventas.csv": _csv(3)}, max_workers=1)
+    second = etl.run_full_etl_process({"ventas_copia.csv": _csv(3), "otro.csv": _csv(2, offset=5)}, max_workers=1)
+
+    assert len(calls) == 2
+    assert second["individual_files"]["ventas_copia.csv"] == etl._individual_output_path("ventas_copia.csv")
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(etl_workspace / second["individual_files"]["ventas_copia.csv"]),
+        pd.read_parquet(etl_workspace / first["individual_files"]["ventas.csv"]),
+    )
+    assert len(pd.read_parquet(etl_workspace / second["master_dataset"])) == 5
+    assert '"cache_hit": true' in (etl_workspace / "data/logs/etl_log.json").read_text()
+
+
+def test_changed_output_settings_bypass_the_cache(etl_workspace, monkeypatch):
+    """Entries written under other output-affecting settings are not reused."""
+    calls = []
+    original_loader = etl.DATA_LOADERS["csv"]
+
+    def counting_loader(content):
+        calls.append(content)
+        return original_loader(content)
+
+    monkeypatch.setitem(etl.DATA_LOADERS, "csv", counting_loader)
+    monkeypatch.setattr(etl, "etl_cache", etl.EtlResultCache(etl_workspace / "cache"))
+
+    etl.run_full_etl_process({"ventas.csv": _csv(3)}, max_workers=1)
+    monkeypatch.setattr(etl.normalization_pipeline, "CATEGORICAL_MAX_RATIO", 0.1)
+    etl.run_full_etl_process({"ventas.csv": _csv(3)}, max_workers=1)
+    etl.run_full_etl_process({"ventas.csv": _csv(3)}, max_workers=1)
+
+    assert len(calls) == 2
+
+
+@pytest.fixture
+def job_outputs(etl_workspace, store, monkeypatch) -> Path:
+    """Checkpointed runs write to their own output directory, with the result cache off."""
+    output_dir = etl_workspace / "salida"
+    monkeypatch.setattr(etl, "ETL_OUTPUT_DIRECTORY", str(output_dir))
+    monkeypatch.setattr(etl, "ETL_CACHE_ENABLED", False)
+    return output_dir
+
+
+def _counting_csv_loader(monkeypatch, failing: set = frozenset(), on_call=None) -> list:
+    original_loader = etl.DATA_LOADERS["csv"]
+    calls = []
+
+    def loader(content):
+        calls.append(content)
+        if on_call is not None:
+            on_call(content)
+        if content in failing:
+            raise ValueError("fallo transitorio")
+        return original_loader(content)
+
+    monkeypatch.setitem(etl.DATA_LOADERS, "csv", loader)
+    return calls
+
+
+def test_resumed_job_only_reprocesses_unfinished_files(job_outputs, store, monkeypatch):
+    """A job run again with the same id skips completed files and redoes the failed ones."""
+    files = _files()
+    failing = {files["b.csv"]}
+    progress_at = {}
+    calls = _counting_csv_loader(
+        monkeypatch, failing,
+        on_call=lambda content: progress_at.setdefault(content, store.get_etl_job_progress("job-1"))
+    )
+
+    first = etl.run_full_etl_process(files, max_workers=1, job_id="job-1")
+    assert "error" in first["individual_files"]["b.csv"]
+    assert len(calls) == 3
+    # a.csv is loaded after b.csv has been checkpointed and before the archive is.
+    assert progress_at[files["a.csv"]]["sources_done"] == 1
+    assert progress_at[files["a.csv"]]["bytes_processed"] == len(files["b.csv"])
+    progress = store.get_etl_job_progress("job-1")
+    assert progress["status"] == "failed"
+    assert (progress["sources_done"], progress["sources_total"], progress["sources_failed"]) == (3, 3, 1)
+    assert progress["bytes_processed"] == progress["bytes_total"] == sum(len(c) for c in files.values())
+
+    calls.clear()
+    failing.clear()
+    resumed = etl.run_full_etl_process(files, max_workers=1, job_id="job-1")
+
+    assert calls == [files["b.csv"]]
+    assert store.get_etl_job_progress("job-1")["status"] == "completed"
+    assert store.get_etl_checkpoints("job-1")["b.csv"]["status"] == "completed"
+    assert list(resumed["individual_files"]) == ["b.csv", "z1.csv", "a.csv"]
+    master = pd.read_parquet(resumed["master_dataset"])
+    assert master["id"].tolist() == [10, 11, 12, 20, 21, 0, 1, 2, 3]
+
+
+def test_checkpoint_is_ignored_when_input_or_output_changes(job_outputs, store, monkeypatch):
+    """Changed content or a missing Parquet makes a completed file run again."""
+    calls = _counting_csv_loader(monkeypatch)
+
+    etl.run_full_etl_process({"a.csv": _csv(2), "b.csv": _csv(2, offset=5)}, max_workers=1, job_id="job-2")
+    Path(etl._individual_output_path("b.csv")).unlink()
+    calls.clear()
+    result = etl.run_full_etl_process({"a.csv": _csv(3), "b.csv": _csv(2, offset=5)}, max_workers=1, job_id="job-2")
+
+    assert calls == [_csv(3), _csv(2, offset=5)]
+    assert len(pd.read_parquet(result["master_dataset"])) == 5
+
+
+def test_checkpoint_is_ignored_when_another_job_rewrote_the_output(job_outputs, store, monkeypatch):
+    """Outputs are shared between jobs, so a resumed job checks they are still its own."""
+    calls = _counting_csv_loader(monkeypatch, failing={_csv(1, offset=50)})
+
+    etl.run_full_etl_process({"a.csv": _csv(2), "b.csv": _csv(1, offset=50)}, max_workers=1, job_id="job-a")
+    etl.run_full_etl_process({"a.csv": _csv(1, offset=777)}, max_workers=1, job_id="job-b")
+    calls.clear()
+    resumed = etl.run_full_etl_process({"a.csv": _csv(2), "b.csv": _csv(1, offset=50)}, max_workers=1, job_id="job-a")
+
+    assert _csv(2) in calls
+    master = pd.read_parquet(resumed["master_dataset"])
+    assert 777 not in master["id"].tolist()
+    assert sorted(master["id"]) == [0, 1]
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pytest
+
+from backend.app import etl_tasks
+from backend.app.services import etl_multisource_service as etl
+
+
+@pytest.fixture
+def task_workspace(tmp_path: Path, store, monkeypatch) -> Path:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(etl, "ETL_CACHE_ENABLED", False)
+    monkeypatch.setattr(etl_tasks.run_etl_pipeline_task, "default_retry_delay", 0)
+    (tmp_path / "ok.csv").write_text("Id,Valor\n1,2\n")
+    (tmp_path / "bad.csv").write_text("Id,Valor\n3,4\n")
+    return tmp_path
+
+
+def test_task_returns_the_etl_result(task_workspace):
+    result = etl_tasks.run_etl_pipeline_task.apply(kwargs={"file_paths": {"ok.csv": "ok.csv"}}, task_id="task-ok")
+
+    assert result.successful()
+    assert Path(result.result["master_dataset"]).exists()
+    assert etl_tasks.get_etl_job_progress("task-ok")["status"] == "completed"
+
+
+def _failing_csv_loader(monkeypatch, error_for):
+    """Loader that records every call and raises `error_for(content)` when it returns an exception."""
+    original_loader = etl.DATA_LOADERS["csv"]
+    loaded = []
+
+    def loader(content):
+        loaded.append(content)
+        error = error_for(content)
+        if error is not None:
+            raise error
+        return original_loader(content)
+
+    monkeypatch.setitem(etl.DATA_LOADERS, "csv", loader)
+    return loaded
+
+
+def test_unreadable_unchanged_sources_fail_without_retrying(task_workspace, monkeypatch):
+    """A deterministic per-file error on an unchanged file fails the task at once."""
+    loaded = _failing_csv_loader(monkeypatch, lambda content: ValueError("archivo corrupto") if b"3,4" in content else None)
+
+    result = etl_tasks.run_etl_pipeline_task.apply(
+        kwargs={"file_paths": {"ok.csv": "ok.csv", "bad.csv": "bad.csv"}}, task_id="task-bad"
+    )
+
+    assert result.failed()
+    assert isinstance(result.result, etl_tasks.EtlJobFailedError)
+    assert list(result.result.errors) == ["bad.csv"]
+    assert len(loaded) == 2
+    assert etl_tasks.get_etl_job_progress("task-bad")["status"] == "failed"
+
+
+def test_transient_errors_are_retried(task_workspace, monkeypatch):
+    """An I/O error is retried, and the retry only redoes the failed file."""
+    attempts = []
+
+    def error_for(content):
+        if b"3,4" in content and not attempts:
+            attempts.append(content)
+            return OSError("volumen no disponible")
+        return None
+
+    loaded = _failing_csv_loader(monkeypatch, error_for)
+
+    result = etl_tasks.run_etl_pipeline_task.apply(
+        kwargs={"file_paths": {"ok.csv": "ok.csv", "bad.csv": "bad.csv"}}, task_id="task-transient"
+    )
+
+    assert result.successful()
+    assert loaded.count(b"Id,Valor\n1,2\n") == 1
+    assert loaded.count(b"Id,Valor\n3,4\n") == 2
+
+
+def test_failed_sources_whose_input_changed_are_retried(task_workspace, monkeypatch):
+    """A file replaced after it failed is processed again on the retry."""
+    def error_for(content):
+        if b"3,4" in content:
+            (task_workspace / "bad.csv").write_text("Id,Valor\n5,6\n")
+            return ValueError("archivo a medio copiar")
+        return None
+
+    loaded = _failing_csv_loader(monkeypatch, error_for)
+
+    result = etl_tasks.run_etl_pipeline_task.apply(
+        kwargs={"file_paths": {"ok.csv": "ok.csv", "bad.csv": "bad.csv"}}, task_id="task-changed"
+    )
+
+    assert result.successful()
+    assert loaded[-1] == b"Id,Valor\n5,6\n"
+    assert etl_tasks.get_etl_job_progress("task-changed")["status"] == "completed"
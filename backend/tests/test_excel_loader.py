@@ -0,0 +1,65 @@
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from backend.app.etl_providers import excel_loader
+from backend.app.etl_providers.excel_loader import iter_excel_sheets, list_excel_sheets, load_excel
+
+
+def _workbook(sheets: dict) -> bytes:
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return buffer.getvalue()
+
+
+def _sheet_executor_type() -> type:
+    executor = excel_loader._create_executor(2)
+    executor.shutdown()
+    return type(executor)
+
+
+@pytest.fixture
+def workbook() -> bytes:
+    return _workbook({
+        f"Ventas {month}": pd.DataFrame({"Id": range(3), "Importe": [1.5 * month] * 3})
+        for month in range(1, 5)
+    } | {"Notas": pd.DataFrame({"Texto": ["borrador"]})})
+
+
+def test_sheets_are_filtered_by_name_before_reading(workbook, monkeypatch):
+    read = []
+    original_read = excel_loader._read_sheet
+    monkeypatch.setattr(excel_loader, "_read_sheet", lambda *args: read.append(args[1]) or original_read(*args))
+
+    sheets = dict(iter_excel_sheets(workbook, sheets=["Ventas *"]))
+
+    assert read == ["Ventas 1", "Ventas 2", "Ventas 3", "Ventas 4"]
+    assert list(sheets) == read
+    assert sheets["Ventas 2"]["Importe"].tolist() == [3.0, 3.0, 3.0]
+
+
+def test_parallel_reading_matches_serial_reading(workbook, monkeypatch):
+    monkeypatch.setattr(excel_loader, "EXCEL_PARALLEL_MIN_BYTES", 0)
+
+    parallel = list(iter_excel_sheets(workbook, max_workers=2, ordered=True))
+    unordered = dict(iter_excel_sheets(workbook, max_workers=2))
+    serial = load_excel(workbook)
+
+    assert [name for name, _ in parallel] == list_excel_sheets(workbook) == list(serial)
+    assert sorted(unordered) == sorted(serial)
+    for name, df in parallel:
+        pd.testing.assert_frame_equal(df, serial[name])
+        pd.testing.assert_frame_equal(unordered[name], serial[name])
+
+
+def test_workers_of_another_pool_read_sheets_with_threads():
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        nested = pool.submit(_sheet_executor_type).result()
+
+    assert nested is ThreadPoolExecutor
+    assert _sheet_executor_type() is ProcessPoolExecutor
@@ -0,0 +1,64 @@
+import io
+import json
+
+import pandas as pd
+
+from backend.app.etl_providers import jsonl_loader
+from backend.app.etl_providers.json_loader import iter_json_array, iter_json_chunks, load_json
+from backend.app.etl_providers.jsonl_loader import iter_jsonl_chunks, load_jsonl
+
+RECORDS = [
+    {"id": i, "cliente": {"nombre": f"c{i}", "direccion": {"ciudad": "León"}}, "etiquetas": ["a", "b"], "importe": 1.5 * i}
+    for i in range(5)
+]
+
+
+def test_array_items_are_decoded_across_block_boundaries():
+    document = b' [ 1 , 12345, "x,]", {"a": [1, 2]}, true ] '
+
+    assert list(iter_json_array(io.BytesIO(document), block_bytes=2)) == [1, 12345, "x,]", {"a": [1, 2]}, True]
+
+
+def test_json_array_is_read_in_flattened_batches():
+    chunks = list(iter_json_chunks(json.dumps(RECORDS).encode("utf-8"), chunksize=2, max_level=1))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    df = pd.concat(chunks)
+    assert df.columns.tolist() == ["id", "cliente.nombre", "cliente.direccion", "etiquetas", "importe"]
+    assert df.index.tolist() == [0, 1, 2, 3, 4]
+    assert df["cliente.direccion"].iloc[0] == '{"ciudad": "León"}'
+    assert df["etiquetas"].iloc[0] == '["a", "b"]'
+
+
+def test_jsonl_arrow_and_json_batches_agree(monkeypatch):
+    lines = b"\n".join(json.dumps(record).encode("utf-8") for record in RECORDS) + b"\n\n"
+
+    arrow = pd.concat(iter_jsonl_chunks(lines, chunksize=2))
+    monkeypatch.setattr(jsonl_loader, "JSONL_ARROW_ENABLED", False)
+    expected = pd.concat(iter_jsonl_chunks(lines, chunksize=2))
+
+    pd.testing.assert_frame_equal(arrow, expected)
+    assert arrow.columns.tolist() == ["id", "cliente.nombre", "cliente.direccion.ciudad", "etiquetas", "importe"]
+    assert pd.concat(iter_json_chunks(json.dumps(RECORDS).encode("utf-8"), chunksize=2)).equals(expected)
+
+
+def test_null_objects_do_not_add_columns_to_later_batches():
+    records = [{"id": 1, "cliente": {"nombre": "a"}}, {"id": 2, "cliente": None}]
+
+    chunks = list(iter_jsonl_chunks(b"\n".join(json.dumps(r).encode("utf-8") for r in records), chunksize=1))
+
+    assert [chunk.columns.tolist() for chunk in chunks] == [["id", "cliente.nombre"], ["id"]]
+
+
+def test_in_memory_loaders_flatten_like_the_chunked_readers():
+    """A JSON file gets the same columns whether it is loaded whole or streamed."""
+    document = json.dumps(RECORDS).encode("utf-8")
+    lines = b"\n".join(json.dumps(record).encode("utf-8") for record in RECORDS)
+
+    pd.testing.assert_frame_equal(load_json(document), pd.concat(iter_json_chunks(document, chunksize=2)))
+    pd.testing.assert_frame_equal(load_jsonl(lines), pd.concat(iter_jsonl_chunks(lines, chunksize=2)))
+    assert load_json(document, max_level=1).columns.tolist() == [
+        "id", "cliente.nombre", "cliente.direccion", "etiquetas", "importe"
+    ]
+    assert load_json(b"[]").empty and load_jsonl(b"\n").empty
+    assert load_json(b'{"a": {"0": 1, "1": 2}}')["a"].tolist() == [1, 2]
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app.services.normalization_pipeline import run_normalization_pipeline
+from backend.mpa.etl.service import EtlService
+
+
+@pytest.fixture
+def raw_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "Id Cliente": [1, 2, 2, 3, 4, 5],
+        "MontoTotal": [10.0, np.nan, np.nan, 30.0, 30.0, np.nan],
+        "Unidades": [1.5, 2.0, 2.0, np.nan, 4.0, 4.0],
+        "Region": ["norte", None, None, "sur", "sur", "este"],
+        "Activo": [True, False, False, True, True, False],
+        "Fecha": ["2024-01-01", "2024-01-02", "2024-01-02", "2024-02-01", "2024-03-01", "2024-03-02"],
+    })
+
+
+PARITY_CONFIGS = {
+    "labels_and_dedup": [
+        {"step": "rename_columns", "params": {"rename_mapping": {"Region": "Zona"}}},
+        {"step": "to_snake_case"},
+        {"step": "remove_duplicates"},
+        {"step": "remove_duplicates", "params": {"subset": ["zona"]}},
+    ],
+    "fill_mean": [{"step": "handle_nulls", "params": {"strategy": "mean"}}],
+    "fill_median": [{"step": "handle_nulls", "params": {"strategy": "median", "subset": ["MontoTotal"]}}],
+    "fill_mode": [{"step": "handle_nulls", "params": {"strategy": "mode"}}],
+    "drop_nulls": [{"step": "handle_nulls", "params": {"strategy": "drop", "subset": ["Region", "Unidades"]}}],
+    "fill_constant": [
+        {"step": "fill_nulls", "params": {"value": 0, "subset": ["MontoTotal"]}},
+        {"step": "fill_nulls", "params": {"value": "sin region", "subset": ["Region"]}},
+    ],
+    "convert_types": [
+        {"step": "convert_types", "params": {"type_mapping": {"Id Cliente": "float64", "Activo": "int64"}}},
+    ],
+    # Pasos sin equivalente nativo exacto: se ejecutan con pandas dentro del motor.
+    "pandas_fallback": [
+        {"step": "convert_types", "params": {"type_mapping": {"Fecha": "datetime", "Id Cliente": "str"}}},
+        {"step": "fill_nulls", "params": {"value": "n/d", "subset": ["Region"]}},
+        {"step": "remove_duplicates"},
+    ],
+    # Tras rellenar con texto una columna numérica el resultado ya no se puede
+    # convertir al motor, y el resto del pipeline sigue con pandas.
+    "pandas_tail": [
+        {"step": "fill_nulls", "params": {"value": "n/d"}},
+        {"step": "remove_duplicates"},
+    ],
+}
+
+
+@pytest.mark.parametrize("engine", ["arrow", "polars"])
+@pytest.mark.parametrize("config_name", list(PARITY_CONFIGS))
+def test_engines_match_pandas(raw_df, engine, config_name):
+    config = PARITY_CONFIGS[config_name]
+    original = raw_df.copy()
+
+    expected = run_normalization_pipeline(raw_df, config, engine="pandas")
+    result = run_normalization_pipeline(raw_df, config, engine=engine)
+
+    pd.testing.assert_frame_equal(result, expected.reset_index(drop=True))
+    pd.testing.assert_frame_equal(raw_df, original)
+
+
+def test_arrow_metrics_record_the_executing_engine(raw_df):
+    metrics = []
+
+    run_normalization_pipeline(raw_df, PARITY_CONFIGS["pandas_fallback"], metrics=metrics, engine="arrow")
+
+    assert [(m["step"], m["engine"]) for m in metrics] == [
+        ("convert_types", "pandas"), ("fill_nulls", "arrow"), ("remove_duplicates", "arrow")
+    ]
+
+
+def test_polars_metrics_cover_the_whole_lazy_plan(raw_df):
+    from backend.app.services.normalization_engines import PolarsEngine
+
+    metrics = []
+    config = [{"step": "remove_duplicates"}, {"step": "to_snake_case"}]
+
+    result = run_normalization_pipeline(raw_df, config, metrics=metrics, engine="polars")
+
+    assert [(m["step"], m["engine"]) for m in metrics] == [("remove_duplicates+to_snake_case", "polars")]
+    assert metrics[0]["rows_after"] == len(result)
+    engine = PolarsEngine()
+    frame = engine.from_pandas(result)
+    assert engine.num_rows(frame) == len(result)
+    assert engine.nbytes(frame) > 0
+
+
+def test_unknown_engine_is_rejected(raw_df):
+    with pytest.raises(ValueError):
+        run_normalization_pipeline(raw_df, [], engine="spark")
+
+
+@pytest.mark.parametrize("engine", ["pandas", "arrow", "polars"])
+def test_mpa_actions_run_on_the_selected_engine(raw_df, engine):
+    steps = [
+        {"action": "rename", "columns": {"MontoTotal": "monto"}},
+        {"action": "drop_nulls", "column": "Region"},
+        {"action": "fill_nulls", "column": "monto", "value": 0},
+        {"action": "to_snake_case"},
+        {"action": "unknown"},
+    ]
+
+    result = EtlService().process_pipeline(raw_df, steps, engine=engine)
+
+    assert result.columns.tolist() == ["id__cliente", "monto", "unidades", "region", "activo", "fecha"]
+    assert result["monto"].tolist() == [10.0, 30.0, 30.0, 0.0]
+    assert raw_df["MontoTotal"].isna().sum() == 3
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app.services.normalization_pipeline import compile_pipeline, run_normalization_pipeline
+
+
+@pytest.fixture
+def raw_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "Id Cliente": [1, 2, 2, 3],
+        "MontoTotal": [10.0, np.nan, np.nan, 30.0],
+        "Unidades": [1.0, 2.0, 2.0, np.nan],
+        "Region": ["norte", None, None, "sur"],
+    })
+
+
+def test_compatible_steps_are_fused():
+    plan = compile_pipeline([
+        {"step": "rename_columns", "params": {"rename_mapping": {"Region": "Zona"}}},
+        {"step": "to_snake_case"},
+        {"step": "handle_nulls", "params": {"strategy": "mean", "subset": ["monto_total"]}},
+        {"step": "handle_nulls", "params": {"strategy": "mean", "subset": ["unidades"]}},
+        {"step": "no_existe"},
+        {"step": "remove_duplicates"},
+    ])
+
+    assert [step.name for step in plan] == [
+        "rename_columns+to_snake_case", "handle_nulls+handle_nulls", "remove_duplicates"
+    ]
+
+
+def test_pipeline_leaves_the_input_untouched(raw_df):
+    original = raw_df.copy()
+
+    result = run_normalization_pipeline(raw_df, [
+        {"step": "to_snake_case"},
+        {"step": "handle_nulls", "params": {"strategy": "mean"}},
+        {"step": "remove_duplicates"},
+    ])
+
+    pd.testing.assert_frame_equal(raw_df, original)
+    assert result.columns.tolist() == ["id__cliente", "monto_total", "unidades", "region"]
+    assert result["monto_total"].tolist() == [10.0, 20.0, 30.0]
+    assert result["unidades"].tolist() == [1.0, 2.0, 5.0 / 3]
+
+
+def test_untouched_columns_share_memory_with_the_input(raw_df):
+    result = run_normalization_pipeline(raw_df, [
+        {"step": "to_snake_case"},
+        {"step": "handle_nulls", "params": {"strategy": "mean"}},
+    ])
+
+    assert np.shares_memory(result["id__cliente"].to_numpy(), raw_df["Id Cliente"].to_numpy())
+    assert not np.shares_memory(result["monto_total"].to_numpy(), raw_df["MontoTotal"].to_numpy())
+
+
+@pytest.mark.parametrize("strategy", ["median", "mode"])
+def test_fill_statistics_match_per_column_results(raw_df, strategy):
+    result = run_normalization_pipeline(raw_df, [{"step": "handle_nulls", "params": {"strategy": strategy}}])
+
+    for col in ["MontoTotal", "Unidades"]:
+        expected = getattr(raw_df[col], strategy)()
+        expected = expected.iloc[0] if strategy == "mode" else expected
+        assert result[col].tolist() == raw_df[col].fillna(expected).tolist()
+    assert result["Region"].isna().sum() == 2
+
+
+def test_steps_without_changes_do_not_copy(raw_df):
+    deduplicated = run_normalization_pipeline(raw_df, [{"step": "remove_duplicates"}])
+
+    assert run_normalization_pipeline(deduplicated, [{"step": "remove_duplicates"}]) is deduplicated
+
+
+def test_metrics_are_emitted_per_plan_step(raw_df):
+    metrics = []
+
+    run_normalization_pipeline(raw_df, [
+        {"step": "to_snake_case"},
+        {"step": "remove_duplicates"},
+        {"step": "handle_nulls", "params": {"strategy": "drop"}},
+    ], metrics=metrics)
+
+    assert [m["step"] for m in metrics] == ["to_snake_case", "remove_duplicates", "handle_nulls"]
+    assert [(m["rows_before"], m["rows_after"]) for m in metrics] == [(4, 4), (4, 3), (3, 1)]
+    assert all(m["seconds"] >= 0 and isinstance(m["memory_delta_bytes"], int) for m in metrics)
+
+
+def test_optimize_dtypes_only_applies_lossless_conversions():
+    df = pd.DataFrame({
+        "entero": [1, 200, -3, 4],
+        "exacto": [0.5, 1.25, np.nan, 2.0],
+        "inexacto": [0.1, 0.2, 0.3, 0.4],
+        "region": ["norte", "sur", "norte", "norte"],
+        "activo": ["Sí", "no", None, "NO"],
+        "texto": ["a", "b", "c", "d"],
+        "mixto": ["a", 1, "a", 1],
+    })
+    original = df.copy()
+    metrics = []
+
+    result = run_normalization_pipeline(df, [{"step": "optimize_dtypes"}], metrics=metrics)
+
+    assert result.dtypes.astype(str).to_dict() == {
+        "entero": "int16", "exacto": "float32", "inexacto": "float64", "region": "category",
+        "activo": "boolean", "texto": "object", "mixto": "object",
+    }
+    assert result["activo"].tolist() == [True, False, pd.NA, False]
+    unchanged_values = original.drop(columns="activo")
+    pd.testing.assert_frame_equal(result.drop(columns="activo").astype(unchanged_values.dtypes.to_dict()), unchanged_values)
+    pd.testing.assert_frame_equal(df, original)
+    assert set(metrics[0]["report"]) == {"entero", "exacto", "region", "activo"}
+    assert metrics[0]["report"]["entero"] == 4 * (8 - 2)
@@ -0,0 +1,24 @@
+import numpy as np
+
+from backend.app.services import payload_codec
+from backend.app.services.payload_codec import encode_payload, decode_payload
+
+
+def test_round_trip_with_numpy_values():
+    """Chart payloads with numpy values survive encoding."""
+    payload = {"points": np.arange(3), "mean": np.float64(1.5), "labels": ["a", "b"]}
+    assert decode_payload(encode_payload(payload)) == {"points": [0, 1, 2], "mean": 1.5, "labels": ["a", "b"]}
+
+
+def test_fallback_codec_without_optional_packages(monkeypatch):
+    """Without msgpack/zstandard payloads are zlib-compressed JSON."""
+    monkeypatch.setattr(payload_codec, "msgpack", None)
+    encoded = encode_payload([{"x": 1}] * 100)
+    assert encoded.startswith(payload_codec.JSON_ZLIB_TAG)
+    assert decode_payload(encoded) == [{"x": 1}] * 100
+
+
+def test_decodes_legacy_json_text():
+    """Plain JSON text written by earlier versions is still readable."""
+    assert decode_payload('{"a": [1, 2]}') == {"a": [1, 2]}
+    assert decode_payload(None) is None
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from backend.app.services.data_exporter import unify_to_parquet
+from backend.app.services.row_deduplicator import RowDeduplicator, hash_rows
+
+
+def test_row_hashes_do_not_depend_on_nulls_elsewhere_in_the_batch():
+    with_nulls = pa.table({"id": pa.array([1, None], pa.int64()), "region": ["norte", None]})
+    without_nulls = pa.table({"id": pa.array([1], pa.int64()), "region": ["norte"]})
+
+    hashes = hash_rows(with_nulls)
+
+    assert hashes[0] == hash_rows(without_nulls)[0]
+    assert hashes[1] != hash_rows(pa.table({"id": pa.array([0], pa.int64()), "region": [""]}))[0]
+
+
+def test_duplicates_are_removed_across_batches_and_sources():
+    deduplicator = RowDeduplicator()
+    first = pa.table({"id": [1, 2, 2, 3], "valor": ["a", "b", "b", "c"]})
+    second = pa.table({"id": [3, 4, 1], "valor": ["c", "d", "x"]})
+
+    assert deduplicator.keep_mask(first, "uno.csv").tolist() == [True, True, False, True]
+    assert deduplicator.filter(second, "dos.csv").to_pydict() == {"id": [4, 1], "valor": ["d", "x"]}
+    assert deduplicator.report() == {
+        "rows_seen": 7,
+        "distinct_rows": 5,
+        "duplicates_removed": 2,
+        "duplicates_per_source": {"uno.csv": 1, "dos.csv": 1},
+        "spilled_runs": 0,
+    }
+
+
+def test_spilled_keys_still_match_exact_deduplication(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.integers(0, 2000, 20_000), "y": rng.integers(0, 3, 20_000)})
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    with RowDeduplicator(spill_threshold_keys=1000, spill_directory=str(tmp_path)) as deduplicator:
+        kept = [deduplicator.filter(pa.Table.from_batches([batch]), "s") for batch in table.to_batches(1024)]
+        assert deduplicator.report()["spilled_runs"] > 1
+        assert list(tmp_path.iterdir())
+
+    result = pa.concat_tables(kept).to_pandas()
+    pd.testing.assert_frame_equal(result, df.drop_duplicates().reset_index(drop=True))
+    assert not list(tmp_path.iterdir())
+
+
+def test_unify_drops_rows_repeated_across_sources(tmp_path):
+    ints = pd.DataFrame({"id": pd.Series([1, 2], dtype="int8"), "valor": ["a", "b"]})
+    wide = pd.DataFrame({"id": [2, 3, 1], "valor": ["b", "c", "a"]})
+
+    with RowDeduplicator() as deduplicator:
+        report = unify_to_parquet([("ints", ints), ("wide", wide)], str(tmp_path / "out.parquet"), deduplicator=deduplicator)
+
+    assert pd.read_parquet(tmp_path / "out.parquet")["id"].tolist() == [1, 2, 3]
+    assert report["rows_per_source"] == {"ints": 2, "wide": 1}
+    assert report["duplicates_per_source"] == {"ints": 0, "wide": 2}
+    assert report["duplicates_removed"] == 2
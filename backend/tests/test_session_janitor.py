@@ -0,0 +1,139 @@
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from backend.app.services.etl_cache import file_fingerprint
+from backend.app.services.session_janitor import SessionJanitor
+from backend.app.services.state_store import StateStore
+
+
+def _age_session(store: StateStore, session_id: str, seconds: int):
+    store.conn.execute(
+        "UPDATE sessions SET created_at = datetime('now', ?), last_accessed_at = NULL WHERE session_id = ?",
+        (f"-{seconds} seconds", session_id)
+    )
+    store.conn.commit()
+
+
+@pytest.fixture
+def janitor(store: StateStore, tmp_path: Path) -> SessionJanitor:
+    return SessionJanitor(
+        store, ttl_seconds=3600, batch_size=2, vacuum_every=1, processed_path=tmp_path / "processed", etl_ttl_seconds=3600
+    )
+
+
+def test_expired_sessions_are_deleted_with_their_files(store: StateStore, janitor: SessionJanitor, tmp_path: Path):
+    """Expired sessions lose their rows, dataset and job artifacts; fresh ones stay."""
+    for session_id in ("old-1", "old-2", "old-3", "fresh"):
+        store.create_session(session_id)
+        store.save_dataframe(session_id, pd.DataFrame({"x": range(100)}))
+        store.create_job(session_id, f"job-{session_id}", "analysis")
+        store.log_step(session_id, "step", "pass")
+    artifact = tmp_path / "processed" / "job-old-1" / "report.csv"
+    artifact.parent.mkdir(parents=True)
+    artifact.write_text("a,b\n1,2\n")
+    for session_id in ("old-1", "old-2", "old-3"):
+        _age_session(store, session_id, 7200)
+
+    report = janitor.run_once()
+
+    assert report["sessions_deleted"] == 3
+    assert report["file_bytes_freed"] > 0
+    assert not (tmp_path / "old-1").exists()
+    assert not artifact.parent.exists()
+    assert store.get_session("old-2") is None
+    assert store.get_steps("old-3") == []
+    assert store.get_session("fresh") is not None
+    assert (tmp_path / "fresh" / "data.parquet").exists()
+
+
+def test_retention_override_and_activity_postpone_expiry(store: StateStore, janitor: SessionJanitor):
+    """Per-session retention and recent activity keep a session alive."""
+    store.create_session("kept")
+    store.create_session("active")
+    _age_session(store, "kept", 7200)
+    _age_session(store, "active", 7200)
+    store.set_session_retention("kept", 30 * 24 * 3600)
+    store.create_job("active", "job-active", "analysis")
+
+    assert janitor.run_once()["sessions_deleted"] == 0
+    assert store.get_session("kept") is not None
+
+
+def test_orphaned_directories_are_removed(store: StateStore, janitor: SessionJanitor, tmp_path: Path):
+    """Stale session directories without a database row are collected."""
+    orphan = tmp_path / "orphan"
+    orphan.mkdir()
+    (orphan / "data.parquet").write_bytes(b"x" * 1024)
+    stale = time.time() - 7200
+    os.utime(orphan, (stale, stale))
+    hidden = tmp_path / ".tmp"
+    hidden.mkdir()
+    os.utime(hidden, (stale, stale))
+
+    report = janitor.run_once()
+
+    assert report["orphans_deleted"] == 1
+    assert report["file_bytes_freed"] >= 1024
+    assert not orphan.exists()
+    assert hidden.exists()
+
+
+def test_uploads_without_a_session_row_are_not_orphans(store: StateStore, janitor: SessionJanitor, tmp_path: Path):
+    """Saving a dataset registers its session, so the orphan sweep never takes a live upload."""
+    store.save_dataframe("upload", pd.DataFrame({"x": [1, 2]}))
+    stale = time.time() - 7200
+    os.utime(tmp_path / "upload", (stale, stale))
+
+    report = janitor.run_once()
+
+    assert report["orphans_deleted"] == 0
+    assert store.load_dataframe("upload") is not None
+
+
+def test_reads_postpone_expiry(store: StateStore, janitor: SessionJanitor):
+    """Loading a dataset or reading a session counts as activity."""
+    for session_id in ("read-data", "read-session", "idle"):
+        store.save_dataframe(session_id, pd.DataFrame({"x": [1, 2]}))
+        _age_session(store, session_id, 7200)
+
+    store.load_dataframe("read-data", columns=["x"])
+    store.get_session("read-session")
+    report = janitor.run_once()
+
+    assert report["sessions_deleted"] == 1
+    assert store.load_dataframe("idle") is None
+    assert store.load_dataframe("read-data") is not None
+
+
+def _record_etl_job(store: StateStore, job_id: str, paths: list):
+    store.start_etl_job(job_id, 1, 10)
+    files = {str(path): file_fingerprint(path) for path in paths}
+    store.record_etl_checkpoint(job_id, "datos.csv", "hash", "completed", 10, {"results": [], "files": files})
+
+
+def test_expired_etl_jobs_are_deleted_with_their_outputs(store: StateStore, janitor: SessionJanitor, tmp_path: Path):
+    """Old ETL jobs lose their rows and outputs, except outputs another job rewrote or still records."""
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    own, rewritten, shared, fresh = (output_dir / f"{name}.parquet" for name in ("own", "rewritten", "shared", "fresh"))
+    for path in (own, rewritten, shared, fresh):
+        path.write_bytes(b"p" * 100)
+    _record_etl_job(store, "etl-old", [own, rewritten, shared])
+    _record_etl_job(store, "etl-new", [shared, fresh])
+    rewritten.write_bytes(b"q" * 100)
+    store.conn.execute("UPDATE etl_jobs SET updated_at = datetime('now', '-7200 seconds') WHERE job_id = 'etl-old'")
+    store.conn.commit()
+
+    report = janitor.run_once()
+
+    assert report["etl_jobs_deleted"] == 1
+    assert report["file_bytes_freed"] >= 100
+    assert not own.exists()
+    assert rewritten.exists() and shared.exists() and fresh.exists()
+    assert store.get_etl_job_progress("etl-old") is None
+    assert store.get_etl_checkpoints("etl-old") == {}
+    assert store.get_etl_job_progress("etl-new") is not None
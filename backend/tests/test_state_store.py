@@ -0,0 +1,311 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from backend.app.services import state_store as state_store_module
+from backend.app.services.state_store import StateStore
+
+
+def test_singleton_keeps_its_pool(store: StateStore):
+    """Re-instantiating the singleton must not open a new pool."""
+    pool = store.pool
+    assert StateStore() is store
+    assert store.pool is pool
+
+
+def test_connections_use_wal_and_pragmas(store: StateStore):
+    """Pooled connections are opened in WAL mode with the tuned pragmas."""
+    conn = store.conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == state_store_module.SQLITE_BUSY_TIMEOUT_MS
+    # NORMAL == 1
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
+def test_each_thread_gets_its_own_connection(store: StateStore):
+    """Threads never share a connection object."""
+    main_conn = store.conn
+    seen = []
+
+    def worker():
+        seen.append(store.conn)
+        assert store.conn is seen[-1]
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert seen[0] is not main_conn
+    assert store.conn is main_conn
+
+
+def test_concurrent_writes_are_all_persisted(store: StateStore):
+    """Concurrent callers write without 'database is locked' errors."""
+    store.create_session("session-concurrent")
+
+    def write(i: int) -> int:
+        return store.log_step("session-concurrent", f"step {i}", "print('ok')")
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        row_ids = list(executor.map(write, range(200)))
+
+    assert len(set(row_ids)) == 200
+    assert len(store.get_steps("session-concurrent")) == 200
+
+
+def test_migrations_create_secondary_indexes(store: StateStore):
+    """The schema migration adds the lookup indexes and records its version."""
+    indexes = {
+        row["name"] for row in store.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert {
+        "idx_jobs_session_id",
+        "idx_mcp_steps_job_id",
+        "idx_execution_steps_session_id",
+        "uq_visualizations_session_name",
+    } <= indexes
+    latest = state_store_module.SCHEMA_MIGRATIONS[-1][0]
+    assert store.conn.execute("PRAGMA user_version").fetchone()[0] == latest
+
+
+def test_get_session_hydrates_tree_in_one_query(store: StateStore):
+    """Sessions with many jobs and steps are loaded with a single SELECT."""
+    store.create_session("session-tree")
+    for j in range(3):
+        store.create_job("session-tree", f"job-{j}", "analysis")
+        for s in range(4):
+            store.create_mcp_step(f"step-{j}-{s}", f"job-{j}", f"step {s}", {"index": s} if s else None)
+    store.create_job("session-tree", "job-empty", "analysis")
+
+    statements = []
+    store.conn.set_trace_callback(statements.append)
+    session = store.get_session("session-tree")
+    store.conn.set_trace_callback(None)
+
+    assert len([sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]) == 1
+    assert list(session["jobs"]) == ["job-0", "job-1", "job-2", "job-empty"]
+    assert session["jobs"]["job-empty"]["steps"] == {}
+    steps = session["jobs"]["job-1"]["steps"]
+    assert list(steps) == [f"step-1-{s}" for s in range(4)]
+    assert steps["step-1-0"]["payload"] is None
+    assert steps["step-1-2"]["payload"] == {"index": 2}
+    assert steps["step-1-2"]["job_id"] == "job-1"
+
+
+def test_get_session_without_jobs(store: StateStore):
+    """A session without jobs hydrates to an empty job map."""
+    session = store.create_session("session-empty")
+    assert session["session_id"] == "session-empty"
+    assert session["jobs"] == {}
+    assert store.get_session("missing") is None
+
+
+@pytest.fixture
+def sample_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": range(1000),
+        "age": [20 + (i % 50) for i in range(1000)],
+        "city": [f"city_{i % 7}" for i in range(1000)],
+    })
+
+
+def test_save_dataframe_writes_row_groups(store: StateStore, sample_df, monkeypatch, tmp_path: Path):
+    """Session datasets are partitioned into row groups."""
+    monkeypatch.setattr(state_store_module, "PARQUET_ROW_GROUP_SIZE", 100)
+    store.save_dataframe("session-df", sample_df)
+    metadata = pq.ParquetFile(tmp_path / "session-df" / "data.parquet").metadata
+    assert metadata.num_row_groups == 10
+    pd.testing.assert_frame_equal(store.load_dataframe("session-df"), sample_df)
+
+
+def test_load_dataframe_projection_filters_and_limit(store: StateStore, sample_df):
+    """Columns, filters and limit are pushed down to the Parquet reader."""
+    store.save_dataframe("session-df", sample_df)
+
+    projected = store.load_dataframe("session-df", columns=["age"])
+    assert list(projected.columns) == ["age"]
+    assert len(projected) == 1000
+
+    filtered = store.load_dataframe("session-df", filters=[("id", ">=", 990)])
+    assert filtered["id"].tolist() == list(range(990, 1000))
+
+    head = store.load_dataframe("session-df", limit=5)
+    pd.testing.assert_frame_equal(head, sample_df.head())
+
+    combined = store.load_dataframe("session-df", columns=["id"], filters=[("city", "==", "city_3")], limit=3)
+    assert combined["id"].tolist() == [3, 10, 17]
+    assert store.load_dataframe("missing-session", limit=5) is None
+
+
+def test_load_dataframe_uses_cache_until_saved_again(store: StateStore, sample_df, monkeypatch):
+    """Repeated loads hit the cache; save_dataframe invalidates it."""
+    store.save_dataframe("session-df", sample_df)
+    store.load_dataframe("session-df")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("dataset should be served from the cache")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(state_store_module.pd, "read_parquet", fail)
+        cached = store.load_dataframe("session-df")
+        pd.testing.assert_frame_equal(cached, sample_df)
+        pd.testing.assert_frame_equal(store.load_dataframe("session-df", limit=2), sample_df.head(2))
+    assert store.dataframe_cache.stats()["hits"] == 2
+
+    store.save_dataframe("session-df", sample_df.head(10))
+    assert len(store.load_dataframe("session-df")) == 10
+
+
+def test_async_facade_runs_on_store_executor(store: StateStore, sample_df):
+    """The async API offloads work to the store's dedicated executor."""
+    threads = []
+    original = store.log_step
+
+    def recording_log_step(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return original(*args, **kwargs)
+
+    store.log_step = recording_log_step
+
+    async def scenario():
+        await store.acreate_session("session-async")
+        await store.asave_dataframe("session-async", sample_df)
+        await store.alog_step("session-async", "loaded", "df.head()")
+        head = await store.aload_dataframe("session-async", columns=["id"], limit=3)
+        steps = await store.aget_steps("session-async")
+        return head, steps
+
+    head, steps = asyncio.run(scenario())
+    assert head["id"].tolist() == [0, 1, 2]
+    assert [step["description"] for step in steps] == ["loaded"]
+    assert threads and threads[0].startswith("state-store-io")
+
+
+def test_load_arrow_table_is_memory_mapped(store: StateStore, sample_df, monkeypatch, tmp_path: Path):
+    """The Arrow read path maps the IPC file instead of allocating buffers."""
+    monkeypatch.setattr(state_store_module, "ARROW_IPC_ENABLED", True)
+    store.save_dataframe("session-arrow", sample_df)
+    assert (tmp_path / "session-arrow" / "data.arrow").exists()
+
+    allocated_before = pa.total_allocated_bytes()
+    table = store.load_arrow_table("session-arrow")
+    frame = store.load_arrow_dataframe("session-arrow", columns=["id", "city"])
+    assert pa.total_allocated_bytes() == allocated_before
+
+    assert table.num_rows == 1000
+    assert isinstance(frame["id"].dtype, pd.ArrowDtype)
+    assert frame["city"].tolist() == sample_df["city"].tolist()
+    assert store.load_arrow_table("missing-session") is None
+
+
+def test_load_arrow_table_falls_back_to_parquet(store: StateStore, sample_df, monkeypatch, tmp_path: Path):
+    """Sessions without an IPC file are read from Parquet."""
+    monkeypatch.setattr(state_store_module, "ARROW_IPC_ENABLED", True)
+    store.save_dataframe("session-arrow", sample_df)
+    # Turning the option off removes the copy on the next save.
+    monkeypatch.setattr(state_store_module, "ARROW_IPC_ENABLED", False)
+    store.save_dataframe("session-arrow", sample_df)
+    assert not (tmp_path / "session-arrow" / "data.arrow").exists()
+    table = store.load_arrow_table("session-arrow", columns=["age"])
+    assert table.column_names == ["age"]
+    assert table.num_rows == 1000
+
+
+def test_deferred_writes_are_batched(store: StateStore, monkeypatch):
+    """Deferred writes are committed together and visible to readers after a flush."""
+    monkeypatch.setattr(store.write_behind, "flush_interval", 60)
+    store.create_session("session-deferred")
+    for i in range(50):
+        assert store.log_step("session-deferred", f"step {i}", "pass", defer=True) is None
+    store.add_visualization("session-deferred", "chart", [{"x": 1}], defer=True)
+
+    # Nothing has been committed yet: look at the table directly.
+    count = store.conn.execute("SELECT COUNT(*) FROM execution_steps").fetchone()[0]
+    assert count == 0
+    assert store.write_behind.pending() == 51
+
+    # Readers flush the queue first, and the batch lands in one transaction.
+    assert len(store.get_steps("session-deferred")) == 50
+    assert store.get_visualizations("session-deferred") == {"chart": [{"x": 1}]}
+    assert store.write_behind.batches_written == 1
+    assert store.write_behind.pending() == 0
+
+
+def test_deferred_writes_flush_on_batch_size_and_close(store: StateStore, monkeypatch):
+    """The background thread flushes full batches; close() writes the rest."""
+    monkeypatch.setattr(store.write_behind, "max_batch_size", 10)
+    monkeypatch.setattr(store.write_behind, "flush_interval", 60)
+    for i in range(10):
+        store.log_step("session-batch", f"step {i}", "pass", defer=True)
+
+    deadline = time.monotonic() + 5
+    while store.write_behind.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.write_behind.statements_written == 10
+
+    store.create_mcp_step("step-deferred", "job-x", "deferred", {"k": 1}, defer=True)
+    store.write_behind.close()
+    assert store.get_mcp_step("step-deferred")["payload"] == {"k": 1}
+
+
+def test_visualizations_upsert_and_compressed_storage(store: StateStore):
+    """Visualizations upsert on (session_id, name) and are stored as compressed blobs."""
+    points = [{"x": i, "y": i * 0.5} for i in range(5000)]
+    store.add_visualization("session-viz", "scatter", points)
+    store.add_visualization("session-viz", "bars", {"a": 1})
+    store.add_visualization("session-viz", "scatter", points[:10])
+
+    rows = store.conn.execute("SELECT name, data FROM visualizations WHERE session_id = ?", ("session-viz",)).fetchall()
+    assert len(rows) == 2
+    assert all(isinstance(row["data"], bytes) for row in rows)
+
+    assert store.get_visualization("session-viz", "scatter") == points[:10]
+    assert store.get_visualization("session-viz", "missing") is None
+    assert store.list_visualizations("session-viz") == ["bars", "scatter"]
+    assert store.get_visualizations("session-viz") == {"scatter": points[:10], "bars": {"a": 1}}
+
+
+def test_legacy_json_visualizations_are_migrated_and_readable(store: StateStore):
+    """Rows written as JSON text by older versions still decode after the migration."""
+    conn = store.conn
+    conn.execute("DROP INDEX uq_visualizations_session_name")
+    conn.execute("INSERT INTO visualizations (session_id, name, data) VALUES ('legacy', 'chart', '[1]')")
+    conn.execute("INSERT INTO visualizations (session_id, name, data) VALUES ('legacy', 'chart', '[1, 2]')")
+    conn.execute("ALTER TABLE sessions DROP COLUMN last_accessed_at")
+    conn.execute("ALTER TABLE sessions DROP COLUMN retention_seconds")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+
+    store._apply_migrations()
+    assert store.get_visualizations("legacy") == {"chart": [1, 2]}
+    store.add_visualization("legacy", "chart", [3])
+    assert store.get_visualization("legacy", "chart") == [3]
+
+
+def test_etl_checkpoints_and_progress(store: StateStore):
+    """Checkpoints drive the progress of an ETL job; a restart keeps only completed ones."""
+    assert store.get_etl_job_progress("etl-1") is None
+    progress = store.start_etl_job("etl-1", sources_total=3, bytes_total=600)
+    assert (progress["status"], progress["sources_done"], progress["bytes_processed"]) == ("running", 0, 0)
+
+    store.record_etl_checkpoint("etl-1", "a.csv", "hash-a", "completed", 100, [[[], "a.csv", {"sources": [["a.csv", "a.parquet"]]}]])
+    store.record_etl_checkpoint("etl-1", "b.csv", "hash-b", "failed", 200, [[[], "b.csv", {"error": "boom"}]])
+    progress = store.get_etl_job_progress("etl-1")
+    assert (progress["sources_done"], progress["sources_failed"], progress["bytes_processed"]) == (2, 1, 300)
+
+    store.finish_etl_job("etl-1", "failed")
+    assert store.get_etl_job_progress("etl-1")["status"] == "failed"
+
+    progress = store.start_etl_job("etl-1", sources_total=3, bytes_total=600)
+    assert (progress["status"], progress["sources_done"], progress["bytes_processed"]) == ("running", 1, 100)
+    checkpoints = store.get_etl_checkpoints("etl-1")
+    assert list(checkpoints) == ["a.csv"]
+    assert checkpoints["a.csv"]["input_hash"] == "hash-a"
+    assert checkpoints["a.csv"]["outputs"] == [[[], "a.csv", {"sources": [["a.csv", "a.parquet"]]}]]
@@ -47,3 +47,79 @@ def test_eda_service(sample_dataframe):
 # A more complete test suite would mock the full pipeline in api.py
 # and verify that each module is called in sequence. For this plan,
 # we are focusing on unit tests for the core components.
+
+# --- Shared job progress store ---
+
+import threading
+from backend.wpa.auto_analysis import api as auto_analysis_api
+from backend.wpa.auto_analysis.job_store import InMemoryJobStore, JobStore, RedisJobStore
+
+@pytest.fixture
+def job_store(monkeypatch):
+    store = InMemoryJobStore()
+    monkeypatch.setattr(auto_analysis_api, "job_store", store)
+    return store
+
+def test_pipeline_task_publishes_stages_to_shared_store(job_store, sample_dataframe):
+    """
+    The worker task records every stage in the shared store, and the status
+    endpoint reads it back from there.
+    """
+    job_store.update("job-1", status="queued", stage="Awaiting worker", mlflow_run_id="run-1")
+    watcher = job_store.watch("job-1", heartbeat_seconds=5)
+    assert next(watcher)["status"] == "queued"
+
+    state_store = MagicMock()
+    state_store.load_dataframe.return_value = sample_dataframe
+    with patch.object(auto_analysis_api, "get_state_store", return_value=state_store), \
+         patch.object(auto_analysis_api, "mlflow"), \
+         patch.object(auto_analysis_api, "strengthen_ingestion", return_value={"inferred_types": {}}), \
+         patch.object(auto_analysis_api, "run_eda"):
+        auto_analysis_api.run_full_analysis_pipeline_task("job-1", "session-1", "run-1")
+
+    stages = [state["stage"] for state in watcher]
+    assert stages == ["Loading Data", "Strengthening Ingestion", "Running Automated EDA", "Finished"]
+    final = job_store.get("job-1")
+    assert final == {"status": "completed", "stage": "Finished", "mlflow_run_id": "run-1"}
+
+def test_status_and_event_endpoints(job_store, client):
+    """Status is served from the store and transitions are pushed over SSE."""
+    job_store.update("job-2", status="running", stage="Loading Data")
+    assert client.get("/wpa/auto-analysis/job-2/status").json()["stage"] == "Loading Data"
+    assert client.get("/wpa/auto-analysis/missing/status").status_code == 404
+
+    def finish():
+        job_store.update("job-2", stage="Running Automated EDA")
+        job_store.update("job-2", status="completed", stage="Finished")
+
+    timer = threading.Timer(0.2, finish)
+    timer.start()
+    response = client.get("/wpa/auto-analysis/job-2/events")
+    timer.join()
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [line for line in response.text.splitlines() if line.startswith("data: ")]
+    assert len(events) == 3
+    assert events[-1] == 'data: {"status": "completed", "stage": "Finished"}'
+
+def test_redis_job_store_round_trip():
+    """The Redis backend merges fields into a hash and publishes the new state."""
+    client = MagicMock()
+    pipe = client.pipeline.return_value
+    pipe.execute.return_value = [1, True, {b"status": b'"running"', b"stage": b'"Loading Data"'}]
+    store = RedisJobStore(client)
+
+    state = store.update("job-3", stage="Loading Data")
+
+    assert state == {"status": "running", "stage": "Loading Data"}
+    pipe.hset.assert_called_once_with("wpa:job:job-3", mapping={"stage": '"Loading Data"'})
+    client.publish.assert_called_once_with("wpa:job:job-3:events", '{"status": "running", "stage": "Loading Data"}')
+
+def test_incomplete_job_store_backend_fails_when_built():
+    """A backend missing part of the interface cannot be instantiated."""
+    class PartialJobStore(JobStore):
+        def update(self, job_id, **fields):
+            return fields
+
+    with pytest.raises(TypeError):
+        PartialJobStore()
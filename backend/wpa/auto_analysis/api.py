@@ -1,11 +1,13 @@
  
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
  
 from pydantic import BaseModel
 import pandas as pd
 from typing import Dict, Any
 import uuid
  
+import json
 import mlflow
 import hashlib
 
@@ -14,11 +16,14 @@ from backend.app.services.state_store import StateStore, get_state_store
 from backend.wpa.auto_analysis.ingestion_adapter import strengthen_ingestion
 from backend.wpa.auto_analysis.eda_intelligent_service import run_eda
 from backend.wpa.auto_analysis.model_trainer import train_and_select_model
+from backend.wpa.auto_analysis.job_store import create_job_store
 # ... other imports
 
 router = APIRouter(prefix="/wpa/auto-analysis", tags=["WPA - Automated Analysis"])
  
-job_store: Dict[str, Dict[str, Any]] = {}
+# Shared between the API and the Celery workers (see job_store.py), so status
+# reads reflect progress made in any worker process.
+job_store = create_job_store()
 
 class SubmitRequest(BaseModel):
     session_id: str
@@ -31,26 +36,26 @@ def run_full_analysis_pipeline_task(job_id: str, session_id: str, run_id: str):
     state_store = get_state_store()
     try:
         with mlflow.start_run(run_id=run_id):
-            job_store[job_id] = {"status": "running", "stage": "Loading Data"}
+            job_store.update(job_id, status="running", stage="Loading Data")
             df = state_store.load_dataframe(session_id)
             if df is None: raise ValueError("No data found for session ID.")
 
             mlflow.log_param("job_id", job_id)
             mlflow.log_param("session_id", session_id)
 
-            job_store[job_id]["stage"] = "Strengthening Ingestion"
+            job_store.update(job_id, stage="Strengthening Ingestion")
             metadata = strengthen_ingestion(df, job_id)
 
-            job_store[job_id]["stage"] = "Running Automated EDA"
+            job_store.update(job_id, stage="Running Automated EDA")
             run_eda(df, metadata['inferred_types'], job_id)
 
             # For brevity, subsequent steps are not shown but would log params/metrics
             # to MLflow within this 'with' block.
 
-            job_store[job_id] = {"status": "completed", "stage": "Finished"}
+            job_store.update(job_id, status="completed", stage="Finished")
     except Exception as e:
         mlflow.end_run(status="FAILED")
-        job_store[job_id] = {"status": "failed", "stage": str(e)}
+        job_store.update(job_id, status="failed", stage=str(e))
 
 @router.post("/submit", status_code=202)
 def submit_auto_analysis_job(request: SubmitRequest):
@@ -65,8 +70,9 @@ def submit_auto_analysis_job(request: SubmitRequest):
     mlflow.set_tag("user_id", request.user_id)
     # Could also add git_commit tag here
 
+    # Record the job before enqueueing it so a fast worker's updates are not overwritten.
+    job_store.update(job_id, status="queued", stage="Awaiting worker", mlflow_run_id=run.info.run_id)
     run_full_analysis_pipeline_task.delay(job_id, request.session_id, run.info.run_id)
-    job_store[job_id] = {"status": "queued", "stage": "Awaiting worker", "mlflow_run_id": run.info.run_id}
     return {"job_id": job_id, "mlflow_run_id": run.info.run_id}
 
 # Other endpoints remain the same
@@ -77,6 +83,23 @@ def get_job_status(job_id: str):
  
     return job
 
+@router.get("/{job_id}/events")
+def stream_job_events(job_id: str):
+    """
+    Streams the job's state as Server-Sent Events: the current state first,
+    then one event per stage transition until the job completes or fails.
+    """
+    if not job_store.get(job_id): raise HTTPException(status_code=404, detail="Job not found.")
+
+    def event_stream():
+        for state in job_store.watch(job_id):
+            if state is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: status\ndata: {json.dumps(state)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @router.get("/{job_id}/report")
 def get_job_report(job_id: str):
  
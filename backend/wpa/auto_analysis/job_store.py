@@ -0,0 +1,189 @@
+"""
+Shared job progress store for the WPA auto-analysis workflow.
+
+The Celery worker writes job and stage state here and the API reads it, so
+every API replica sees the same progress. Each update is also published on a
+per-job channel, which the API relays to clients as Server-Sent Events.
+"""
+import json
+import os
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+REDIS_HOST = os.getenv("REDIS_HOST", "redis")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+# Job state is kept for a week after its last update.
+JOB_TTL_SECONDS = int(os.getenv("WPA_JOB_TTL_SECONDS", str(7 * 24 * 3600)))
+TERMINAL_STATUSES = {"completed", "failed"}
+
+
+class JobStore(ABC):
+    """Common behaviour of the job store backends."""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        """Merges `fields` into the job's state, publishes it and returns it."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the job's current state, or None if it is unknown."""
+
+    @abstractmethod
+    def subscribe(self, job_id: str) -> "Subscription":
+        """Starts listening for updates to a job."""
+
+    def watch(self, job_id: str, heartbeat_seconds: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Yields the job's state, then every later update, until the job
+        reaches a terminal status. Yields None when no update arrived within
+        `heartbeat_seconds`, so callers can keep idle connections alive.
+        """
+        subscription = self.subscribe(job_id)
+        try:
+            state = self.get(job_id)
+            if state is None:
+                return
+            while True:
+                yield state
+                if state is not None and state.get("status") in TERMINAL_STATUSES:
+                    return
+                state = subscription.get(timeout=heartbeat_seconds)
+        finally:
+            subscription.close()
+
+
+class Subscription(ABC):
+    """A stream of state updates for one job."""
+
+    @abstractmethod
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Waits up to `timeout` seconds for the next update; None if none arrived."""
+
+    @abstractmethod
+    def close(self):
+        """Stops listening and releases the underlying connection."""
+
+
+# --- Redis backend ---
+
+class RedisJobStore(JobStore):
+    """Keeps job state in a Redis hash and publishes updates on a channel."""
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"wpa:job:{job_id}"
+
+    @staticmethod
+    def _channel(job_id: str) -> str:
+        return f"wpa:job:{job_id}:events"
+
+    def update(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        key = self._key(job_id)
+        pipe = self.client.pipeline()
+        pipe.hset(key, mapping={name: json.dumps(value) for name, value in fields.items()})
+        pipe.expire(key, JOB_TTL_SECONDS)
+        pipe.hgetall(key)
+        state = self._decode(pipe.execute()[-1])
+        self.client.publish(self._channel(job_id), json.dumps(state))
+        return state
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.hgetall(self._key(job_id))
+        return self._decode(raw) if raw else None
+
+    def subscribe(self, job_id: str) -> Subscription:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._channel(job_id))
+        return _RedisSubscription(pubsub)
+
+    @staticmethod
+    def _decode(raw: Dict[Any, Any]) -> Dict[str, Any]:
+        def text(value):
+            return value.decode("utf-8") if isinstance(value, bytes) else value
+        return {text(name): json.loads(text(value)) for name, value in raw.items()}
+
+
+class _RedisSubscription(Subscription):
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        message = self.pubsub.get_message(timeout=timeout)
+        if message is None or message.get("type") != "message":
+            return None
+        return json.loads(message["data"])
+
+    def close(self):
+        self.pubsub.close()
+
+
+# --- In-process backend (tests and single-process development) ---
+
+class InMemoryJobStore(JobStore):
+    """A process-local stand-in for RedisJobStore with the same behaviour."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        with self._lock:
+            state = {**self._jobs.get(job_id, {}), **json.loads(json.dumps(fields))}
+            self._jobs[job_id] = state
+            subscribers = list(self._subscribers.get(job_id, []))
+        for subscriber in subscribers:
+            subscriber.put(dict(state))
+        return dict(state)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self._jobs.get(job_id)
+            return dict(state) if state is not None else None
+
+    def subscribe(self, job_id: str) -> Subscription:
+        updates: queue.Queue = queue.Queue()
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(updates)
+        return _QueueSubscription(self, job_id, updates)
+
+    def _unsubscribe(self, job_id: str, updates: queue.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            if updates in subscribers:
+                subscribers.remove(updates)
+
+
+class _QueueSubscription(Subscription):
+    def __init__(self, store: InMemoryJobStore, job_id: str, updates: queue.Queue):
+        self.store = store
+        self.job_id = job_id
+        self.updates = updates
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return self.updates.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.store._unsubscribe(self.job_id, self.updates)
+
+
+# --- Factory ---
+
+def create_job_store() -> JobStore:
+    """
+    Builds the store selected by WPA_JOB_STORE: 'redis' (default), shared by
+    the API and the Celery workers, or 'memory' for a single process.
+    """
+    backend = os.getenv("WPA_JOB_STORE", "redis")
+    if backend == "memory":
+        return InMemoryJobStore()
+    import redis
+    return RedisJobStore(redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=0))